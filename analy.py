@@ -1,368 +1,549 @@
-import spacy
-from collections import defaultdict
-import networkx as nx
-from spacy.matcher import Matcher
-import re
-
-def load_nlp_model(lang="en"):
-    """언어 모델 로드"""
-    try:
-        if lang == "en":
-            return spacy.load("en_core_web_lg")
-        else:
-            return spacy.load(f"{lang}_core_web_sm")
-    except OSError:
-        print(f"{lang} 모델이 설치되어 있지 않습니다. 영어 모델을 사용합니다.")
-        return spacy.load("en_core_web_sm")
-
-class ClauseNode:
-    """절 노드 클래스"""
-    def __init__(self, start_idx, end_idx, text, clause_type, main_verb=None, subject=None):
-        self.start_idx = start_idx
-        self.end_idx = end_idx
-        self.text = text
-        self.type = clause_type
-        self.main_verb = main_verb
-        self.subject = subject
-        self.parent = None
-        self.children = []
-        self.depth = 0
-        self.role = None
-        self.connector = None
-
-class EnhancedClauseParser:
-    """향상된 절 구조 파서"""
-    
-    def __init__(self, nlp):
-        self.nlp = nlp
-        self.matcher = Matcher(nlp.vocab)
-        self._setup_patterns()
-        self.clause_types = {
-            "relative": ["who", "whom", "whose", "which", "that"],
-            "nominal": ["that", "what", "whatever", "whether", "if", "how"],
-            "adverbial": ["because", "since", "as", "when", "while", "after", "before", 
-                         "until", "till", "unless", "if", "though", "although", "even though"]
-        }
-        
-    def _setup_patterns(self):
-        """구동사 및 기타 구문 패턴 설정"""
-        self.matcher.add("PHRASAL_VERB", [
-            [{"POS": "VERB"}, {"DEP": "prt"}],
-            [{"POS": "VERB"}, {"POS": "ADP", "OP": "+"}, {"POS": "PRON", "OP": "?"}],
-            [{"POS": "VERB"}, {"POS": "ADP"}, {"POS": "DET", "OP": "?"}, {"POS": "NOUN"}]
-        ])
-        
-        self.matcher.add("CLAUSE_BOUNDARY", [
-            [{"DEP": "mark"}],
-            [{"POS": "SCONJ"}],
-            [{"TAG": "WDT"}],
-            [{"TAG": "WP"}],
-            [{"TAG": "WRB"}]
-        ])
-    
-    def analyze_sentence(self, text):
-        """문장 전체 분석"""
-        doc = self.nlp(text)
-        
-        # 1. 절 구조 분석
-        clause_tree = self.build_clause_tree(doc)
-        
-        # 2. 각 절 내에서 동사-명사구 관계 분석
-        clause_verb_np_roles = self.analyze_verb_np_roles_by_clause(doc, clause_tree)
-        
-        # 3. 생략된 주어 및 접속 구조 분석
-        implied_subjects = self.resolve_zero_pronouns(doc, clause_tree)
-        coord_structures = self.identify_coordination(doc)
-        
-        return {
-            "doc": doc,
-            "clause_tree": clause_tree,
-            "clause_verb_np_roles": clause_verb_np_roles,
-            "implied_subjects": implied_subjects,
-            "coord_structures": coord_structures
-        }
-    
-    def identify_main_clauses(self, doc):
-        """주절 식별"""
-        root = None
-        for token in doc:
-            if token.dep_ == "ROOT":
-                root = token
-                break
-        
-        if not root:
-            return []
-        
-        main_clause_tokens = [root] + list(self._get_clause_tokens(root))
-        main_clause_indices = sorted([t.i for t in main_clause_tokens])
-        
-        main_clauses = []
-        current_indices = []
-        
-        for i, idx in enumerate(main_clause_indices):
-            if i > 0 and idx > main_clause_indices[i-1] + 1:
-                if current_indices:
-                    start_idx = min(current_indices)
-                    end_idx = max(current_indices) + 1
-                    main_clauses.append((start_idx, end_idx))
-                current_indices = [idx]
-            else:
-                current_indices.append(idx)
-        
-        if current_indices:
-            start_idx = min(current_indices)
-            end_idx = max(current_indices) + 1
-            main_clauses.append((start_idx, end_idx))
-        
-        return main_clauses
-    
-    def _get_clause_tokens(self, head_token):
-        """특정 토큰에 직접 의존하는 모든 토큰 찾기 (재귀적)"""
-        tokens = []
-        for child in head_token.children:
-            if child.dep_ not in {"mark", "relcl", "advcl", "ccomp", "xcomp", "acl"}:
-                tokens.append(child)
-                tokens.extend(self._get_clause_tokens(child))
-        return tokens
-    
-    def identify_subordinate_clauses(self, doc):
-        """종속절 식별"""
-        subordinate_clauses = []
-        
-        for token in doc:
-            if token.dep_ in {"relcl", "advcl", "ccomp", "xcomp", "acl"}:
-                clause_tokens = [token] + list(self._get_clause_tokens(token))
-                clause_indices = sorted([t.i for t in clause_tokens])
-                
-                if clause_indices:
-                    start_idx = min(clause_indices)
-                    end_idx = max(clause_indices) + 1
-                    
-                    clause_type = "unknown"
-                    if token.dep_ == "relcl":
-                        clause_type = "relative"
-                    elif token.dep_ == "advcl":
-                        clause_type = "adverbial"
-                    elif token.dep_ in {"ccomp", "xcomp"}:
-                        clause_type = "nominal"
-                    elif token.dep_ == "acl":
-                        clause_type = "adjectival"
-                    
-                    connector = None
-                    for child in token.children:
-                        if child.dep_ == "mark" or child.pos_ in {"SCONJ", "CCONJ"} or child.tag_ in {"WDT", "WP", "WRB"}:
-                            connector = child
-                            break
-                    
-                    subordinate_clauses.append({
-                        "start": start_idx,
-                        "end": end_idx,
-                        "head": token,
-                        "type": clause_type,
-                        "connector": connector,
-                        "parent_idx": token.head.i if token.head != token else None
-                    })
-        
-        return subordinate_clauses
-    
-    def build_clause_tree(self, doc):
-        """문장의 절 구조 트리 구축"""
-        main_clauses_indices = self.identify_main_clauses(doc)
-        subordinate_clauses = self.identify_subordinate_clauses(doc)
-        
-        all_clauses = []
-        
-        # 주절 추가
-        for start, end in main_clauses_indices:
-            main_verb = None
-            for token in doc[start:end]:
-                if token.dep_ == "ROOT" or (token.pos_ == "VERB" and token.dep_ in {"ROOT", "ccomp", "xcomp"}):
-                    main_verb = token
-                    break
-            
-            subject = None
-            if main_verb:
-                for child in main_verb.children:
-                    if child.dep_ in {"nsubj", "nsubjpass"}:
-                        subject = child
-                        break
-            
-            clause = ClauseNode(
-                start_idx=start,
-                end_idx=end,
-                text=doc[start:end].text,
-                clause_type="main",
-                main_verb=main_verb,
-                subject=subject
-            )
-            clause.role = "main"
-            all_clauses.append(clause)
-        
-        # 종속절 추가
-        for sc in subordinate_clauses:
-            main_verb = sc["head"] if sc["head"].pos_ == "VERB" else None
-            if not main_verb:
-                for token in doc[sc["start"]:sc["end"]]:
-                    if token.pos_ == "VERB" and token.head == sc["head"]:
-                        main_verb = token
-                        break
-            
-            subject = None
-            if main_verb:
-                for child in main_verb.children:
-                    if child.dep_ in {"nsubj", "nsubjpass"}:
-                        subject = child
-                        break
-            
-            clause = ClauseNode(
-                start_idx=sc["start"],
-                end_idx=sc["end"],
-                text=doc[sc["start"]:sc["end"]].text,
-                clause_type=sc["type"],
-                main_verb=main_verb,
-                subject=subject
-            )
-            clause.connector = sc["connector"]
-            
-            if sc["type"] == "relative":
-                clause.role = "relative_clause"
-            elif sc["type"] == "adverbial":
-                clause.role = "adverbial_clause"
-            elif sc["type"] == "nominal":
-                clause.role = "nominal_clause"
-            elif sc["type"] == "adjectival":
-                clause.role = "adjectival_clause"
-            
-            all_clauses.append(clause)
-        
-        # 절 간의 계층 구조 설정
-        for clause in all_clauses:
-            if clause.type == "main":
-                continue
-            
-            parent_clause = None
-            min_size = float('inf')
-            
-            for potential_parent in all_clauses:
-                if potential_parent == clause:
-                    continue
-                
-                if (potential_parent.start_idx <= clause.start_idx and 
-                    potential_parent.end_idx >= clause.end_idx):
-                    size = potential_parent.end_idx - potential_parent.start_idx
-                    if size < min_size:
-                        min_size = size
-                        parent_clause = potential_parent
-            
-            if parent_clause:
-                clause.parent = parent_clause
-                parent_clause.children.append(clause)
-        
-        # 계층 깊이 설정
-        for clause in all_clauses:
-            depth = 0
-            current = clause
-            while current.parent:
-                depth += 1
-                current = current.parent
-            clause.depth = depth
-        
-        return all_clauses
-    
-    def analyze_verb_np_roles_by_clause(self, doc, clause_tree):
-        """각 절 내에서 동사-명사구 관계 분석"""
-        clause_verb_np_roles = {}
-        
-        for clause in clause_tree:
-            verb_np_roles = defaultdict(lambda: {
-                'subject': [],
-                'direct_object': [],
-                'indirect_object': [],
-                'others': []
-            })
-            
-            # 명사구 식별 및 역할 파악
-            for chunk in doc.noun_chunks:
-                if not (clause.start_idx <= chunk.start < clause.end_idx):
-                    continue
-                
-                head = chunk.root.head
-                dep = chunk.root.dep_
-                
-                if head.pos_ in {"VERB", "AUX"}:
-                    if dep in {"nsubj", "nsubjpass"}:
-                        verb_np_roles[head]['subject'].append(chunk.text)
-                    elif dep == "dobj":
-                        verb_np_roles[head]['direct_object'].append(chunk.text)
-                    elif dep == "iobj":
-                        verb_np_roles[head]['indirect_object'].append(chunk.text)
-                    elif dep == "pobj" and chunk.root.head.dep_ == "prep" and chunk.root.head.head == head:
-                        if chunk.root.head.text.lower() in {"to", "for"}:
-                            verb_np_roles[head]['indirect_object'].append(f"{chunk.root.head.text} {chunk.text}")
-                        else:
-                            verb_np_roles[head]['others'].append(f"{chunk.root.head.text} {chunk.text}")
-                    else:
-                        verb_np_roles[head]['others'].append(chunk.text)
-            
-            # 관계절 처리
-            if clause.type == "relative" and clause.connector:
-                rel_pronoun = clause.connector
-                if clause.main_verb and rel_pronoun.text.lower() in {"who", "that", "which", "whom", "whose"}:
-                    antecedent = None
-                    if clause.parent:
-                        for token in doc[clause.parent.start_idx:clause.parent.end_idx]:
-                            if token.i == rel_pronoun.head.i:
-                                antecedent = token.text
-                                break
-                    
-                    if antecedent and rel_pronoun.dep_ == "nsubj":
-                        verb_np_roles[clause.main_verb]['subject'].append(f"{antecedent} (as {rel_pronoun.text})")
-                    elif antecedent and rel_pronoun.dep_ == "dobj":
-                        verb_np_roles[clause.main_verb]['direct_object'].append(f"{antecedent} (as {rel_pronoun.text})")
-            
-            clause_verb_np_roles[clause] = dict(verb_np_roles)
-        
-        return clause_verb_np_roles
-    
-    def resolve_zero_pronouns(self, doc, clause_tree):
-        """생략된 주어 추론"""
-        implied_subjects = {}
-        
-        for clause in clause_tree:
-            if clause.main_verb and not clause.subject:
-                if clause.main_verb.tag_ == "VB" and clause.start_idx == 0:
-                    implied_subjects[clause.main_verb] = "you (implied in imperative)"
-                    continue
-                
-                if clause.parent and clause.parent.subject:
-                    implied_subjects[clause.main_verb] = f"{clause.parent.subject.text} (implied from parent clause)"
-        
-        return implied_subjects
-    
-    def identify_coordination(self, doc):
-        """접속 구조 식별"""
-        coord_structures = []
-        
-        for token in doc:
-            if token.dep_ == "conj" and token.head.pos_ == token.pos_:
-                conjunction = None
-                
-                for sibling in token.head.children:
-                    if sibling.dep_ == "cc" and sibling.i < token.i and sibling.i > token.head.i:
-                        conjunction = sibling
-                        break
-                
-                if not conjunction:
-                    for i in range(token.head.i + 1, token.i):
-                        if doc[i].text == ",":
-                            conjunction = doc[i]
-                            break
-                
-                coord_structures.append({
-                    "type": token.pos_,
-                    "first": token.head,
-                    "conjunction": conjunction,
-                    "second": token
-                })
-        
+import spacy
+from collections import defaultdict
+from spacy.matcher import Matcher
+from spacy.tokens import DocBin, Span
+import re
+import logging
+import threading
+import weakref
+from bisect import bisect_left
+
+import metrics
+from vocab_index import get_vocab_index
+
+logger = logging.getLogger(__name__)
+
+# 종속절을 이루는 의존 관계
+CLAUSE_DEPS = {"relcl", "advcl", "ccomp", "xcomp", "acl"}
+
+# 대체 모델 사용 경고는 프로세스 당 한 번만 남김
+_fallback_logged = False
+
+def load_nlp_model(lang="en", disable=()):
+    """언어 모델 로드 (disable: 비활성화할 파이프 이름)"""
+    global _fallback_logged
+    try:
+        if lang == "en":
+            return spacy.load("en_core_web_lg", disable=list(disable))
+        else:
+            return spacy.load(f"{lang}_core_web_sm", disable=list(disable))
+    except OSError:
+        if not _fallback_logged:
+            logger.warning("%s 모델이 설치되어 있지 않습니다. 영어 모델을 사용합니다.", lang)
+            _fallback_logged = True
+        return spacy.load("en_core_web_sm", disable=list(disable))
+
+def _offset(doc):
+    """Span 이면 문서 내 시작 위치, Doc 이면 0 (절 인덱스를 span 기준으로 맞추기 위함)"""
+    return doc.start if isinstance(doc, Span) else 0
+
+def _chunk_role(chunk):
+    """명사구가 동사에 대해 갖는 역할 (동사 토큰, 역할 키, 표시 텍스트), 없으면 None"""
+    head = chunk.root.head
+    dep = chunk.root.dep_
+    
+    if head.pos_ not in {"VERB", "AUX"}:
+        return None
+    if dep in {"nsubj", "nsubjpass"}:
+        return head, 'subject', chunk.text
+    if dep == "dobj":
+        return head, 'direct_object', chunk.text
+    if dep == "iobj":
+        return head, 'indirect_object', chunk.text
+    if dep == "pobj" and chunk.root.head.dep_ == "prep" and chunk.root.head.head == head:
+        if chunk.root.head.text.lower() in {"to", "for"}:
+            return head, 'indirect_object', f"{chunk.root.head.text} {chunk.text}"
+        return head, 'others', f"{chunk.root.head.text} {chunk.text}"
+    return head, 'others', chunk.text
+
+class _NounChunkIndex:
+    """문서 단위 명사구 색인
+    
+    doc.noun_chunks 를 한 번만 생성하고 각 명사구의 역할도 미리 계산해
+    시작 위치 순으로 저장한다. 절 구간에 속한 명사구는 bisect 로 찾는다.
+    역할은 (동사 토큰 위치, 역할, 텍스트)로 저장한다 - Token 은 Doc 을 붙잡으므로
+    Token 을 넣으면 약한 참조 캐시의 Doc 이 해제되지 않는다.
+    """
+    def __init__(self, doc):
+        self.starts = []
+        self.roles = []
+        for chunk in doc.noun_chunks:
+            role = _chunk_role(chunk)
+            if role:
+                head, role, text = role
+                self.starts.append(chunk.start)
+                self.roles.append((head.i, role, text))
+        self.ordered = all(a < b for a, b in zip(self.starts, self.starts[1:]))
+    
+    def roles_between(self, start, end):
+        """start <= 명사구 시작 < end 인 명사구 역할 (문서 순서)"""
+        if not self.ordered:
+            return [r for s, r in zip(self.starts, self.roles) if start <= s < end]
+        return self.roles[bisect_left(self.starts, start):bisect_left(self.starts, end)]
+
+# Doc 별 명사구 색인 (한 페이지의 여러 문장 Span 이 같은 색인을 공유)
+_chunk_indexes = weakref.WeakKeyDictionary()
+_chunk_indexes_lock = threading.Lock()
+
+def _noun_chunk_index(doc):
+    root_doc = doc.doc
+    with _chunk_indexes_lock:
+        index = _chunk_indexes.get(root_doc)
+    if index is None:
+        index = _NounChunkIndex(root_doc)
+        with _chunk_indexes_lock:
+            _chunk_indexes[root_doc] = index
+    return index
+
+def _token_i(token):
+    return token.i if token is not None else None
+
+class ClauseNode:
+    """절 노드 클래스
+    
+    동사/주어/접속어는 Token 대신 문서 기준 토큰 인덱스(Token.i, 없으면 None)로 저장해
+    절 트리가 Doc 전체를 메모리에 붙잡아 두지 않도록 한다. (doc.doc[i] 로 복원)
+    """
+    __slots__ = ("start_idx", "end_idx", "text", "type", "main_verb_i", "subject_i",
+                 "connector_i", "parent", "children", "depth", "role")
+    
+    def __init__(self, start_idx, end_idx, text, clause_type, main_verb_i=None, subject_i=None):
+        self.start_idx = start_idx
+        self.end_idx = end_idx
+        self.text = text
+        self.type = clause_type
+        self.main_verb_i = main_verb_i
+        self.subject_i = subject_i
+        self.parent = None
+        self.children = []
+        self.depth = 0
+        self.role = None
+        self.connector_i = None
+
+class EnhancedClauseParser:
+    """향상된 절 구조 파서"""
+    
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.matcher = Matcher(nlp.vocab)
+        self._setup_patterns()
+        self.clause_types = {
+            "relative": ["who", "whom", "whose", "which", "that"],
+            "nominal": ["that", "what", "whatever", "whether", "if", "how"],
+            "adverbial": ["because", "since", "as", "when", "while", "after", "before", 
+                         "until", "till", "unless", "if", "though", "although", "even though"]
+        }
+        
+    def _setup_patterns(self):
+        """구동사 및 기타 구문 패턴 설정"""
+        self.matcher.add("PHRASAL_VERB", [
+            [{"POS": "VERB"}, {"DEP": "prt"}],
+            [{"POS": "VERB"}, {"POS": "ADP", "OP": "+"}, {"POS": "PRON", "OP": "?"}],
+            [{"POS": "VERB"}, {"POS": "ADP"}, {"POS": "DET", "OP": "?"}, {"POS": "NOUN"}]
+        ])
+        
+        self.matcher.add("CLAUSE_BOUNDARY", [
+            [{"DEP": "mark"}],
+            [{"POS": "SCONJ"}],
+            [{"TAG": "WDT"}],
+            [{"TAG": "WP"}],
+            [{"TAG": "WRB"}]
+        ])
+    
+    def analyze_sentence(self, text):
+        """문장 전체 분석"""
+        doc = self.nlp(text)
+        return self.analyze_span(doc)
+    
+    def load_docs(self, doc_bin_bytes):
+        """DocBin 으로 저장된 Doc 복원 (파이프라인을 다시 실행하지 않음)"""
+        return list(DocBin().from_bytes(doc_bin_bytes).get_docs(self.nlp.vocab))
+    
+    def analyze_stored(self, doc_bin_bytes):
+        """저장된 Doc 의 문장별 분석 결과"""
+        return [self.analyze_span(sent) for doc in self.load_docs(doc_bin_bytes) for sent in doc.sents]
+    
+    def analyze_span(self, doc):
+        """이미 파싱된 Span(문장) 또는 Doc 분석 - 다시 파싱하지 않음
+        
+        절의 start_idx/end_idx 는 span 시작 기준 상대 인덱스
+        """
+        # 1. 절 구조 분석
+        with metrics.stage("build_clause_tree"):
+            clause_tree = self.build_clause_tree(doc)
+        
+        # 2. 각 절 내에서 동사-명사구 관계 분석
+        with metrics.stage("analyze_verb_np_roles"):
+            clause_verb_np_roles = self.analyze_verb_np_roles_by_clause(doc, clause_tree)
+        
+        # 3. 생략된 주어 및 접속 구조 분석
+        with metrics.stage("resolve_zero_pronouns"):
+            implied_subjects = self.resolve_zero_pronouns(doc, clause_tree)
+        with metrics.stage("identify_coordination"):
+            coord_structures = self.identify_coordination(doc)
+        
+        # 4. 단어 난이도/뜻, 구동사 (어휘 색인이 있을 때만)
+        with metrics.stage("analyze_vocabulary"):
+            vocabulary = self.analyze_vocabulary(doc)
+        
+        return {
+            "doc": doc,
+            "clause_tree": clause_tree,
+            "clause_verb_np_roles": clause_verb_np_roles,
+            "implied_subjects": implied_subjects,
+            "coord_structures": coord_structures,
+            "vocabulary": vocabulary
+        }
+    
+    def analyze_vocabulary(self, doc):
+        """어휘 색인으로 단어 레벨/뜻 표시, 구동사는 PHRASAL_VERB 패턴 매칭 결과 사용
+        
+        Matcher 는 한 번만 실행한다. 색인이 없으면 None
+        """
+        index = get_vocab_index()
+        if index is None:
+            return None
+        phrasal_id = self.nlp.vocab.strings["PHRASAL_VERB"]
+        matches = [(start, end) for match_id, start, end in self.matcher(doc) if match_id == phrasal_id]
+        return index.tag(doc, matches)
+    
+    def _clause_token_buckets(self, doc):
+        """토큰을 소속 절(head)별로 한 번에 분류
+
+        절 경계(mark 및 절 의존 관계)를 넘지 않고 head 를 따라 올라가 처음 만나는
+        절 head 가 그 토큰의 소속 절이다. mark 아래 토큰은 어느 절에도 속하지 않는다.
+        반환: (주절 root 토큰, {절 head 인덱스: 오름차순 토큰 인덱스 리스트}), 인덱스는 span 기준
+        """
+        offset = _offset(doc)
+        n = len(doc)
+        deps = [token.dep_ for token in doc]
+        heads = [token.head.i - offset for token in doc]
+        
+        root_idx = deps.index("ROOT") if "ROOT" in deps else None
+        
+        # owner[i]: i 번째 토큰이 속한 절 head 의 인덱스 (-1: 없음)
+        owner = [None] * n
+        for i in range(n):
+            path = []
+            j = i
+            while owner[j] is None:
+                if j == root_idx or deps[j] in CLAUSE_DEPS:
+                    owner[j] = j
+                elif deps[j] == "mark":
+                    owner[j] = -1
+                elif heads[j] == j or not 0 <= heads[j] < n:
+                    # 주절이 아닌 다른 문장의 root
+                    owner[j] = j
+                else:
+                    path.append(j)
+                    j = heads[j]
+            for k in path:
+                owner[k] = owner[j]
+        
+        buckets = defaultdict(list)
+        for i, head_idx in enumerate(owner):
+            if head_idx >= 0:
+                buckets[head_idx].append(i)
+        
+        root = doc[root_idx] if root_idx is not None else None
+        return root, buckets
+    
+    def identify_main_clauses(self, doc, buckets=None):
+        """주절 식별"""
+        root, clause_buckets = buckets or self._clause_token_buckets(doc)
+        
+        if not root:
+            return []
+        
+        main_clause_indices = clause_buckets[root.i - _offset(doc)]
+        
+        # 연속된 인덱스 구간별로 주절 분리
+        main_clauses = []
+        start_idx = main_clause_indices[0]
+        
+        for prev_idx, idx in zip(main_clause_indices, main_clause_indices[1:]):
+            if idx > prev_idx + 1:
+                main_clauses.append((start_idx, prev_idx + 1))
+                start_idx = idx
+        
+        main_clauses.append((start_idx, main_clause_indices[-1] + 1))
+        return main_clauses
+    
+    def identify_subordinate_clauses(self, doc, buckets=None):
+        """종속절 식별"""
+        _, clause_buckets = buckets or self._clause_token_buckets(doc)
+        subordinate_clauses = []
+        offset = _offset(doc)
+        
+        for token in doc:
+            if token.dep_ in CLAUSE_DEPS:
+                clause_indices = clause_buckets[token.i - offset]
+                
+                if clause_indices:
+                    start_idx = clause_indices[0]
+                    end_idx = clause_indices[-1] + 1
+                    
+                    clause_type = "unknown"
+                    if token.dep_ == "relcl":
+                        clause_type = "relative"
+                    elif token.dep_ == "advcl":
+                        clause_type = "adverbial"
+                    elif token.dep_ in {"ccomp", "xcomp"}:
+                        clause_type = "nominal"
+                    elif token.dep_ == "acl":
+                        clause_type = "adjectival"
+                    
+                    connector = None
+                    for child in token.children:
+                        if child.dep_ == "mark" or child.pos_ in {"SCONJ", "CCONJ"} or child.tag_ in {"WDT", "WP", "WRB"}:
+                            connector = child
+                            break
+                    
+                    subordinate_clauses.append({
+                        "start": start_idx,
+                        "end": end_idx,
+                        "head": token,
+                        "type": clause_type,
+                        "connector": connector,
+                        "parent_idx": token.head.i - offset if token.head != token else None
+                    })
+        
+        return subordinate_clauses
+    
+    def build_clause_tree(self, doc):
+        """문장의 절 구조 트리 구축"""
+        offset = _offset(doc)
+        buckets = self._clause_token_buckets(doc)
+        main_clauses_indices = self.identify_main_clauses(doc, buckets)
+        subordinate_clauses = self.identify_subordinate_clauses(doc, buckets)
+        
+        # 절 텍스트는 Span 을 만들지 않고 문자 위치로 잘라냄 (Span.text 와 동일)
+        tokens = list(doc)
+        text = doc.text
+        base_char = tokens[0].idx if tokens else 0
+        
+        def clause_text(start, end):
+            last = tokens[end - 1]
+            return text[tokens[start].idx - base_char:last.idx + len(last) - base_char]
+        
+        all_clauses = []
+        
+        # 주절 추가
+        for start, end in main_clauses_indices:
+            main_verb = None
+            for token in tokens[start:end]:
+                if token.dep_ == "ROOT" or (token.pos_ == "VERB" and token.dep_ in {"ROOT", "ccomp", "xcomp"}):
+                    main_verb = token
+                    break
+            
+            subject = None
+            if main_verb:
+                for child in main_verb.children:
+                    if child.dep_ in {"nsubj", "nsubjpass"}:
+                        subject = child
+                        break
+            
+            clause = ClauseNode(
+                start_idx=start,
+                end_idx=end,
+                text=clause_text(start, end),
+                clause_type="main",
+                main_verb_i=_token_i(main_verb),
+                subject_i=_token_i(subject)
+            )
+            clause.role = "main"
+            all_clauses.append(clause)
+        
+        # 종속절 추가
+        for sc in subordinate_clauses:
+            main_verb = sc["head"] if sc["head"].pos_ == "VERB" else None
+            if not main_verb:
+                # 절 구간 안에 있는 head 의 첫 번째 동사 자식 (children 은 인덱스 순)
+                for child in sc["head"].children:
+                    if child.pos_ == "VERB" and sc["start"] <= child.i - offset < sc["end"]:
+                        main_verb = child
+                        break
+            
+            subject = None
+            if main_verb:
+                for child in main_verb.children:
+                    if child.dep_ in {"nsubj", "nsubjpass"}:
+                        subject = child
+                        break
+            
+            clause = ClauseNode(
+                start_idx=sc["start"],
+                end_idx=sc["end"],
+                text=clause_text(sc["start"], sc["end"]),
+                clause_type=sc["type"],
+                main_verb_i=_token_i(main_verb),
+                subject_i=_token_i(subject)
+            )
+            clause.connector_i = _token_i(sc["connector"])
+            
+            if sc["type"] == "relative":
+                clause.role = "relative_clause"
+            elif sc["type"] == "adverbial":
+                clause.role = "adverbial_clause"
+            elif sc["type"] == "nominal":
+                clause.role = "nominal_clause"
+            elif sc["type"] == "adjectival":
+                clause.role = "adjectival_clause"
+            
+            all_clauses.append(clause)
+        
+        # 절 간의 계층 구조 설정
+        self._assign_parents(all_clauses)
+        
+        return all_clauses
+    
+    def _assign_parents(self, all_clauses):
+        """절 간의 계층 구조(parent, children, depth) 설정
+        
+        parent 는 자신을 포함하는 가장 작은 절이다. 절마다 시작 토큰이 다르므로
+        시작 위치 순으로 정렬한 뒤 열린 구간 스택 한 번으로 parent 와 depth 를 함께 구한다.
+        구간이 엇갈리는(중첩이 아닌) 경우에만 전체 비교로 처리한다.
+        """
+        ordered = sorted(all_clauses, key=lambda c: c.start_idx)
+        stack = []
+        prev_start = None
+        
+        for clause in ordered:
+            while stack and stack[-1].end_idx <= clause.start_idx:
+                stack.pop()
+            
+            if clause.start_idx == prev_start or (stack and stack[-1].end_idx < clause.end_idx):
+                self._assign_parents_by_scan(all_clauses)
+                return
+            prev_start = clause.start_idx
+            
+            if stack and clause.type != "main":
+                clause.parent = stack[-1]
+                clause.depth = clause.parent.depth + 1
+            stack.append(clause)
+        
+        # children 순서는 all_clauses 순서를 따름
+        for clause in all_clauses:
+            if clause.parent:
+                clause.parent.children.append(clause)
+    
+    def _assign_parents_by_scan(self, all_clauses):
+        """모든 절 쌍을 비교해 계층 구조 설정 (구간이 엇갈리는 경우용)"""
+        for clause in all_clauses:
+            clause.parent = None
+            clause.children = []
+            clause.depth = 0
+        
+        for clause in all_clauses:
+            if clause.type == "main":
+                continue
+            
+            parent_clause = None
+            min_size = float('inf')
+            
+            for potential_parent in all_clauses:
+                if potential_parent == clause:
+                    continue
+                
+                if (potential_parent.start_idx <= clause.start_idx and 
+                    potential_parent.end_idx >= clause.end_idx):
+                    size = potential_parent.end_idx - potential_parent.start_idx
+                    if size < min_size:
+                        min_size = size
+                        parent_clause = potential_parent
+            
+            if parent_clause:
+                clause.parent = parent_clause
+                parent_clause.children.append(clause)
+        
+        # 계층 깊이 설정
+        for clause in all_clauses:
+            depth = 0
+            current = clause
+            while current.parent:
+                depth += 1
+                current = current.parent
+            clause.depth = depth
+    
+    def analyze_verb_np_roles_by_clause(self, doc, clause_tree):
+        """각 절 내에서 동사-명사구 관계 분석"""
+        clause_verb_np_roles = {}
+        offset = _offset(doc)
+        tokens = doc.doc
+        chunk_index = _noun_chunk_index(doc)
+        
+        for clause in clause_tree:
+            verb_np_roles = defaultdict(lambda: {
+                'subject': [],
+                'direct_object': [],
+                'indirect_object': [],
+                'others': []
+            })
+            
+            # 절 구간에서 시작하는 명사구의 (미리 계산된) 역할 추가
+            for verb_i, role, text in chunk_index.roles_between(clause.start_idx + offset,
+                                                                clause.end_idx + offset):
+                verb_np_roles[tokens[verb_i]][role].append(text)
+            
+            # 관계절 처리
+            if clause.type == "relative" and clause.connector_i is not None:
+                rel_pronoun = tokens[clause.connector_i]
+                if clause.main_verb_i is not None and rel_pronoun.text.lower() in {"who", "that", "which", "whom", "whose"}:
+                    main_verb = tokens[clause.main_verb_i]
+                    antecedent = None
+                    if clause.parent and clause.parent.start_idx <= rel_pronoun.head.i - offset < clause.parent.end_idx:
+                        antecedent = rel_pronoun.head.text
+                    
+                    if antecedent and rel_pronoun.dep_ == "nsubj":
+                        verb_np_roles[main_verb]['subject'].append(f"{antecedent} (as {rel_pronoun.text})")
+                    elif antecedent and rel_pronoun.dep_ == "dobj":
+                        verb_np_roles[main_verb]['direct_object'].append(f"{antecedent} (as {rel_pronoun.text})")
+            
+            clause_verb_np_roles[clause] = dict(verb_np_roles)
+        
+        return clause_verb_np_roles
+    
+    def resolve_zero_pronouns(self, doc, clause_tree):
+        """생략된 주어 추론"""
+        implied_subjects = {}
+        tokens = doc.doc
+        
+        for clause in clause_tree:
+            if clause.main_verb_i is not None and clause.subject_i is None:
+                main_verb = tokens[clause.main_verb_i]
+                if main_verb.tag_ == "VB" and clause.start_idx == 0:
+                    implied_subjects[main_verb] = "you (implied in imperative)"
+                    continue
+                
+                if clause.parent and clause.parent.subject_i is not None:
+                    implied_subjects[main_verb] = f"{tokens[clause.parent.subject_i].text} (implied from parent clause)"
+        
+        return implied_subjects
+    
+    def identify_coordination(self, doc):
+        """접속 구조 식별"""
+        coord_structures = []
+        
+        for token in doc:
+            if token.dep_ == "conj" and token.head.pos_ == token.pos_:
+                conjunction = None
+                
+                for sibling in token.head.children:
+                    if sibling.dep_ == "cc" and sibling.i < token.i and sibling.i > token.head.i:
+                        conjunction = sibling
+                        break
+                
+                if not conjunction:
+                    for i in range(token.head.i + 1, token.i):
+                        if token.doc[i].text == ",":
+                            conjunction = token.doc[i]
+                            break
+                
+                coord_structures.append({
+                    "type": token.pos_,
+                    "first": token.head,
+                    "conjunction": conjunction,
+                    "second": token
+                })
+        
         return coord_structures
\ No newline at end of file
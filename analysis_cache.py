@@ -0,0 +1,78 @@
+"""문장 분석 결과 캐시
+
+convert_to_json_format 결과를 (모델 이름, 모델 버전, 문장 텍스트) 해시로 저장한다.
+어휘 정보도 결과에 들어가므로 모델 버전 뒤에 어휘 색인 버전을 붙인다.
+요청/사용자 구분 없이 공유되며, 같은 문장은 다시 파싱하지 않는다.
+값은 JSON 문자열로 저장하므로 꺼낸 결과를 수정해도 캐시에 영향이 없다.
+"""
+import hashlib
+import os
+import threading
+
+import fast_json
+from cache_store import LRUCache, SQLiteCache, TieredCache
+from model_registry import model_info
+from vocab_index import index_version
+
+# 비어 있으면 메모리 캐시만 사용
+CACHE_DB = os.getenv("ANALYSIS_CACHE_DB", "")
+MEMORY_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MEMORY", "5000"))
+DISK_ENTRIES = int(os.getenv("ANALYSIS_CACHE_DISK", "100000"))
+
+
+class AnalysisCache:
+    """문장 단위 분석 결과 캐시 (텍스트의 문장 분리 결과도 함께 저장)"""
+
+    def __init__(self, cache, model_name, model_version):
+        self.cache = cache
+        self.model_name = model_name
+        self.model_version = model_version
+
+    def _key(self, kind, text):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{kind}:{self.model_name}:{self.model_version}:{digest}"
+
+    def get(self, sentence):
+        value = self.cache.get(self._key("sentence", sentence))
+        return fast_json.loads(value) if value is not None else None
+
+    def get_many(self, sentences):
+        """문장 순서대로 분석 결과 리스트 (없으면 None), 디스크 캐시는 한 번에 조회"""
+        keys = [self._key("sentence", sentence) for sentence in sentences]
+        found = self.cache.get_many(keys)
+        return [fast_json.loads(found[key]) if key in found else None for key in keys]
+
+    def set(self, sentence, json_data):
+        self.cache.set(self._key("sentence", sentence), fast_json.dumps(json_data))
+
+    def get_split(self, text, variant):
+        """텍스트의 문장 분리 결과 (문장 문자열 리스트), variant 는 분리 방식 (ocr_text.split_variant)"""
+        return self.cache.get(self._key(f"split.{variant}", text))
+
+    def set_split(self, text, variant, sentences):
+        self.cache.set(self._key(f"split.{variant}", text), list(sentences))
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def create_analysis_cache(model_name, model_version):
+    """설정값으로 모델 이름/버전별 캐시 생성"""
+    disk = SQLiteCache(CACHE_DB, max_entries=DISK_ENTRIES) if CACHE_DB else None
+    return AnalysisCache(TieredCache(LRUCache(MEMORY_ENTRIES), disk), model_name,
+                         f"{model_version}+vocab.{index_version()}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """프로세스 공용 분석 캐시 (첫 사용 시 현재 모델 정보로 생성)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                info = model_info()
+                _cache = create_analysis_cache(info["name"], info["version"])
+    return _cache
@@ -0,0 +1,95 @@
+"""비동기 분석 작업
+
+/sentence 요청은 작업 ID 만 받아 바로 응답하고, 번역과 분석은 백그라운드
+스레드 풀에서 진행된다. 문장 하나가 끝날 때마다 결과를 저장소(analysis_store)에
+추가하므로 클라이언트는 SSE 나 폴링으로 앞 문장부터 받아 볼 수 있다.
+모든 문장이 끝나면 문서 전체의 절을 한 번에 번역해 절 항목에 기록한다.
+절 번역은 저장소의 문서별 상태(pending / done / failed)로 한 번만 시작하며, 상세 화면은
+번역을 기다리지 않고 translate_clauses() 로 백그라운드 번역만 요청한다.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from analysis_store import new_doc_id
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+# 분석이 끝나면 절별 번역도 미리 해 둠 (0 이면 상세 화면을 처음 열 때 번역)
+CLAUSE_TRANSLATION = os.getenv("CLAUSE_TRANSLATION", "1") == "1"
+# 절 번역이 실패한 문서를 다시 시도하기까지의 시간, 진행 중 표시를 버려진 것으로 보는 시간 (초)
+CLAUSE_RETRY_SECONDS = float(os.getenv("CLAUSE_RETRY_SECONDS", "60"))
+CLAUSE_STALE_SECONDS = float(os.getenv("CLAUSE_STALE_SECONDS", "600"))
+
+
+class AnalysisJobManager:
+    """분석 작업 실행기"""
+
+    def __init__(self, store, max_workers=JOB_WORKERS):
+        self.store = store
+        self._jobs = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit(self, doc_id, text):
+        """작업 등록 후 작업 ID 반환 (이전 작업의 결과는 버려짐)
+
+        같은 문서의 작업이 이미 실행 중이면 새 작업을 만들지 않고 그 작업 ID 를 반환한다.
+        """
+        job_id = new_doc_id()
+        running = self.store.start_job(doc_id, job_id, total=0)
+        if running != job_id:
+            return running
+        self._jobs.submit(self._run, doc_id, job_id, text)
+        return job_id
+
+    def _run(self, doc_id, job_id, text):
+        with metrics.trace("analysis_job", job_id=job_id):
+            self._run_job(doc_id, job_id, text)
+
+    def _run_job(self, doc_id, job_id, text):
+        # spaCy 를 불러오는 모듈이라 첫 작업에서 import (app 시작 시간 단축)
+        from trans_json import split_sentences, iter_analyze_split
+        try:
+            # 파싱은 하지 않고 문장만 나눔 - 캐시에 없는 문장은 묶음마다 파싱
+            sentences, analyses = split_sentences(text, parse=False)
+            self.store.set_total(doc_id, job_id, len(sentences))
+
+            # 번역은 문장 묶음 단위로 미리 요청해 두고 앞 문장부터 분석 (trans_json.iter_analyze_split)
+            results = iter_analyze_split(sentences, analyses)
+            for json_data in results:
+                if not self.store.add_result(doc_id, job_id, json_data):
+                    # 같은 문서에 새 작업이 시작됐거나 중단된 작업으로 처리됨
+                    results.close()
+                    return
+
+            self.store.finish_job(doc_id, job_id)
+        except Exception as e:
+            logger.exception("분석 작업 %s 실패", job_id)
+            self.store.finish_job(doc_id, job_id, error=str(e))
+            return
+
+        # 문장 결과가 모두 나온 뒤 문서 전체의 절을 한 번에 번역 (상세 화면에서 기다리지 않도록)
+        if CLAUSE_TRANSLATION and self._claim_clauses(doc_id):
+            self._translate_clauses(doc_id)
+
+    def translate_clauses(self, doc_id):
+        """문서의 절 번역을 백그라운드에서 시작 (이미 진행 중이거나 끝났으면 아무것도 안 함), 시작했으면 True"""
+        if not self._claim_clauses(doc_id):
+            return False
+        self._jobs.submit(self._translate_clauses, doc_id)
+        return True
+
+    def _claim_clauses(self, doc_id):
+        return self.store.claim_clause_translation(doc_id, retry_after=CLAUSE_RETRY_SECONDS,
+                                                   stale_after=CLAUSE_STALE_SECONDS)
+
+    def _translate_clauses(self, doc_id):
+        from trans_json import translate_document_clauses
+        try:
+            translate_document_clauses(self.store, doc_id)
+        except Exception as e:
+            logger.warning("문서 %s 절 번역 실패: %s", doc_id, e)
+            self.store.finish_clause_translation(doc_id, error=str(e))
+            return
+        self.store.finish_clause_translation(doc_id)
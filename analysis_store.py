@@ -0,0 +1,493 @@
+"""사용자별 OCR 텍스트 / 분석 결과 서버 저장소
+
+쿠키 세션에는 문서 ID 만 저장하고, 실제 데이터는 여기에 둔다.
+문장 상세 화면은 해당 문장 하나만 꺼내 쓴다.
+일정 시간(ttl) 동안 갱신되지 않은 문서는 삭제된다.
+
+비동기 분석 작업(analysis_jobs)의 진행 상황과 문장별 결과도 여기에 기록되므로
+진행 상황 조회는 작업을 실행 중인 프로세스가 아니어도 된다.
+문서별 절 번역 상태(clause_status: pending / done / failed)도 함께 두어, 여러 워커가
+같은 문서의 절 번역을 한 번만 시작하게 한다.
+
+작업은 문장 수 기록/결과 추가 때마다 heartbeat 시각을 남긴다. 작업을 실행하던 프로세스가 죽어
+heartbeat 가 JOB_STALE_SECONDS 넘게 멈춘 작업은 진행 상황을 조회할 때 오류로 바꾼다.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import fast_json
+
+DEFAULT_TTL = float(os.getenv("ANALYSIS_STORE_TTL", str(6 * 3600)))
+# 이 시간(초) 동안 진행이 없는 작업은 중단된 것으로 봄
+JOB_STALE_SECONDS = float(os.getenv("ANALYSIS_JOB_STALE_SECONDS", "300"))
+STALE_JOB_ERROR = "작업이 응답하지 않아 중단되었습니다."
+
+
+def new_doc_id():
+    return uuid.uuid4().hex
+
+
+def _empty_doc():
+    return {"text": None, "results": [], "job_id": None, "status": None, "total": 0, "error": None,
+            "heartbeat": 0.0, "clause_status": None, "clause_updated": 0.0}
+
+
+def _can_claim(status, updated, now, retry_after, stale_after):
+    """절 번역을 새로 시작해도 되는지 - 시작 전, 실패 후 retry_after 초, 진행 중 표시가 stale_after 초 지남"""
+    if status is None:
+        return True
+    if status == "failed":
+        return now - updated >= retry_after
+    if status == "pending":
+        return now - updated >= stale_after
+    return False
+
+
+class MemoryAnalysisStore:
+    """프로세스 메모리 저장소"""
+
+    def __init__(self, ttl=DEFAULT_TTL, stale_after=JOB_STALE_SECONDS):
+        self.ttl = ttl
+        self.stale_after = stale_after
+        # doc_id -> {"text", "results", "job_id", "status", ..., "updated"} (오래된 순서 유지)
+        self._docs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        while self._docs:
+            doc_id, doc = next(iter(self._docs.items()))
+            if now - doc["updated"] <= self.ttl:
+                break
+            del self._docs[doc_id]
+
+    def _get(self, doc_id):
+        now = time.time()
+        self._evict(now)
+        return self._docs.get(doc_id)
+
+    def _touch(self, doc_id, **fields):
+        now = time.time()
+        self._evict(now)
+        doc = self._docs.setdefault(doc_id, _empty_doc())
+        doc.update(fields, updated=now)
+        self._docs.move_to_end(doc_id)
+        return doc
+
+    def put_text(self, doc_id, text):
+        """OCR 텍스트 저장 (이전 분석 결과는 삭제)"""
+        with self._lock:
+            self._touch(doc_id, **dict(_empty_doc(), text=text))
+
+    def get_text(self, doc_id):
+        with self._lock:
+            doc = self._get(doc_id)
+            return doc["text"] if doc else None
+
+    def put_results(self, doc_id, results):
+        results = list(results)
+        with self._lock:
+            self._touch(doc_id, results=results, job_id=None, status="done",
+                        total=len(results), error=None, clause_status=None)
+
+    def _running(self, doc, job_id=None, now=None):
+        # 실행 중이고 heartbeat 가 멈추지 않은 작업인지
+        if not doc or doc["status"] != "running" or (job_id is not None and doc["job_id"] != job_id):
+            return False
+        return (now or time.time()) - doc["heartbeat"] <= self.stale_after
+
+    def start_job(self, doc_id, job_id, total):
+        """분석 작업 시작 - 이전 결과를 비우고 작업 ID 기록, 실제로 실행 중인 작업 ID 반환
+
+        같은 문서의 작업이 이미 실행 중이면 새로 시작하지 않고 그 작업 ID 를 반환한다.
+        """
+        with self._lock:
+            doc = self._get(doc_id)
+            if self._running(doc):
+                return doc["job_id"]
+            self._touch(doc_id, results=[], job_id=job_id, status="running", total=total, error=None,
+                        heartbeat=time.time(), clause_status=None)
+            return job_id
+
+    def set_total(self, doc_id, job_id, total):
+        """문장 분리 후 작업의 전체 문장 수 기록"""
+        with self._lock:
+            doc = self._get(doc_id)
+            if self._running(doc, job_id):
+                self._touch(doc_id, total=total, heartbeat=time.time())
+
+    def add_result(self, doc_id, job_id, result):
+        """작업의 다음 문장 결과 추가 (그 사이 다른 작업이 시작됐거나 중단 처리됐으면 무시)"""
+        with self._lock:
+            doc = self._get(doc_id)
+            if not self._running(doc, job_id):
+                return False
+            self._touch(doc_id, heartbeat=time.time())["results"].append(result)
+            return True
+
+    def finish_job(self, doc_id, job_id, error=None):
+        with self._lock:
+            doc = self._get(doc_id)
+            if doc and doc["job_id"] == job_id and doc["status"] == "running":
+                self._touch(doc_id, status="error" if error else "done", error=error)
+
+    def set_clause_translations(self, doc_id, updates):
+        """절별 번역 기록 - updates: {idx(1부터): (문장, [절 순서대로 번역])}
+
+        그 사이 결과가 바뀌었으면(새 작업 등) 문장이 다른 항목은 건너뛴다. 기록한 문장 수 반환
+        """
+        count = 0
+        with self._lock:
+            doc = self._get(doc_id)
+            if not doc:
+                return 0
+            results = doc["results"]
+            for idx, (sentence, translations) in updates.items():
+                if not 1 <= idx <= len(results):
+                    continue
+                result = results[idx - 1]
+                if result["sentence"] != sentence or len(result["clause_tree"]) != len(translations):
+                    continue
+                # 이미 꺼내 간 결과 dict 는 바꾸지 않도록 새 dict 로 교체
+                results[idx - 1] = dict(result, clause_tree=[
+                    dict(clause, translated=translated)
+                    for clause, translated in zip(result["clause_tree"], translations)
+                ])
+                count += 1
+        return count
+
+    def claim_clause_translation(self, doc_id, retry_after, stale_after):
+        """절 번역을 시작할 차례면 pending 으로 표시하고 True (다른 요청/워커가 이미 시작했으면 False)"""
+        with self._lock:
+            doc = self._get(doc_id)
+            now = time.time()
+            if not doc or not _can_claim(doc["clause_status"], doc["clause_updated"], now,
+                                         retry_after, stale_after):
+                return False
+            doc.update(clause_status="pending", clause_updated=now)
+            return True
+
+    def finish_clause_translation(self, doc_id, error=None):
+        with self._lock:
+            doc = self._get(doc_id)
+            if doc:
+                doc.update(clause_status="failed" if error else "done", clause_updated=time.time())
+
+    def get_clause_status(self, doc_id):
+        """절 번역 상태 (None: 시작 전, pending, done, failed)"""
+        with self._lock:
+            doc = self._get(doc_id)
+            return doc["clause_status"] if doc else None
+
+    def get_progress(self, doc_id):
+        """작업 상태 {"job_id", "status", "total", "done", "error"}, 문서가 없으면 None
+
+        heartbeat 가 멈춘 실행 중 작업은 여기서 오류로 바꾼다.
+        """
+        with self._lock:
+            doc = self._get(doc_id)
+            if not doc:
+                return None
+            if doc["status"] == "running" and not self._running(doc):
+                doc.update(status="error", error=STALE_JOB_ERROR)
+            return {"job_id": doc["job_id"], "status": doc["status"], "total": doc["total"],
+                    "done": len(doc["results"]), "error": doc["error"]}
+
+    def get_results(self, doc_id, start=0):
+        """start 번째(0부터) 이후의 문장 결과"""
+        with self._lock:
+            doc = self._get(doc_id)
+            return list(doc["results"][start:]) if doc else []
+
+    def get_sentence(self, doc_id, idx):
+        """idx 번째(1부터) 문장 분석 결과, 없으면 None"""
+        with self._lock:
+            doc = self._get(doc_id)
+            if not doc or not 1 <= idx <= len(doc["results"]):
+                return None
+            return doc["results"][idx - 1]
+
+    def get_sentences(self, doc_id):
+        """문장 텍스트 목록"""
+        with self._lock:
+            doc = self._get(doc_id)
+            return [item["sentence"] for item in doc["results"]] if doc else []
+
+
+class SQLiteAnalysisStore:
+    """SQLite 저장소 (여러 프로세스가 같은 파일을 공유할 수 있음)"""
+
+    def __init__(self, path, ttl=DEFAULT_TTL, stale_after=JOB_STALE_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " doc_id TEXT PRIMARY KEY, text TEXT, updated REAL NOT NULL,"
+            " job_id TEXT, status TEXT, total INTEGER NOT NULL DEFAULT 0, error TEXT,"
+            " heartbeat REAL NOT NULL DEFAULT 0,"
+            " clause_status TEXT, clause_updated REAL NOT NULL DEFAULT 0)"
+        )
+        # heartbeat / 절 번역 상태 열이 없던 예전 파일
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+        for column, definition in (("heartbeat", "REAL NOT NULL DEFAULT 0"), ("clause_status", "TEXT"),
+                                   ("clause_updated", "REAL NOT NULL DEFAULT 0")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE documents ADD COLUMN {column} {definition}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentences ("
+            " doc_id TEXT NOT NULL, idx INTEGER NOT NULL, sentence TEXT NOT NULL,"
+            " data TEXT NOT NULL, PRIMARY KEY (doc_id, idx))"
+        )
+        self._conn.commit()
+
+        # gunicorn preload 처럼 저장소를 만든 뒤 fork 하면 자식 프로세스는 새 연결 사용
+        # (SQLite 연결은 프로세스 간에 공유할 수 없음)
+        os.register_at_fork(after_in_child=self._reconnect)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def _reconnect(self):
+        # 부모에게서 물려받은 연결은 닫으면 부모의 잠금/WAL 상태에 영향을 줄 수 있어 그대로 둠
+        self._inherited_conn = self._conn
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _evict(self):
+        expired = time.time() - self.ttl
+        self._conn.execute(
+            "DELETE FROM sentences WHERE doc_id IN (SELECT doc_id FROM documents WHERE updated < ?)",
+            (expired,),
+        )
+        self._conn.execute("DELETE FROM documents WHERE updated < ?", (expired,))
+
+    def _alive(self, doc_id):
+        row = self._conn.execute(
+            "SELECT updated FROM documents WHERE doc_id = ?", (doc_id,)
+        ).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl
+
+    def put_text(self, doc_id, text):
+        with self._lock:
+            self._evict()
+            self._conn.execute("DELETE FROM sentences WHERE doc_id = ?", (doc_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, text, updated) VALUES (?, ?, ?)",
+                (doc_id, text, time.time()),
+            )
+            self._conn.commit()
+
+    def get_text(self, doc_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, updated FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def put_results(self, doc_id, results):
+        rows = [
+            (doc_id, i + 1, item["sentence"], fast_json.dumps(item))
+            for i, item in enumerate(results)
+        ]
+        with self._lock:
+            self._evict()
+            self._conn.execute("DELETE FROM sentences WHERE doc_id = ?", (doc_id,))
+            self._conn.executemany("INSERT INTO sentences VALUES (?, ?, ?, ?)", rows)
+            self._upsert(doc_id, job_id=None, status="done", total=len(rows), error=None, clause_status=None)
+            self._conn.commit()
+
+    def _upsert(self, doc_id, **fields):
+        fields["updated"] = time.time()
+        columns = ", ".join(fields)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in fields)
+        self._conn.execute(
+            f"INSERT INTO documents (doc_id, {columns}) VALUES (?{', ?' * len(fields)})"
+            f" ON CONFLICT(doc_id) DO UPDATE SET {updates}",
+            (doc_id, *fields.values()),
+        )
+
+    def _running_job(self, doc_id):
+        # 실행 중이고 heartbeat 가 멈추지 않은 작업 ID, 없으면 None
+        row = self._conn.execute(
+            "SELECT job_id FROM documents WHERE doc_id = ? AND status = 'running' AND heartbeat >= ?",
+            (doc_id, time.time() - self.stale_after),
+        ).fetchone()
+        return row[0] if row else None
+
+    def start_job(self, doc_id, job_id, total):
+        with self._lock:
+            # BEGIN IMMEDIATE: 두 요청이 동시에 같은 문서의 작업을 시작하지 않도록 쓰기 잠금
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                running = self._running_job(doc_id)
+                if running is not None:
+                    return running
+                self._evict()
+                self._conn.execute("DELETE FROM sentences WHERE doc_id = ?", (doc_id,))
+                self._upsert(doc_id, job_id=job_id, status="running", total=total, error=None,
+                             heartbeat=time.time(), clause_status=None)
+                return job_id
+            finally:
+                self._conn.commit()
+
+    def set_total(self, doc_id, job_id, total):
+        with self._lock:
+            if self._running_job(doc_id) == job_id:
+                self._upsert(doc_id, total=total, heartbeat=time.time())
+                self._conn.commit()
+
+    def add_result(self, doc_id, job_id, result):
+        with self._lock:
+            if self._running_job(doc_id) != job_id:
+                return False
+            self._conn.execute(
+                "INSERT INTO sentences SELECT ?, COUNT(*) + 1, ?, ? FROM sentences WHERE doc_id = ?",
+                (doc_id, result["sentence"], fast_json.dumps(result), doc_id),
+            )
+            self._upsert(doc_id, heartbeat=time.time())
+            self._conn.commit()
+            return True
+
+    def finish_job(self, doc_id, job_id, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE documents SET status = ?, error = ?, updated = ?"
+                " WHERE doc_id = ? AND job_id = ? AND status = 'running'",
+                ("error" if error else "done", error, time.time(), doc_id, job_id),
+            )
+            self._conn.commit()
+
+    def set_clause_translations(self, doc_id, updates):
+        count = 0
+        with self._lock:
+            for idx, (sentence, translations) in updates.items():
+                row = self._conn.execute(
+                    "SELECT data FROM sentences WHERE doc_id = ? AND idx = ? AND sentence = ?",
+                    (doc_id, idx, sentence),
+                ).fetchone()
+                if row is None:
+                    continue
+                result = fast_json.loads(row[0])
+                if len(result["clause_tree"]) != len(translations):
+                    continue
+                for clause, translated in zip(result["clause_tree"], translations):
+                    clause["translated"] = translated
+                self._conn.execute(
+                    "UPDATE sentences SET data = ? WHERE doc_id = ? AND idx = ?",
+                    (fast_json.dumps(result), doc_id, idx),
+                )
+                count += 1
+            self._conn.commit()
+        return count
+
+    def claim_clause_translation(self, doc_id, retry_after, stale_after):
+        with self._lock:
+            # BEGIN IMMEDIATE: 확인과 표시 사이에 다른 프로세스가 끼어들지 않도록 쓰기 잠금
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT clause_status, clause_updated, updated FROM documents WHERE doc_id = ?",
+                    (doc_id,),
+                ).fetchone()
+                now = time.time()
+                if (row is None or now - row[2] > self.ttl
+                        or not _can_claim(row[0], row[1], now, retry_after, stale_after)):
+                    return False
+                self._conn.execute(
+                    "UPDATE documents SET clause_status = 'pending', clause_updated = ? WHERE doc_id = ?",
+                    (now, doc_id),
+                )
+                return True
+            finally:
+                self._conn.commit()
+
+    def finish_clause_translation(self, doc_id, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE documents SET clause_status = ?, clause_updated = ? WHERE doc_id = ?",
+                ("failed" if error else "done", time.time(), doc_id),
+            )
+            self._conn.commit()
+
+    def get_clause_status(self, doc_id):
+        with self._lock:
+            if not self._alive(doc_id):
+                return None
+            row = self._conn.execute(
+                "SELECT clause_status FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_progress(self, doc_id):
+        with self._lock:
+            if not self._alive(doc_id):
+                return None
+            # 작업을 실행하던 프로세스가 죽어 heartbeat 가 멈춘 작업은 오류로 표시
+            # (조회마다 쓰기 잠금을 잡지 않도록 멈춘 작업이 있을 때만 UPDATE)
+            expired = time.time() - self.stale_after
+            if self._conn.execute(
+                "SELECT 1 FROM documents WHERE doc_id = ? AND status = 'running' AND heartbeat < ?",
+                (doc_id, expired),
+            ).fetchone():
+                self._conn.execute(
+                    "UPDATE documents SET status = 'error', error = ?"
+                    " WHERE doc_id = ? AND status = 'running' AND heartbeat < ?",
+                    (STALE_JOB_ERROR, doc_id, expired),
+                )
+                self._conn.commit()
+            job_id, status, total, error = self._conn.execute(
+                "SELECT job_id, status, total, error FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            done = self._conn.execute(
+                "SELECT COUNT(*) FROM sentences WHERE doc_id = ?", (doc_id,)
+            ).fetchone()[0]
+        return {"job_id": job_id, "status": status, "total": total, "done": done, "error": error}
+
+    def get_results(self, doc_id, start=0):
+        with self._lock:
+            if not self._alive(doc_id):
+                return []
+            rows = self._conn.execute(
+                "SELECT data FROM sentences WHERE doc_id = ? AND idx > ? ORDER BY idx",
+                (doc_id, start),
+            ).fetchall()
+        return [fast_json.loads(row[0]) for row in rows]
+
+    def get_sentence(self, doc_id, idx):
+        with self._lock:
+            if not self._alive(doc_id):
+                return None
+            row = self._conn.execute(
+                "SELECT data FROM sentences WHERE doc_id = ? AND idx = ?", (doc_id, idx)
+            ).fetchone()
+        return fast_json.loads(row[0]) if row else None
+
+    def get_sentences(self, doc_id):
+        with self._lock:
+            if not self._alive(doc_id):
+                return []
+            rows = self._conn.execute(
+                "SELECT sentence FROM sentences WHERE doc_id = ? ORDER BY idx", (doc_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+def create_store():
+    """ANALYSIS_STORE_DB 가 설정되어 있으면 SQLite, 아니면 메모리 저장소"""
+    path = os.getenv("ANALYSIS_STORE_DB")
+    if path:
+        return SQLiteAnalysisStore(path)
+    return MemoryAnalysisStore()
@@ -1,25 +1,114 @@
 # Render.com + Netlify: 배포 예정 방안
 # venv 환경 활성화 > source venv/bin/activate
+#
+# 실행: python app.py 또는 flask --app app run (create_app 팩토리 사용)
+# spaCy 를 불러오는 trans_json 은 실제로 분석할 때 import 하고, 모델은 앱 생성 시
+# 백그라운드 스레드에서 미리 로드한다 (MODEL_WARMUP=0 이면 끔).
+# /healthz: 프로세스 동작 여부, /readyz: 모델 로드 완료 여부 (로드 밸런서용)
 
 import os
-from trans_json import spacy_trans
-from flask import Flask, request, render_template, jsonify, url_for, redirect, session, json
-from trans_json import analyze_multiple_sentences
-from werkzeug.utils import secure_filename
+import time
+from flask import Blueprint, Flask, Response, current_app, request, render_template, jsonify, url_for, redirect, session, json, g
+from analysis_store import create_store, new_doc_id
+from analysis_jobs import AnalysisJobManager
+from image_prep import find_upload, ocr_image_path, prepare_upload, save_upload
+from ocr_backend import MAX_IMAGES, OCRError, get_ocr_backend
+from model_registry import registry
+from sentence_index import similar_sentences
 from dotenv import load_dotenv
+import metrics
 
 load_dotenv()
 
-app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'static/uploads' 
-app.secret_key = os.getenv("SECRET_KEY")
-
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-# OCR 결과 저장용 
-ocr_results = {} 
+# SSE 진행 상황 확인 간격(초)
+JOB_POLL_INTERVAL = 0.2
+# SSE 연결 하나의 최대 길이, 새 문장이 없을 때 연결 확인용 주석을 보내는 간격 (초)
+JOB_STREAM_MAX_SECONDS = float(os.getenv("JOB_STREAM_MAX_SECONDS", "600"))
+JOB_KEEPALIVE_SECONDS = 15
+
+pages = Blueprint('pages', __name__)
+
+def create_app(config=None):
+     app = Flask(__name__)
+     app.config['UPLOAD_FOLDER'] = 'static/uploads'
+     app.config['MODEL_WARMUP'] = os.getenv("MODEL_WARMUP", "1") == "1"
+     app.secret_key = os.getenv("SECRET_KEY")
+     if config:
+          app.config.update(config)
+
+     # OCR 결과 / 분석 결과 저장용 (유저별 문서 ID 로 구분, 쿠키에는 ID 만 저장)
+     store = create_store()
+     app.extensions['analysis_store'] = store
+     app.extensions['analysis_jobs'] = AnalysisJobManager(store)
+
+     app.before_request(start_request_metrics)
+     app.after_request(finish_request_metrics)
+     app.register_blueprint(pages)
+
+     if app.config['MODEL_WARMUP']:
+          start_warmup()
+     return app
+
+# 분석 모듈 import + 모델 로드를 백그라운드에서 미리 처리
+def warm_up():
+     try:
+          import trans_json  # noqa: F401
+     except Exception as e:
+          registry.error = f"trans_json import 실패: {e}"
+          raise
+     registry.warm_up()
+
+def start_warmup():
+     return registry.start_warmup(warm_up)
+
+def current_store():
+     return current_app.extensions['analysis_store']
+
+def current_jobs():
+     return current_app.extensions['analysis_jobs']
+
+# 요청 처리 시간 기록 (METRICS=1 일 때만), 느린 요청은 단계별 시간을 남김
+def start_request_metrics():
+     if metrics.ENABLED:
+          g.request_start = time.perf_counter()
+          metrics.start_trace()
+
+def finish_request_metrics(response):
+     if metrics.ENABLED and 'request_start' in g:
+          metrics.observe('request_seconds', time.perf_counter() - g.request_start,
+                          route=request.endpoint or 'unknown')
+          metrics.finish_trace(request.path, method=request.method, status=response.status_code)
+     return response
+
+@pages.route('/metrics')
+def metrics_endpoint():
+     if not metrics.ENABLED:
+          return 'metrics 비활성화 (METRICS=1 로 실행)', 404
+     return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@pages.route('/healthz')
+def healthz():
+     return jsonify({'status': 'ok'})
+
+# 모델이 로드되기 전에는 503 - 워밍업을 끈 경우 첫 요청이 로드를 시작함
+@pages.route('/readyz')
+def readyz():
+     if registry.ready:
+          return jsonify({'status': 'ready', 'engine': registry.engine,
+                          'load_seconds': registry.load_seconds})
+     if registry.error:
+          return jsonify({'status': 'error', 'error': registry.error}), 503
+     start_warmup()
+     return jsonify({'status': 'loading'}), 503
+
+def current_doc_id():
+     if 'doc_id' not in session:
+          session['doc_id'] = new_doc_id()
+     return session['doc_id']
 
 # 영 -> 한 해석 결과 저장용
 
@@ -28,11 +117,11 @@ ocr_results = {}
 #      session['translated'] = ko_text
 #      return redirect(url_for('ko_trans_page'))
 
-@app.route('/', methods=["GET", "POST"])
+@pages.route('/', methods=["GET", "POST"])
 def main():
-    return render_template('main.html', image_url=None)
+    return render_template('main.html', image_url=None, server_ocr=get_ocr_backend() is not None)
 
-@app.route('/upload_image', methods=["POST"])
+@pages.route('/upload_image', methods=["POST"])
 def upload_image():
     if 'image' not in request.files:
          return jsonify({'error': '이미지 파일이 없습니다.'}), 400
@@ -40,36 +129,82 @@ def upload_image():
     file = request.files['image']
 
     if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(save_path)
+            # 내용 해시로 저장 (같은 이미지는 한 번만 저장/전처리), OCR 은 전처리한 이미지로
+            ext = file.filename.rsplit('.', 1)[1].lower()
+            saved = prepare_upload(file.stream, current_app.config['UPLOAD_FOLDER'], ext)
+
+            image_url = url_for('static', filename=f"uploads/{os.path.basename(saved['path'])}")
+            ocr_url = url_for('static', filename=f"uploads/{os.path.basename(saved['ocr_path'])}")
+            return jsonify({'image_url': image_url, 'ocr_url': ocr_url, 'hash': saved['hash'],
+                            'reused': saved['reused']})
 
-            image_url = url_for('static', filename=f'uploads/{filename}')
-            return jsonify({'image_url': image_url})
+    return jsonify({'error': '지원하지 않는 파일 형식입니다.'}), 400
 
-@app.route('/send_ocr_result', methods=["POST"])
+@pages.route('/send_ocr_result', methods=["POST"])
 def send_ocr_result():
      data = request.get_json()
      text = data.get('text', '')
-     # 임시 저장 (유저별로 관리하려면 세션 등을 추가 사용)
-     ocr_results['text'] = text
+     current_store().put_text(current_doc_id(), text)
      return jsonify({'status': 'success'})
 
-@app.route('/ocr_result')
+# 서버 OCR (OCR_BACKEND=tesseract) - 여러 페이지를 동시에 OCR 해 send_ocr_result 처럼 저장
+# multipart 의 images 파일들, 또는 JSON {"images": [업로드 응답의 hash, ...]} (이미 올린 이미지)
+@pages.route('/api/ocr', methods=["POST"])
+def api_ocr():
+     backend = get_ocr_backend()
+     if backend is None:
+          return jsonify({'error': '서버 OCR 을 사용할 수 없습니다.', 'fallback': 'client'}), 503
+
+     folder = current_app.config['UPLOAD_FOLDER']
+     uploads = []
+     files = request.files.getlist('images')
+     if files:
+          for file in files:
+               if not allowed_file(file.filename):
+                    return jsonify({'error': f'지원하지 않는 파일 형식입니다: {file.filename}'}), 400
+               content_hash, path, _ = save_upload(file.stream, folder, file.filename.rsplit('.', 1)[1].lower())
+               uploads.append((path, ocr_image_path(folder, content_hash)))
+     else:
+          data = request.get_json(silent=True) or {}
+          hashes = data.get('images')
+          if not isinstance(hashes, list):
+               return jsonify({'error': 'images 가 없습니다.'}), 400
+          for content_hash in hashes:
+               path = find_upload(folder, content_hash, ALLOWED_EXTENSIONS)
+               if path is None:
+                    return jsonify({'error': f'업로드된 이미지를 찾을 수 없습니다: {content_hash}'}), 400
+               uploads.append((path, ocr_image_path(folder, content_hash)))
+
+     if not uploads or len(uploads) > MAX_IMAGES:
+          return jsonify({'error': f'이미지는 1~{MAX_IMAGES}장이어야 합니다.'}), 400
+
+     try:
+          with metrics.stage('ocr'):
+               results = backend.ocr_pages(uploads)
+     except OCRError as e:
+          return jsonify({'error': str(e), 'fallback': 'client'}), 502
+
+     text = '\n\n'.join(result['text'].strip() for result in results if result['text'].strip())
+     current_store().put_text(current_doc_id(), text)
+     return jsonify({'status': 'success', 'text': text,
+                     'pages': [{'chars': len(result['text']), 'seconds': round(result['seconds'], 3),
+                                'cached': result['cached']} for result in results]})
+
+@pages.route('/ocr_result')
 def ocr_result():
-     text = ocr_results.get('text', '변환된 텍스트가 없습니다.')
+     text = current_store().get_text(current_doc_id()) or '변환된 텍스트가 없습니다.'
      return render_template('ocr_result.html', ocr_text=text)
 
 # ocr_result 값이 수정되었을 때 재할당
-@app.route('/ocr_result_modify', methods=["POST"])
+@pages.route('/ocr_result_modify', methods=["POST"])
 def ocr_result_modify():
      data = request.get_json()
      text = data.get('text', '')
-     ocr_results['text'] = text
+     current_store().put_text(current_doc_id(), text)
      return jsonify({'status': 'success'})
 
 # ocr_result 값을 바탕으로 spacy 분석 시작
-# @app.route('/spacy_analy')
+# @pages.route('/spacy_analy')
 # def spacy_analy():
 #      text = ocr_results.get('text', '수정된 텍스트가 없습니다.')
 #      result = spacy_trans(text)
@@ -80,40 +215,161 @@ def join_translated_senteces(final_result):
      joined_text = " ".join(translated_list)
      return joined_text
 
-@app.route('/sentence')
+@pages.route('/sentence')
 def sentence():
-     text = ocr_results.get('text', '변환된 텍스트가 없습니다.')
+     doc_id = current_doc_id()
+     text = current_store().get_text(doc_id) or '변환된 텍스트가 없습니다.'
+
+     # 기본은 비동기 작업 - 페이지는 바로 응답하고 문장별 결과는 /jobs/<job_id>/events 로 받음
+     if request.args.get('sync') != '1':
+          job_id = current_jobs().submit(doc_id, text)
+          return render_template('ko_trans_page.html', translated='', sentences=[], job_id=job_id)
+
+     from trans_json import analyze_multiple_sentences
      final_result = analyze_multiple_sentences(text)
 
-     session['analysis'] = json.dumps(final_result["results"])
+     current_store().put_results(doc_id, final_result["results"])
 
      translated_text = join_translated_senteces(final_result)
      sentence_list = [item["sentence"] for item in final_result["results"]]
      return render_template('ko_trans_page.html', translated=translated_text, sentences=sentence_list)
 
-@app.route('/sentence/<int:idx>')
+def job_summary(item):
+     return {'sentence_number': item['sentence_number'], 'sentence': item['sentence'],
+             'translated': item.get('translated', '')}
+
+# 분석 작업 진행 상황 (폴링) - after: 이미 받은 문장 수
+@pages.route('/jobs/<job_id>')
+def job_status(job_id):
+     doc_id = current_doc_id()
+     progress = current_store().get_progress(doc_id)
+     if not progress or progress['job_id'] != job_id:
+          return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+
+     after = request.args.get('after', 0, type=int)
+     results = [job_summary(item) for item in current_store().get_results(doc_id, after)]
+     return jsonify(dict(progress, results=results))
+
+# 분석 작업 진행 상황 (Server-Sent Events) - 문장 하나가 끝날 때마다 sentence 이벤트 전송
+@pages.route('/jobs/<job_id>/events')
+def job_events(job_id):
+     doc_id = current_doc_id()
+     # 응답 스트리밍 중에는 앱 컨텍스트가 없으므로 저장소를 미리 꺼내 둠
+     store = current_store()
+
+     # EventSource 가 다시 연결하면 마지막으로 받은 이벤트 id(문장 위치, 1부터)를 보내므로 그다음부터 전송
+     try:
+          start = max(int(request.headers.get('Last-Event-ID', 0)), 0)
+     except ValueError:
+          start = 0
+
+     def generate():
+          sent = start
+          # 작업이 끝나지 않아도 연결이 서버 스레드를 무한정 붙잡지 않도록 길이 제한
+          deadline = time.monotonic() + JOB_STREAM_MAX_SECONDS
+          last_sent = time.monotonic()
+          while True:
+               progress = store.get_progress(doc_id)
+               if not progress or progress['job_id'] != job_id:
+                    yield 'event: failed\ndata: {"error": "작업을 찾을 수 없습니다."}\n\n'
+                    return
+
+               for item in store.get_results(doc_id, sent):
+                    sent += 1
+                    last_sent = time.monotonic()
+                    yield f"id: {sent}\nevent: sentence\ndata: {json.dumps(dict(job_summary(item), idx=sent))}\n\n"
+
+               if progress['status'] == 'done':
+                    yield f"event: done\ndata: {json.dumps(progress)}\n\n"
+                    return
+               if progress['status'] == 'error':
+                    yield f"event: failed\ndata: {json.dumps(progress)}\n\n"
+                    return
+               now = time.monotonic()
+               if now >= deadline:
+                    yield 'event: error\ndata: {"error": "분석이 너무 오래 걸립니다. 잠시 후 다시 시도해 주세요."}\n\n'
+                    return
+               # 끊긴 클라이언트는 쓰기가 실패해 스트림이 닫힘
+               if now - last_sent >= JOB_KEEPALIVE_SECONDS:
+                    last_sent = now
+                    yield ": keepalive\n\n"
+               time.sleep(JOB_POLL_INTERVAL)
+
+     return Response(generate(), mimetype='text/event-stream',
+                     headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@pages.route('/sentence/<int:idx>')
 def sentence_detail(idx):
-     analysis_json = session.get('analysis')
-     if not analysis_json:
+     doc_id = current_doc_id()
+     result = current_store().get_sentence(doc_id, idx)
+     if result is None:
           return "spaCy 분석 결과를 찾을 수 없음", 400
-     
-     analysis_data = json.loads(analysis_json)
 
-     sentence_list = [item["sentence"] for item in analysis_data]
-     result = analysis_data[idx - 1]
-     print(result)
-     return render_template('sentence_detail.html', result=result, idx=idx, sentences=sentence_list)
+     # 절별 번역이 아직 없으면 기다리지 않고 지금 저장된 결과를 보여 줌 (템플릿은 번역 중 표시)
+     # 분석 작업이 끝난 문서면 문서 전체의 절 번역을 백그라운드에서 한 번만 시작
+     # (진행 중인 작업은 끝날 때 직접 번역함)
+     clause_status = None
+     if any('translated' not in clause for clause in result['clause_tree']):
+          progress = current_store().get_progress(doc_id)
+          if progress and progress['status'] != 'running':
+               current_jobs().translate_clauses(doc_id)
+          clause_status = current_store().get_clause_status(doc_id) or 'pending'
+
+     sentence_list = current_store().get_sentences(doc_id)
+
+     # 이전에 분석한 다른 문서의 비슷한 예문 (단어 벡터가 있는 모델일 때만)
+     with metrics.stage('similar_sentences'):
+          similar = similar_sentences(result['sentence'], exclude=sentence_list)
+     return render_template('sentence_detail.html', result=result, idx=idx, sentences=sentence_list,
+                            similar=similar, clause_status=clause_status)
+
+
+# 문장별 분석 결과를 끝나는 대로 한 줄씩 전송 (NDJSON)
+# 요청 본문에 text 가 없으면 현재 사용자의 OCR 텍스트를 사용
+@pages.route('/api/analyze_stream', methods=["GET", "POST"])
+def api_analyze_stream():
+     data = request.get_json(silent=True) or {}
+     text = data.get('text')
+     if text is None:
+          text = current_store().get_text(current_doc_id())
+     if not isinstance(text, str) or not text.strip():
+          return jsonify({'error': '분석할 텍스트가 없습니다.'}), 400
+
+     from trans_json import iter_ndjson
+     return Response(iter_ndjson(text), mimetype='application/x-ndjson',
+                     headers={'X-Accel-Buffering': 'no'})
+
+
+# 여러 텍스트(학습지 묶음)를 한 번에 분석
+@pages.route('/api/analyze_batch', methods=["POST"])
+def api_analyze_batch():
+     from trans_json import analyze_batch, BATCH_MAX_PROCESSES, DEFAULT_BATCH_SIZE
+     data = request.get_json(silent=True) or {}
+     texts = data.get('texts')
+     if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+          return jsonify({'error': 'texts 는 문자열 리스트여야 합니다.'}), 400
+
+     try:
+          batch_size = max(1, int(data.get('batch_size', DEFAULT_BATCH_SIZE)))
+          # 프로세스 수는 서버 설정(BATCH_MAX_PROCESSES)까지만 허용
+          n_process = min(max(1, int(data.get('n_process', 1))), BATCH_MAX_PROCESSES)
+     except (TypeError, ValueError):
+          return jsonify({'error': 'batch_size, n_process 는 정수여야 합니다.'}), 400
+
+     results = analyze_batch(texts, batch_size=batch_size, n_process=n_process,
+                             translate=bool(data.get('translate', False)))
+     return jsonify({'results': results})
 
 
-# @app.route('/final_result')
+# @pages.route('/final_result')
 # def final_result():
 #      text = ocr_results.get('text', '수정된 텍스트가 없습니다.')
 #      return render_template('final_result.html', ocr_text=text)
 
      
-# @app.route("/all_sentences.json")
+# @pages.route("/all_sentences.json")
 # def data():
 #      return send_from_directory("static", "all_sentences.json")
 
 if __name__ == '__main__':
-    app.run('0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    create_app().run('0.0.0.0', port=8000, debug=True)
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""Doc.to_array 기반 절 분석 엔진
+
+EnhancedClauseParser 와 같은 결과를 내지만, 토큰 객체를 하나씩 돌며 dep_/pos_/tag_
+문자열을 비교하는 대신 문서당 한 번 HEAD, DEP, POS, TAG 등을 NumPy 배열로 뽑아
+정수 ID 마스크와 벡터 연산으로 절 경계, 주어/동사, 접속 구조를 찾는다.
+결과에 들어가는 Token 은 필요한 것만 doc[i] 로 만든다.
+
+model_registry 에서 NLP_ENGINE=array 로 선택한다.
+"""
+import threading
+import weakref
+
+import numpy as np
+from spacy.attrs import HEAD, DEP, POS, TAG, ORTH, IDX, LENGTH
+from spacy.symbols import IDS
+
+from analy import CLAUSE_DEPS, ClauseNode, EnhancedClauseParser, _offset
+
+# 종속절 의존 관계 -> (절 종류, 역할)
+SUBORDINATE_TYPES = {
+    "relcl": ("relative", "relative_clause"),
+    "advcl": ("adverbial", "adverbial_clause"),
+    "ccomp": ("nominal", "nominal_clause"),
+    "xcomp": ("nominal", "nominal_clause"),
+    "acl": ("adjectival", "adjectival_clause"),
+}
+
+
+class DocArrays:
+    """문서 전체의 토큰 속성 배열, 속성 마스크, '첫 번째 자식' 검색용 정렬 키
+
+    head 는 문서 기준 절대 인덱스. 마스크는 문서당 한 번만 계산하고 문장 Span 은
+    잘라서 쓴다. 자식 검색 키는 head * n + i 를 정렬한 배열로,
+    head h 의 [lo, hi) 구간 자식 중 첫 번째를 searchsorted 한 번으로 찾는다.
+    """
+
+    def __init__(self, doc, ids):
+        # 속성 값은 uint64 해시, HEAD 는 상대 위치(음수가 uint64 로 저장됨)
+        arr = doc.to_array([HEAD, DEP, POS, TAG, ORTH, IDX, LENGTH])
+        n = len(doc)
+        self.n = n
+        self.index = np.arange(n, dtype="int64")
+        self.head = self.index + arr[:, 0].astype("int64")
+        self.dep = arr[:, 1]
+        self.pos = arr[:, 2]
+        self.tag = arr[:, 3]
+        orth = arr[:, 4]
+        self.char_start = arr[:, 5].astype("int64")
+        self.char_end = self.char_start + arr[:, 6].astype("int64")
+
+        self.is_root = self.dep == ids["ROOT"]
+        self.is_clause = np.isin(self.dep, ids["clause_deps"])
+        self.is_mark = self.dep == ids["mark"]
+        self.is_verb = self.pos == ids["VERB"]
+        # 주절 동사 후보: ROOT 또는 ccomp/xcomp 인 VERB
+        self.is_main_verb = self.is_root | (self.is_verb & np.isin(self.dep, ids["main_verb_deps"]))
+        # head 와 품사가 같은 conj
+        self.is_coord = (self.dep == ids["conj"]) & (self.pos == self.pos[self.head])
+
+        is_child = self.head != self.index
+        subject = np.isin(self.dep, ids["subject_deps"])
+        connector = (self.is_mark | np.isin(self.pos, ids["connector_pos"])
+                     | np.isin(self.tag, ids["connector_tags"]))
+
+        self.subject_keys = self._child_keys(is_child & subject)
+        self.verb_keys = self._child_keys(is_child & self.is_verb)
+        self.connector_keys = self._child_keys(is_child & connector)
+        self.cc_keys = self._child_keys(is_child & (self.dep == ids["cc"]))
+        self.commas = np.flatnonzero(orth == ids[","])
+
+    def _child_keys(self, mask):
+        children = np.flatnonzero(mask)
+        return np.sort(self.head[children] * self.n + children)
+
+    def first_child(self, keys, head, lo=0, hi=None):
+        """head 의 자식 중 인덱스가 [lo, hi) 인 첫 번째 토큰 인덱스, 없으면 None"""
+        if hi is None:
+            hi = self.n
+        if lo >= hi:
+            return None
+        base = head * self.n
+        pos = np.searchsorted(keys, base + lo)
+        if pos < len(keys) and keys[pos] < base + hi:
+            return int(keys[pos] - base)
+        return None
+
+
+# Doc 별 배열 (한 페이지의 여러 문장 Span 이 같은 배열을 공유)
+_doc_arrays = weakref.WeakKeyDictionary()
+_doc_arrays_lock = threading.Lock()
+
+
+class ArrayClauseParser(EnhancedClauseParser):
+    """배열 연산 기반 절 구조 파서 (EnhancedClauseParser 와 결과 동일)"""
+
+    def __init__(self, nlp):
+        super().__init__(nlp)
+        strings = nlp.vocab.strings
+        # DEP/TAG/ORTH 는 문자열 해시, POS 는 심볼 ID
+        self.ids = {
+            "ROOT": strings.add("ROOT"),
+            "mark": strings.add("mark"),
+            "cc": strings.add("cc"),
+            "conj": strings.add("conj"),
+            "VB": strings.add("VB"),
+            ",": strings.add(","),
+            "VERB": IDS["VERB"],
+            "clause_deps": np.array([strings.add(d) for d in CLAUSE_DEPS], dtype="uint64"),
+            "main_verb_deps": np.array([strings.add(d) for d in ("ccomp", "xcomp")], dtype="uint64"),
+            "subject_deps": np.array([strings.add(d) for d in ("nsubj", "nsubjpass")], dtype="uint64"),
+            "connector_pos": np.array([IDS["SCONJ"], IDS["CCONJ"]], dtype="uint64"),
+            "connector_tags": np.array([strings.add(t) for t in ("WDT", "WP", "WRB")], dtype="uint64"),
+        }
+        self.dep_names = {strings.add(d): d for d in SUBORDINATE_TYPES}
+
+    def _arrays(self, doc):
+        root_doc = doc.doc
+        with _doc_arrays_lock:
+            arrays = _doc_arrays.get(root_doc)
+        if arrays is None:
+            arrays = DocArrays(root_doc, self.ids)
+            with _doc_arrays_lock:
+                _doc_arrays[root_doc] = arrays
+        return arrays
+
+    def _clause_owners(self, doc):
+        """토큰별 소속 절 head (span 기준, -1: 없음)을 포인터 점프로 한 번에 계산
+
+        반환: (문서 배열, 주절 root 인덱스 또는 None, owner 배열)
+        """
+        arrays = self._arrays(doc)
+        offset = _offset(doc)
+        n = len(doc)
+        local = arrays.index[:n]
+        heads = arrays.head[offset:offset + n] - offset
+
+        roots = np.flatnonzero(arrays.is_root[offset:offset + n])
+        root_idx = int(roots[0]) if len(roots) else None
+
+        clause_head = arrays.is_clause[offset:offset + n].copy()
+        if root_idx is not None:
+            clause_head[root_idx] = True
+        mark = ~clause_head & arrays.is_mark[offset:offset + n]
+        # span 밖을 가리키거나 자기 자신이 head 인 토큰(다른 문장의 root)도 절 head
+        outside = (heads == local) | (heads < 0) | (heads >= n)
+        stop = clause_head | mark | outside
+
+        pointer = np.where(stop, local, heads)
+        for _ in range(max(1, int(n).bit_length()) + 1):
+            jumped = pointer[pointer]
+            if np.array_equal(jumped, pointer):
+                break
+            pointer = jumped
+        if not stop[pointer].all():
+            raise ValueError("의존 트리에 순환이 있습니다.")
+
+        owner = np.where(mark[pointer], -1, pointer)
+        return arrays, root_idx, owner
+
+    def identify_main_clauses(self, doc, owners=None):
+        """주절 식별"""
+        _, root_idx, owner = owners or self._clause_owners(doc)
+        if root_idx is None:
+            return []
+
+        indices = np.flatnonzero(owner == root_idx)
+        # 연속된 인덱스 구간별로 주절 분리
+        breaks = np.flatnonzero(np.diff(indices) > 1)
+        starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+        ends = np.concatenate((indices[breaks], [indices[-1]])) + 1
+        return [(int(s), int(e)) for s, e in zip(starts, ends)]
+
+    def identify_subordinate_clauses(self, doc, owners=None):
+        """종속절 식별"""
+        arrays, _, owner = owners or self._clause_owners(doc)
+        offset = _offset(doc)
+        n = len(doc)
+
+        # 절 head 별 첫/마지막 토큰 위치
+        valid = np.flatnonzero(owner >= 0)
+        heads, first = np.unique(owner[valid], return_index=True)
+        _, last = np.unique(owner[valid][::-1], return_index=True)
+        start_of = dict(zip(heads.tolist(), valid[first].tolist()))
+        end_of = dict(zip(heads.tolist(), (valid[len(valid) - 1 - last] + 1).tolist()))
+
+        dep = arrays.dep[offset:offset + n]
+        subordinate_clauses = []
+        for i in np.flatnonzero(arrays.is_clause[offset:offset + n]).tolist():
+            if i not in start_of:
+                continue
+            token = doc[i]
+            absolute = i + offset
+            connector = arrays.first_child(arrays.connector_keys, absolute)
+            head = int(arrays.head[absolute])
+            subordinate_clauses.append({
+                "start": start_of[i],
+                "end": end_of[i],
+                "head": token,
+                "type": SUBORDINATE_TYPES[self.dep_names[int(dep[i])]][0],
+                "connector": token.doc[connector] if connector is not None else None,
+                "parent_idx": head - offset if head != absolute else None
+            })
+
+        return subordinate_clauses
+
+    def build_clause_tree(self, doc):
+        """문장의 절 구조 트리 구축"""
+        owners = self._clause_owners(doc)
+        arrays = owners[0]
+        offset = _offset(doc)
+        n = len(doc)
+        text = doc.doc.text
+
+        def clause_text(start, end):
+            return text[arrays.char_start[start + offset]:arrays.char_end[end - 1 + offset]]
+
+        def subject_of(verb_i):
+            if verb_i is None:
+                return None
+            return arrays.first_child(arrays.subject_keys, verb_i)
+
+        # 주절 동사 후보 (span 기준 위치, 오름차순)
+        main_verbs = np.flatnonzero(arrays.is_main_verb[offset:offset + n])
+
+        all_clauses = []
+
+        # 주절 추가
+        for start, end in self.identify_main_clauses(doc, owners):
+            k = np.searchsorted(main_verbs, start)
+            main_verb_i = int(main_verbs[k]) + offset if k < len(main_verbs) and main_verbs[k] < end else None
+
+            clause = ClauseNode(
+                start_idx=start,
+                end_idx=end,
+                text=clause_text(start, end),
+                clause_type="main",
+                main_verb_i=main_verb_i,
+                subject_i=subject_of(main_verb_i)
+            )
+            clause.role = "main"
+            all_clauses.append(clause)
+
+        # 종속절 추가
+        for sc in self.identify_subordinate_clauses(doc, owners):
+            head = sc["head"]
+            main_verb_i = head.i if arrays.is_verb[head.i] else None
+            if main_verb_i is None:
+                # 절 구간 안에 있는 head 의 첫 번째 동사 자식
+                main_verb_i = arrays.first_child(arrays.verb_keys, head.i,
+                                                 sc["start"] + offset, sc["end"] + offset)
+
+            clause = ClauseNode(
+                start_idx=sc["start"],
+                end_idx=sc["end"],
+                text=clause_text(sc["start"], sc["end"]),
+                clause_type=sc["type"],
+                main_verb_i=main_verb_i,
+                subject_i=subject_of(main_verb_i)
+            )
+            clause.connector_i = sc["connector"].i if sc["connector"] is not None else None
+            clause.role = SUBORDINATE_TYPES[head.dep_][1]
+            all_clauses.append(clause)
+
+        # 절 간의 계층 구조 설정
+        self._assign_parents(all_clauses)
+
+        return all_clauses
+
+    def resolve_zero_pronouns(self, doc, clause_tree):
+        """생략된 주어 추론"""
+        arrays = self._arrays(doc)
+        tokens = doc.doc
+        implied_subjects = {}
+
+        for clause in clause_tree:
+            if clause.main_verb_i is not None and clause.subject_i is None:
+                main_verb = tokens[clause.main_verb_i]
+                if arrays.tag[clause.main_verb_i] == self.ids["VB"] and clause.start_idx == 0:
+                    implied_subjects[main_verb] = "you (implied in imperative)"
+                    continue
+
+                if clause.parent and clause.parent.subject_i is not None:
+                    implied_subjects[main_verb] = f"{tokens[clause.parent.subject_i].text} (implied from parent clause)"
+
+        return implied_subjects
+
+    def identify_coordination(self, doc):
+        """접속 구조 식별"""
+        arrays = self._arrays(doc)
+        offset = _offset(doc)
+        n = len(doc)
+        root_doc = doc.doc
+
+        coord_structures = []
+        for i in (offset + np.flatnonzero(arrays.is_coord[offset:offset + n])).tolist():
+            head = int(arrays.head[i])
+            # head 와 자신 사이의 cc 형제, 없으면 그 사이의 첫 쉼표
+            idx = arrays.first_child(arrays.cc_keys, head, head + 1, i)
+            if idx is None and head + 1 < i:
+                k = np.searchsorted(arrays.commas, head + 1)
+                if k < len(arrays.commas) and arrays.commas[k] < i:
+                    idx = int(arrays.commas[k])
+
+            token = root_doc[i]
+            coord_structures.append({
+                "type": token.pos_,
+                "first": root_doc[head],
+                "conjunction": root_doc[idx] if idx is not None else None,
+                "second": token
+            })
+
+        return coord_structures
@@ -0,0 +1,58 @@
+"""analyze_batch 처리량 벤치마크
+
+output.json / templates/all_sentences.json 의 문장으로 학습지 묶음을 만들어
+n_process 별 처리량(코어 당 문장/초)을 출력한다.
+
+n_process 는 BATCH_MAX_PROCESSES 까지만 쓰이므로 환경 변수로 함께 올려 준다.
+
+사용법: BATCH_MAX_PROCESSES=4 python bench/bench_batch.py [--texts 200] [--batch-size 64] [--n-process 1 2 4]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from model_registry import get_nlp
+from trans_json import BATCH_MAX_PROCESSES, analyze_batch
+
+
+def load_texts(count):
+    sentences = []
+    for path in ("output.json", os.path.join("templates", "all_sentences.json")):
+        with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+            sentences.extend(item["sentence"] for item in json.load(f)["results"])
+
+    # 문장 3개씩 묶어 한 텍스트(학습지 한 문단)로 사용
+    texts = []
+    for i in range(count):
+        texts.append(" ".join(sentences[(i + k) % len(sentences)] for k in range(3)))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    texts = load_texts(args.texts)
+    get_nlp()  # 모델 로드 시간은 제외
+
+    print(f"{'n_process':>9} {'sec':>8} {'sent/s':>9} {'sent/s/core':>12}")
+    for n_process in sorted({min(n, BATCH_MAX_PROCESSES) for n in args.n_process}):
+        start = time.perf_counter()
+        results = analyze_batch(texts, batch_size=args.batch_size, n_process=n_process)
+        elapsed = time.perf_counter() - start
+
+        n_sentences = sum(r["total_sentences"] for r in results)
+        rate = n_sentences / elapsed
+        print(f"{n_process:>9} {elapsed:>8.2f} {rate:>9.1f} {rate / n_process:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
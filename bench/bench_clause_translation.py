@@ -0,0 +1,120 @@
+"""절별 번역 벤치마크
+
+output.json / templates/all_sentences.json 의 페이지를 분석한 문서에서, 문장 상세 화면을
+차례로 열 때의 번역 요청 수와 화면당 대기 시간을 비교한다. 번역은 지연을 준 로컬 stub
+번역 서버를 사용하고, 방식마다 번역 캐시를 비운 상태에서 시작한다.
+
+  per-clause : 상세 화면마다 그 문장의 절을 하나씩 번역 (ko_trans)
+  document   : 문서 전체의 절을 중복 제거 후 한 번에 번역 (translate_document_clauses),
+               상세 화면은 저장된 번역만 읽음 - 분석 작업 끝에 실행하는 시간은 따로 표시
+
+사용법: python bench/bench_clause_translation.py [--latency 0.05]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ["TRANSLATION_CACHE_DB"] = ""
+
+import translate_client
+import translate_ko
+from analysis_store import MemoryAnalysisStore
+from model_registry import get_nlp, get_parser
+from trans_json import clean_clause, convert_to_json_format, translate_document_clauses
+from translate_stub import start_stub
+
+SOURCES = [
+    os.path.join(ROOT, "output.json"),
+    os.path.join(ROOT, "templates", "all_sentences.json"),
+]
+
+
+def analyzed_documents():
+    """페이지별 문장 분석 결과 (절 번역 없음)"""
+    nlp, parser = get_nlp(), get_parser()
+    documents = []
+    for path in SOURCES:
+        with open(path, encoding="utf-8") as f:
+            text = " ".join(item["sentence"] for item in json.load(f)["results"])
+        documents.append([
+            dict(convert_to_json_format(parser.analyze_span(sent)), sentence_number=i + 1)
+            for i, sent in enumerate(nlp(text).sents)
+        ])
+    return documents
+
+
+def reset_translation(url, stats):
+    translate_ko._cache = None
+    translate_client._default_client = translate_client.TranslationClient(url)
+    stats.requests = stats.sentences = 0
+
+
+def per_clause(store, doc_id, count):
+    """상세 화면마다 절을 하나씩 번역, 화면별 대기 시간 (초)"""
+    waits = []
+    for idx in range(1, count + 1):
+        start = time.perf_counter()
+        result = store.get_sentence(doc_id, idx)
+        for clause in result["clause_tree"]:
+            text = clean_clause(clause["text"])
+            clause["translated"] = translate_ko.ko_trans(text) if text else ""
+        waits.append(time.perf_counter() - start)
+    return waits
+
+
+def document(store, doc_id, count):
+    """문서 전체 절을 한 번에 번역한 뒤 화면을 엶, (번역 시간, 화면별 대기 시간)"""
+    start = time.perf_counter()
+    translate_document_clauses(store, doc_id)
+    batch_time = time.perf_counter() - start
+    waits = []
+    for idx in range(1, count + 1):
+        start = time.perf_counter()
+        store.get_sentence(doc_id, idx)
+        waits.append(time.perf_counter() - start)
+    return batch_time, waits
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="stub 번역 서버 요청당 지연 (초)")
+    args = arg_parser.parse_args()
+
+    server, url, stats = start_stub(latency=args.latency)
+    try:
+        documents = analyzed_documents()
+        clauses = sum(len(result["clause_tree"]) for results in documents for result in results)
+        unique = len({clean_clause(clause["text"]) for results in documents for result in results
+                      for clause in result["clause_tree"]} - {""})
+        sentences = sum(len(results) for results in documents)
+        print(f"문서 {len(documents)}개, 문장 {sentences}개, 절 {clauses}개 (번역할 고유 절 {unique}개), "
+              f"stub 지연 {args.latency * 1000:.0f} ms")
+        print(f"{'방식':<12} {'요청 수':>7} {'분석 후 번역 ms':>15} {'화면 평균 ms':>12} {'화면 최대 ms':>12}")
+
+        for name in ("per-clause", "document"):
+            reset_translation(url, stats)
+            store = MemoryAnalysisStore()
+            batch_total = 0.0
+            waits = []
+            for i, results in enumerate(documents):
+                store.put_results(str(i), json.loads(json.dumps(results)))
+                if name == "per-clause":
+                    waits += per_clause(store, str(i), len(results))
+                else:
+                    batch_time, doc_waits = document(store, str(i), len(results))
+                    batch_total += batch_time
+                    waits += doc_waits
+            print(f"{name:<12} {stats.requests:>7} {batch_total * 1000:>15.0f} "
+                  f"{sum(waits) / len(waits) * 1000:>12.2f} {max(waits) * 1000:>12.2f}")
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
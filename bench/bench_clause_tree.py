@@ -0,0 +1,300 @@
+"""build_clause_tree 벤치마크 (긴 법률/학술 문장)
+
+절이 여러 겹 내포된 긴 문장을 만들어, 이전 구현(토큰 재귀 수집 + 모든 절 쌍 비교)과
+현재 구현(절별 토큰 분류 + 구간 스택)의 실행 시간을 비교하고 결과가 같은지 확인한다.
+
+사용법: python bench/bench_clause_tree.py [--depths 2 4 8 16] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from model_registry import get_nlp, get_parser
+from analy import EnhancedClauseParser, _offset
+
+SUBJECTS = ["the committee", "the court", "the researchers", "the applicant", "the author",
+            "the tenant", "the reviewers", "the agency"]
+VERBS = ["argued", "found", "concluded", "claimed", "observed", "noted", "stated", "suggested"]
+OBJECTS = ["the evidence", "the contract", "the data", "the results", "the regulation",
+           "the proposal", "the findings", "the agreement"]
+CONNECTORS = ["that", "because", "although", "when", "which", "who"]
+
+
+def make_sentence(depth, rng):
+    """depth 겹의 종속절/관계절이 내포된 문장"""
+    parts = [rng.choice(SUBJECTS).capitalize(), rng.choice(VERBS)]
+    for _ in range(depth):
+        connector = rng.choice(CONNECTORS)
+        if connector in {"which", "who"}:
+            parts += [rng.choice(OBJECTS), connector, rng.choice(VERBS), rng.choice(OBJECTS)]
+        else:
+            parts += [connector, rng.choice(SUBJECTS), rng.choice(VERBS)]
+    parts.append(rng.choice(OBJECTS))
+    return " ".join(parts) + "."
+
+
+class LegacyClauseNode:
+    """이전 절 노드: __dict__ 기반, 동사/주어/접속어를 Token 으로 저장"""
+    def __init__(self, start_idx, end_idx, text, clause_type, main_verb=None, subject=None):
+        self.start_idx = start_idx
+        self.end_idx = end_idx
+        self.text = text
+        self.type = clause_type
+        self.main_verb = main_verb
+        self.subject = subject
+        self.parent = None
+        self.children = []
+        self.depth = 0
+        self.role = None
+        self.connector = None
+
+
+class LegacyClauseParser(EnhancedClauseParser):
+    """이전 구현: 절마다 토큰을 재귀로 모아 정렬하고, parent 는 모든 절과 비교"""
+
+    def identify_main_clauses(self, doc):
+        """주절 식별"""
+        root = None
+        for token in doc:
+            if token.dep_ == "ROOT":
+                root = token
+                break
+        
+        if not root:
+            return []
+        
+        main_clause_tokens = [root] + list(self._get_clause_tokens(root))
+        main_clause_indices = sorted([t.i - _offset(doc) for t in main_clause_tokens])
+        
+        main_clauses = []
+        current_indices = []
+        
+        for i, idx in enumerate(main_clause_indices):
+            if i > 0 and idx > main_clause_indices[i-1] + 1:
+                if current_indices:
+                    start_idx = min(current_indices)
+                    end_idx = max(current_indices) + 1
+                    main_clauses.append((start_idx, end_idx))
+                current_indices = [idx]
+            else:
+                current_indices.append(idx)
+        
+        if current_indices:
+            start_idx = min(current_indices)
+            end_idx = max(current_indices) + 1
+            main_clauses.append((start_idx, end_idx))
+        
+        return main_clauses
+    
+    def _get_clause_tokens(self, head_token):
+        """특정 토큰에 직접 의존하는 모든 토큰 찾기 (재귀적)"""
+        tokens = []
+        for child in head_token.children:
+            if child.dep_ not in {"mark", "relcl", "advcl", "ccomp", "xcomp", "acl"}:
+                tokens.append(child)
+                tokens.extend(self._get_clause_tokens(child))
+        return tokens
+    
+    def identify_subordinate_clauses(self, doc):
+        """종속절 식별"""
+        subordinate_clauses = []
+        
+        for token in doc:
+            if token.dep_ in {"relcl", "advcl", "ccomp", "xcomp", "acl"}:
+                clause_tokens = [token] + list(self._get_clause_tokens(token))
+                clause_indices = sorted([t.i - _offset(doc) for t in clause_tokens])
+                
+                if clause_indices:
+                    start_idx = min(clause_indices)
+                    end_idx = max(clause_indices) + 1
+                    
+                    clause_type = "unknown"
+                    if token.dep_ == "relcl":
+                        clause_type = "relative"
+                    elif token.dep_ == "advcl":
+                        clause_type = "adverbial"
+                    elif token.dep_ in {"ccomp", "xcomp"}:
+                        clause_type = "nominal"
+                    elif token.dep_ == "acl":
+                        clause_type = "adjectival"
+                    
+                    connector = None
+                    for child in token.children:
+                        if child.dep_ == "mark" or child.pos_ in {"SCONJ", "CCONJ"} or child.tag_ in {"WDT", "WP", "WRB"}:
+                            connector = child
+                            break
+                    
+                    subordinate_clauses.append({
+                        "start": start_idx,
+                        "end": end_idx,
+                        "head": token,
+                        "type": clause_type,
+                        "connector": connector,
+                        "parent_idx": token.head.i - _offset(doc) if token.head != token else None
+                    })
+        
+        return subordinate_clauses
+    
+    def build_clause_tree(self, doc):
+        """문장의 절 구조 트리 구축"""
+        main_clauses_indices = self.identify_main_clauses(doc)
+        subordinate_clauses = self.identify_subordinate_clauses(doc)
+        
+        all_clauses = []
+        
+        # 주절 추가
+        for start, end in main_clauses_indices:
+            main_verb = None
+            for token in doc[start:end]:
+                if token.dep_ == "ROOT" or (token.pos_ == "VERB" and token.dep_ in {"ROOT", "ccomp", "xcomp"}):
+                    main_verb = token
+                    break
+            
+            subject = None
+            if main_verb:
+                for child in main_verb.children:
+                    if child.dep_ in {"nsubj", "nsubjpass"}:
+                        subject = child
+                        break
+            
+            clause = LegacyClauseNode(
+                start_idx=start,
+                end_idx=end,
+                text=doc[start:end].text,
+                clause_type="main",
+                main_verb=main_verb,
+                subject=subject
+            )
+            clause.role = "main"
+            all_clauses.append(clause)
+        
+        # 종속절 추가
+        for sc in subordinate_clauses:
+            main_verb = sc["head"] if sc["head"].pos_ == "VERB" else None
+            if not main_verb:
+                for token in doc[sc["start"]:sc["end"]]:
+                    if token.pos_ == "VERB" and token.head == sc["head"]:
+                        main_verb = token
+                        break
+            
+            subject = None
+            if main_verb:
+                for child in main_verb.children:
+                    if child.dep_ in {"nsubj", "nsubjpass"}:
+                        subject = child
+                        break
+            
+            clause = LegacyClauseNode(
+                start_idx=sc["start"],
+                end_idx=sc["end"],
+                text=doc[sc["start"]:sc["end"]].text,
+                clause_type=sc["type"],
+                main_verb=main_verb,
+                subject=subject
+            )
+            clause.connector = sc["connector"]
+            
+            if sc["type"] == "relative":
+                clause.role = "relative_clause"
+            elif sc["type"] == "adverbial":
+                clause.role = "adverbial_clause"
+            elif sc["type"] == "nominal":
+                clause.role = "nominal_clause"
+            elif sc["type"] == "adjectival":
+                clause.role = "adjectival_clause"
+            
+            all_clauses.append(clause)
+        
+        # 절 간의 계층 구조 설정
+        for clause in all_clauses:
+            if clause.type == "main":
+                continue
+            
+            parent_clause = None
+            min_size = float('inf')
+            
+            for potential_parent in all_clauses:
+                if potential_parent == clause:
+                    continue
+                
+                if (potential_parent.start_idx <= clause.start_idx and 
+                    potential_parent.end_idx >= clause.end_idx):
+                    size = potential_parent.end_idx - potential_parent.start_idx
+                    if size < min_size:
+                        min_size = size
+                        parent_clause = potential_parent
+            
+            if parent_clause:
+                clause.parent = parent_clause
+                parent_clause.children.append(clause)
+        
+        # 계층 깊이 설정
+        for clause in all_clauses:
+            depth = 0
+            current = clause
+            while current.parent:
+                depth += 1
+                current = current.parent
+            clause.depth = depth
+        
+        return all_clauses
+
+
+def _token_indices(c):
+    if isinstance(c, LegacyClauseNode):
+        return (c.main_verb.i if c.main_verb else None, c.subject.i if c.subject else None,
+                c.connector.i if c.connector else None)
+    return c.main_verb_i, c.subject_i, c.connector_i
+
+
+def snapshot(clauses):
+    """비교용 절 구조 요약"""
+    index = {id(c): i for i, c in enumerate(clauses)}
+    return [
+        (c.start_idx, c.end_idx, c.type, c.depth, index[id(c.parent)] if c.parent else None,
+         [index[id(child)] for child in c.children], *_token_indices(c))
+        for c in clauses
+    ]
+
+
+def timeit(parser, docs, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for doc in docs:
+            parser.build_clause_tree(doc)
+    return (time.perf_counter() - start) / (repeat * len(docs)) * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--depths", type=int, nargs="+", default=[2, 4, 8, 16])
+    arg_parser.add_argument("--sentences", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    nlp = get_nlp()
+    parser = get_parser()
+    legacy_parser = LegacyClauseParser(nlp)
+    rng = random.Random(0)
+
+    print(f"{'depth':>5} {'tokens':>7} {'clauses':>8} {'legacy(us)':>11} {'current(us)':>12} {'speedup':>8}")
+    for depth in args.depths:
+        docs = list(nlp.pipe(make_sentence(depth, rng) for _ in range(args.sentences)))
+        for doc in docs:
+            legacy_tree = snapshot(legacy_parser.build_clause_tree(doc))
+            assert legacy_tree == snapshot(parser.build_clause_tree(doc)), doc.text
+
+        legacy = timeit(legacy_parser, docs, args.repeat)
+        current = timeit(parser, docs, args.repeat)
+        tokens = sum(len(doc) for doc in docs) / len(docs)
+        clauses = sum(len(parser.build_clause_tree(doc)) for doc in docs) / len(docs)
+        print(f"{depth:>5} {tokens:>7.0f} {clauses:>8.1f} {legacy:>11.1f} {current:>12.1f} {legacy / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""업로드 이미지 전처리(image_prep) 벤치마크
+
+샘플 이미지(sample1~3.png, img.png)와, 휴대폰 사진 크기(가로 3024px)로 키운 sample1 JPEG 에 대해
+  - 전처리 시간, 화소 수 / 파일 크기 변화
+  - tesseract 가 설치되어 있으면 원본과 전처리 이미지의 OCR 시간, 두 OCR 결과의 유사도
+를 출력한다. (브라우저의 Tesseract.js 도 같은 엔진이므로 상대적인 차이는 비슷하다)
+
+사용법: python bench/bench_image_prep.py [이미지 ...] [--repeat 3]
+"""
+import argparse
+import difflib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import image_prep
+
+SAMPLES = ["sample1.png", "sample2.png", "sample3.png", "img.png"]
+
+# 휴대폰 사진 가로 크기 (12MP 사진의 짧은 변)
+PHOTO_WIDTH = 3024
+
+
+def make_photo(path, output_dir):
+    """샘플을 휴대폰 사진 크기 JPEG 으로 키운 이미지"""
+    from PIL import Image
+    image = Image.open(path).convert("RGB")
+    height = round(image.height * PHOTO_WIDTH / image.width)
+    photo_path = os.path.join(output_dir, "photo_" + os.path.splitext(os.path.basename(path))[0] + ".jpg")
+    image.resize((PHOTO_WIDTH, height), Image.Resampling.BICUBIC).save(photo_path, quality=92)
+    return photo_path
+
+
+def tesseract(path):
+    """OCR 텍스트 (공백 정리)"""
+    text = subprocess.run(["tesseract", path, "stdout", "-l", "eng"], check=True,
+                          capture_output=True, text=True).stdout
+    return " ".join(text.split())
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("images", nargs="*")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    if not image_prep.AVAILABLE:
+        print("⚠️ Pillow 가 설치되어 있지 않습니다.")
+        return 1
+
+    has_tesseract = shutil.which("tesseract") is not None
+    if not has_tesseract:
+        print("⚠️ tesseract 가 없어 OCR 시간은 측정하지 않습니다 (전처리 결과만 출력).")
+
+    from PIL import Image
+    work_dir = tempfile.mkdtemp()
+    try:
+        images = args.images or [os.path.join(ROOT, name) for name in SAMPLES]
+        if not args.images:
+            images.append(make_photo(os.path.join(ROOT, SAMPLES[0]), work_dir))
+
+        totals = [0.0, 0.0, 0.0]
+        print(f"{'image':<18} {'원본 MP':>8} {'결과 MP':>8} {'원본 KB':>8} {'결과 KB':>8} {'기울기':>6} "
+              f"{'전처리 ms':>9}" + (f" {'OCR 원본 ms':>11} {'OCR 결과 ms':>11} {'유사도':>6}" if has_tesseract else ""))
+        for path in images:
+            output = os.path.join(work_dir, os.path.basename(path) + ".ocr.png")
+            prep_time, info = best_time(lambda: image_prep.preprocess(path, output), args.repeat)
+            with Image.open(path) as original:
+                pixels = original.width * original.height
+            line = (f"{os.path.basename(path)[:18]:<18} {pixels / 1e6:>8.2f} "
+                    f"{info['size'][0] * info['size'][1] / 1e6:>8.2f} {os.path.getsize(path) / 1024:>8.0f} "
+                    f"{os.path.getsize(output) / 1024:>8.0f} {info['angle']:>6.2f} {prep_time * 1000:>9.1f}")
+
+            if has_tesseract:
+                original_time, original_text = best_time(lambda: tesseract(path), args.repeat)
+                prepared_time, prepared_text = best_time(lambda: tesseract(output), args.repeat)
+                similarity = difflib.SequenceMatcher(None, original_text, prepared_text).ratio()
+                line += f" {original_time * 1000:>11.1f} {prepared_time * 1000:>11.1f} {similarity:>6.2f}"
+                totals[0] += original_time
+                totals[1] += prepared_time
+            totals[2] += prep_time
+            print(line)
+
+        if has_tesseract and totals[0]:
+            print(f"OCR 시간 합계: 원본 {totals[0] * 1000:.0f} ms -> 전처리 {totals[1] * 1000:.0f} ms "
+                  f"(전처리 {totals[2] * 1000:.0f} ms 포함 시 원본 대비 {(totals[1] + totals[2]) / totals[0]:.0%})")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""OCR 텍스트 정리 / 문장 분리 벤치마크
+
+sample*.png 의 OCR 결과로 예전 방식(SEGMENTER=parser: 전체 텍스트 파싱 후 doc.sents)과
+기본 방식(ocr_text 로 정리 → senter/규칙 분리 → 남은 문장만 파싱)을 비교한다.
+
+  문장 수   : 분석/번역 요청으로 넘어가는 문장 수
+  분리 ms   : split_sentences (문장 나누기 + 파싱)
+  전체 ms   : analyze_multiple_sentences (분리 + 절 분석 + stub 번역 서버 번역)
+
+입력은 tesseract 가 있으면 이미지를 직접 OCR 하고(영어 모델, ocr_backend 와 같은 전처리),
+없으면 bench/ocr_samples/ 에 저장해 둔 OCR 결과를 쓴다. --scan 을 주면 세 페이지를 좁은
+폭으로 다시 줄바꿈(줄 끝 하이픈 포함)하고 머리말/쪽 번호를 넣은 여러 쪽 스캔도 측정한다.
+방식마다 분석/번역 캐시를 비운 상태에서 시작한다.
+
+사용법: python bench/bench_ocr_text.py [--latency 0.05] [--repeat 3] [--scan]
+"""
+import argparse
+import glob
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ["TRANSLATION_CACHE_DB"] = ""
+os.environ["ANALYSIS_CACHE_DB"] = ""
+os.environ["DOC_STORE_DB"] = ""
+os.environ["SENTENCE_INDEX"] = ""
+
+import ocr_backend
+import ocr_text
+import translate_client
+import translate_ko
+from analysis_cache import get_analysis_cache
+from model_registry import get_nlp
+from trans_json import analyze_multiple_sentences, split_sentences
+from translate_stub import start_stub
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_samples")
+MODES = ("parser", "auto")
+
+
+def ocr_samples():
+    """[(이름, OCR 텍스트)], tesseract 가 없으면 저장된 OCR 결과"""
+    images = sorted(glob.glob(os.path.join(ROOT, "sample*.png")))
+    if images and ocr_backend.TesseractOCR.available():
+        work_dir = tempfile.mkdtemp()
+        try:
+            return [(os.path.basename(path), ocr_backend.ocr_page(
+                path, os.path.join(work_dir, os.path.basename(path) + ".ocr.png"), lang="eng")["text"])
+                for path in images]
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    samples = []
+    for path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            samples.append((os.path.basename(path) + " (저장)", f.read()))
+    return samples
+
+
+def rewrap(text, width):
+    """문단을 width 자로 다시 줄바꿈, 넘치는 긴 단어는 줄 끝 하이픈으로 나눔"""
+    lines, line = [], ""
+    for word in " ".join(text.split()).split(" "):
+        if line and len(line) + 1 + len(word) > width:
+            room = width - len(line) - 2
+            if word.isalpha() and len(word) >= 8 and room >= 3:
+                lines.append(f"{line} {word[:room]}-")
+                word = word[room:]
+            else:
+                lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    return lines + [line]
+
+
+def scan_pages(samples, width=45):
+    """여러 쪽 스캔 흉내 - 쪽마다 머리말, 다시 줄바꿈한 본문, 쪽 번호"""
+    pages = []
+    for number, (_, text) in enumerate(samples, 1):
+        paragraphs = [p for p in text.split("\n\n") if p.strip()]
+        body = "\n\n".join("\n".join(rewrap(p, width)) for p in paragraphs)
+        pages.append(f"English Reading Practice\n\n{body}\n\n- {number} -")
+    return "\f".join(pages)
+
+
+def reset(url):
+    get_analysis_cache().cache.clear()
+    translate_ko._cache = None
+    translate_client._default_client = translate_client.TranslationClient(url)
+
+
+def measure(text, mode, url, repeat):
+    """(문장 수, 분리 ms, 전체 ms, 번역 요청 수) - 캐시 없이 repeat 번 중 가장 빠른 값"""
+    ocr_text.SEGMENTER = mode
+    split_times, total_times = [], []
+    for _ in range(repeat):
+        reset(url)
+        start = time.perf_counter()
+        sentences, _ = split_sentences(text)
+        split_times.append(time.perf_counter() - start)
+
+        reset(url)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            result = analyze_multiple_sentences(text)
+        total_times.append(time.perf_counter() - start)
+    return len(sentences), min(split_times) * 1000, min(total_times) * 1000, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="stub 번역 서버 요청당 지연 (초)")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--scan", action="store_true", help="여러 쪽 스캔 흉내 입력도 측정")
+    args = arg_parser.parse_args()
+
+    nlp = get_nlp()
+    print(f"senter: {'있음' if 'senter' in nlp.component_names else '없음 (sentencizer 사용)'}, "
+          f"stub 지연 {args.latency * 1000:.0f} ms")
+    samples = ocr_samples()
+    inputs = list(samples)
+    if args.scan:
+        inputs.append(("scan (3쪽)", scan_pages(samples)))
+
+    server, url, stats = start_stub(latency=args.latency)
+    original = ocr_text.SEGMENTER
+    try:
+        print(f"{'입력':<22} {'방식':<7} {'문장 수':>7} {'분리 ms':>9} {'전체 ms':>9} {'번역 문장':>9}")
+        totals = {mode: [0, 0.0, 0.0] for mode in MODES}
+        for name, text in inputs:
+            for mode in MODES:
+                stats.requests = stats.sentences = 0
+                count, split_ms, total_ms, _ = measure(text, mode, url, args.repeat)
+                print(f"{name:<22} {mode:<7} {count:>7} {split_ms:>9.1f} {total_ms:>9.1f} "
+                      f"{stats.sentences // args.repeat:>9}")
+                totals[mode][0] += count
+                totals[mode][1] += split_ms
+                totals[mode][2] += total_ms
+        old, new = totals["parser"], totals["auto"]
+        print(f"합계: 문장 {old[0]} → {new[0]}개, 분리 {old[1]:.0f} → {new[1]:.0f} ms, "
+              f"전체 {old[2]:.0f} → {new[2]:.0f} ms")
+    finally:
+        ocr_text.SEGMENTER = original
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""절 노드 메모리 / 결과 직렬화 벤치마크
+
+1. 분석 결과(절 트리)를 보관할 때 문장 하나당 남는 메모리
+   - 이전: __dict__ 기반 노드가 Token 을 들고 있어 Doc 전체가 함께 남음
+   - 현재: __slots__ 노드가 토큰 인덱스만 저장 (Doc 은 해제됨)
+2. convert_to_json_format + JSON 문자열 변환 시간
+   - 이전: 절 ID 맵/중간 dict 를 만드는 변환 + json.dumps
+   - 현재: 한 번 순회 변환 + fast_json (orjson 이 있으면 orjson)
+두 변환 결과가 같은지도 확인한다.
+
+사용법: python bench/bench_serialize.py [--sentences 200] [--repeat 20]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fast_json
+from model_registry import get_parser
+from trans_json import convert_to_json_format
+from bench_clause_tree import LegacyClauseNode, make_sentence
+
+
+def legacy_convert_to_json_format(analysis_results):
+    """이전 변환 (Token 을 들고 있는 LegacyClauseNode 용)"""
+    doc = analysis_results["doc"]
+
+    clause_tree_json = []
+    clause_id_map = {}
+
+    for i, clause in enumerate(analysis_results["clause_tree"]):
+        clause_id_map[clause] = i
+
+    for clause in analysis_results["clause_tree"]:
+        clause_info = {
+            "id": clause_id_map[clause],
+            "text": clause.text,
+            "start_idx": clause.start_idx,
+            "end_idx": clause.end_idx,
+            "type": clause.type,
+            "role": clause.role or "unknown",
+            "depth": clause.depth,
+            "parent_id": clause_id_map.get(clause.parent) if clause.parent else None,
+            "children_ids": [clause_id_map[child] for child in clause.children],
+            "main_verb": clause.main_verb.text if clause.main_verb else None,
+            "subject": clause.subject.text if clause.subject else None,
+            "connector": clause.connector.text if clause.connector else None
+        }
+        clause_tree_json.append(clause_info)
+
+    verb_np_roles_json = {}
+    for clause, verb_roles in analysis_results["clause_verb_np_roles"].items():
+        clause_id = clause_id_map[clause]
+        verb_np_roles_json[clause_id] = {}
+
+        for verb, roles in verb_roles.items():
+            verb_np_roles_json[clause_id][verb.text] = {
+                "subject": roles["subject"],
+                "direct_object": roles["direct_object"],
+                "indirect_object": roles["indirect_object"],
+                "others": roles["others"]
+            }
+
+    implied_subjects_json = {}
+    for verb, subject in analysis_results["implied_subjects"].items():
+        implied_subjects_json[verb.text] = subject
+
+    coord_structures_json = []
+    for coord in analysis_results["coord_structures"]:
+        coord_structures_json.append({
+            "type": coord["type"],
+            "first": coord["first"].text,
+            "conjunction": coord["conjunction"].text if coord["conjunction"] else ",",
+            "second": coord["second"].text
+        })
+
+    return {
+        "sentence": doc.text,
+        "clause_tree": clause_tree_json,
+        "verb_np_roles": verb_np_roles_json,
+        "implied_subjects": implied_subjects_json,
+        "coord_structures": coord_structures_json
+    }
+
+
+def to_legacy(analysis):
+    """현재 분석 결과를 이전 형태(Token 을 들고 있는 노드)로 변환"""
+    tokens = analysis["doc"].doc
+
+    def token(i):
+        return tokens[i] if i is not None else None
+
+    nodes = {}
+    for clause in analysis["clause_tree"]:
+        node = LegacyClauseNode(clause.start_idx, clause.end_idx, clause.text, clause.type,
+                                token(clause.main_verb_i), token(clause.subject_i))
+        node.connector = token(clause.connector_i)
+        node.depth = clause.depth
+        node.role = clause.role
+        nodes[id(clause)] = node
+    for clause in analysis["clause_tree"]:
+        node = nodes[id(clause)]
+        node.parent = nodes[id(clause.parent)] if clause.parent else None
+        node.children = [nodes[id(child)] for child in clause.children]
+
+    return dict(analysis,
+                clause_tree=[nodes[id(c)] for c in analysis["clause_tree"]],
+                clause_verb_np_roles={nodes[id(c)]: roles
+                                      for c, roles in analysis["clause_verb_np_roles"].items()})
+
+
+def retained_bytes(build, count):
+    """build() 결과를 count 개 보관했을 때 늘어난 메모리 (바이트)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(i) for i in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def timed(func, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            func(item)
+    return (time.perf_counter() - start) / (repeat * len(items)) * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--sentences", type=int, default=200)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    parser = get_parser()
+    rng = random.Random(0)
+    texts = [make_sentence(rng.choice([1, 2, 4, 8]), rng) for _ in range(args.sentences)]
+
+    # 1. 문장마다 새 Doc 을 파싱하고 절 트리만 보관
+    current = retained_bytes(lambda i: parser.analyze_sentence(texts[i])["clause_tree"], len(texts))
+    legacy = retained_bytes(lambda i: to_legacy(parser.analyze_sentence(texts[i]))["clause_tree"], len(texts))
+    print(f"보관 메모리/문장: 이전 {legacy / len(texts):,.0f} B, 현재 {current / len(texts):,.0f} B")
+
+    # 2. 직렬화
+    analyses = [parser.analyze_sentence(text) for text in texts]
+    legacy_analyses = [to_legacy(analysis) for analysis in analyses]
+
+    failures = 0
+    for analysis, legacy_analysis in zip(analyses, legacy_analyses):
+        # 두 결과 모두 JSON 문자열로 바꾼 뒤(int 키 -> 문자열) 비교
+        expected = json.loads(json.dumps(legacy_convert_to_json_format(legacy_analysis)))
+        actual = fast_json.loads(fast_json.dumps(convert_to_json_format(analysis)))
+        # 어휘 정보는 이전 형식에 없던 항목
+        actual.pop("vocabulary", None)
+        if expected != actual:
+            failures += 1
+            print(f"❌ 결과 불일치: {analysis['doc'].text!r}")
+
+    legacy_time = timed(lambda a: json.dumps(legacy_convert_to_json_format(a), ensure_ascii=False),
+                        legacy_analyses, args.repeat)
+    current_time = timed(lambda a: fast_json.dumps(convert_to_json_format(a)), analyses, args.repeat)
+    cached = sum(len(fast_json.dumps(convert_to_json_format(a)).encode("utf-8")) for a in analyses)
+    print(f"직렬화/문장: 이전 {legacy_time:.1f} us, 현재 {current_time:.1f} us "
+          f"({fast_json.BACKEND}, x{legacy_time / current_time:.2f})")
+    print(f"캐시 값 크기/문장: {cached / len(analyses):,.0f} B")
+    print(f"{len(analyses)}개 문장 검사, 실패 {failures}개")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
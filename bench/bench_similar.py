@@ -0,0 +1,102 @@
+"""비슷한 예문 검색(sentence_index) 벤치마크
+
+군집 구조가 있는 가짜 문장 벡터(정규화, 기본 300차원 = en_core_web_lg)를 10k / 100k / 1M 개
+저장한 색인에서
+  - 전체 행렬 곱 한 번으로 찾는 정확한 검색의 질의 지연 (p50/p95, 텍스트 조회 포함)
+  - 군집 색인 생성 시간과, 군집 색인 검색의 질의 지연 / 정확한 검색 대비 recall@k
+  - 색인 파일 크기
+를 출력한다. 모델이 필요 없다.
+
+사용법: python bench/bench_similar.py [--sizes 10000 100000 1000000] [--dim 300] [--queries 100] [--nprobe 16]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import sentence_index
+from sentence_index import SentenceIndex
+
+# 가짜 벡터의 주제 수 (주제 중심 + 잡음)
+TOPICS = 2000
+ADD_CHUNK = 50000
+
+
+def normalize(matrix):
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+
+def fill(index, size, dim, rng):
+    """size 개의 가짜 문장 추가 (주제 중심 근처에 흩어진 벡터)"""
+    centers = rng.standard_normal((TOPICS, dim), dtype=np.float32)
+    for start in range(len(index), size, ADD_CHUNK):
+        count = min(ADD_CHUNK, size - start)
+        topics = rng.integers(0, TOPICS, count)
+        vectors = normalize(centers[topics] + 0.8 * rng.standard_normal((count, dim), dtype=np.float32))
+        index.add([f"sentence {start + i}" for i in range(count)], vectors)
+
+
+def measure(index, queries, k, nprobe=None):
+    """질의별 (지연 ms, 결과 텍스트 목록), nprobe 가 있으면 군집 색인 사용"""
+    sentence_index.CLUSTER_THRESHOLD = 0 if nprobe else float("inf")
+    times, results = [], []
+    try:
+        for query in queries:
+            start = time.perf_counter()
+            found = index.search(query, k, nprobe=nprobe or 1, min_score=-1.0)
+            times.append((time.perf_counter() - start) * 1000)
+            results.append([item["text"] for item in found])
+    finally:
+        sentence_index.CLUSTER_THRESHOLD = float("inf")
+    return np.array(times), results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    arg_parser.add_argument("--dim", type=int, default=300)
+    arg_parser.add_argument("--queries", type=int, default=100)
+    arg_parser.add_argument("--k", type=int, default=5)
+    arg_parser.add_argument("--nprobe", type=int, default=sentence_index.NPROBE)
+    args = arg_parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    work_dir = tempfile.mkdtemp()
+    # 벤치마크 중에는 자동 군집 색인 생성을 막음
+    sentence_index.CLUSTER_THRESHOLD = float("inf")
+    try:
+        index = SentenceIndex(os.path.join(work_dir, "index"), args.dim)
+        print(f"{'문장 수':>10} {'파일 MB':>8} {'정확 p50':>9} {'정확 p95':>9} {'군집 생성 s':>11} "
+              f"{'군집 p50':>9} {'군집 p95':>9} {'recall@k':>9}")
+        for size in sorted(args.sizes):
+            fill(index, size, args.dim, rng)
+            matrix = index.matrix()
+            picks = rng.integers(0, len(matrix), args.queries)
+            queries = normalize(matrix[picks] + 0.05 * rng.standard_normal((args.queries, args.dim),
+                                                                             dtype=np.float32))
+
+            exact_times, exact = measure(index, queries, args.k)
+            start = time.perf_counter()
+            index.build_clusters()
+            build_time = time.perf_counter() - start
+            ivf_times, approx = measure(index, queries, args.k, args.nprobe)
+            recall = np.mean([len(set(a) & set(e)) / max(len(e), 1) for a, e in zip(approx, exact)])
+
+            print(f"{len(matrix):>10,} {os.path.getsize(index.vectors_path) / 1e6:>8.0f} "
+                  f"{np.percentile(exact_times, 50):>9.2f} {np.percentile(exact_times, 95):>9.2f} "
+                  f"{build_time:>11.1f} {np.percentile(ivf_times, 50):>9.2f} "
+                  f"{np.percentile(ivf_times, 95):>9.2f} {recall:>9.3f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""분석 파이프라인 단계별 벤치마크
+
+output.json / templates/all_sentences.json 의 문장(페이지 단위)과 길고 깊게 내포된
+생성 문장으로 요청 처리의 각 단계를 따로 측정한다. 네트워크 없이 실행된다.
+
+  model_load          모델 + 절 분석기 로드 (1회)
+  parse               nlp(텍스트) - 페이지 단위
+  sentence_split      파싱된 Doc 에서 문장 목록 추출 (문장 경계는 파서가 정함)
+  build_clause_tree, analyze_verb_np_roles_by_clause, resolve_zero_pronouns,
+  identify_coordination, analyze_vocabulary, convert_to_json_format   - 문장 단위
+  translate           로컬 stub 번역 서버에 페이지 문장 번역 (캐시 없이)
+
+단계마다 지연 시간 백분위(p50/p95/p99)와, 별도 실행에서 tracemalloc 으로 잰
+최대 메모리 증가량을 출력한다.
+
+  python bench/bench_stages.py --save-baseline bench/baseline.json   # 기준값 저장
+  python bench/bench_stages.py --baseline bench/baseline.json        # 기준값과 비교
+
+기준값보다 p50/p95 또는 최대 메모리가 허용치(--tolerance, 기본 25%) 이상 나빠진
+단계가 있으면 종료 코드 1 로 끝난다. 기준값은 측정한 기계에서만 의미가 있으므로
+저장소에 커밋하지 않는다.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model_registry import ModelRegistry, registry
+from trans_json import clean_sentence, convert_to_json_format
+from translate_client import TranslationClient
+from bench_clause_tree import make_sentence
+from translate_stub import start_stub
+
+SOURCES = [
+    os.path.join(ROOT, "output.json"),
+    os.path.join(ROOT, "templates", "all_sentences.json"),
+]
+
+STAGES = [
+    "model_load", "parse", "sentence_split", "build_clause_tree",
+    "analyze_verb_np_roles_by_clause", "resolve_zero_pronouns", "identify_coordination",
+    "analyze_vocabulary", "convert_to_json_format", "translate",
+]
+
+# 기준값 비교 시 이보다 작은 값은 측정 잡음으로 보고 무시 (시간 ms, 메모리 KB)
+MIN_COMPARE_MS = 0.05
+MIN_COMPARE_KB = 64.0
+
+
+def make_long_sentence(clauses, rng):
+    """and/but 로 절이 길게 이어지는 문장"""
+    parts = []
+    for i in range(clauses):
+        sentence = make_sentence(0, rng).rstrip(".")
+        parts.append(sentence if i == 0 else rng.choice(["and", "but"]) + " " + sentence.lower())
+    return ", ".join(parts) + "."
+
+
+def load_pages():
+    """페이지(텍스트) 목록: 샘플 결과 파일 2개 + 생성 문장 페이지"""
+    pages = []
+    for path in SOURCES:
+        with open(path, encoding="utf-8") as f:
+            pages.append(" ".join(item["sentence"] for item in json.load(f)["results"]))
+
+    rng = random.Random(0)
+    pages.append(" ".join(make_sentence(depth, rng) for depth in (4, 8, 16, 32)))
+    pages.append(" ".join(make_long_sentence(clauses, rng) for clauses in (5, 10, 20)))
+    return pages
+
+
+class Recorder:
+    """단계별 측정값 (초) 기록"""
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+
+    def run(self, stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.samples[stage].append(time.perf_counter() - start)
+        return result
+
+
+def run_pipeline(parser, nlp, pages, client, record):
+    """페이지마다 모든 단계를 한 번씩 실행"""
+    for text in pages:
+        doc = record("parse", nlp, text)
+        sents = record("sentence_split", lambda: list(doc.sents))
+
+        for sent in sents:
+            clause_tree = record("build_clause_tree", parser.build_clause_tree, sent)
+            roles = record("analyze_verb_np_roles_by_clause",
+                           parser.analyze_verb_np_roles_by_clause, sent, clause_tree)
+            implied = record("resolve_zero_pronouns", parser.resolve_zero_pronouns, sent, clause_tree)
+            coords = record("identify_coordination", parser.identify_coordination, sent)
+            vocabulary = record("analyze_vocabulary", parser.analyze_vocabulary, sent)
+            record("convert_to_json_format", convert_to_json_format, {
+                "doc": sent,
+                "clause_tree": clause_tree,
+                "clause_verb_np_roles": roles,
+                "implied_subjects": implied,
+                "coord_structures": coords,
+                "vocabulary": vocabulary
+            })
+
+        record("translate", client.translate_many, [clean_sentence(sent.text) for sent in sents])
+
+
+def measure_memory(parser, nlp, pages, client):
+    """단계별 최대 메모리 증가량 (바이트) - 시간 측정과 분리해 tracemalloc 으로 측정"""
+    peaks = {stage: 0 for stage in STAGES}
+
+    def record(stage, func, *args):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = func(*args)
+        peaks[stage] = max(peaks[stage], tracemalloc.get_traced_memory()[1] - base)
+        return result
+
+    tracemalloc.start()
+    try:
+        record("model_load", lambda: ModelRegistry(registry.lang, registry.disable, registry.engine).load())
+        run_pipeline(parser, nlp, pages, client, record)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def summarize(samples, peaks):
+    summary = {}
+    for stage in STAGES:
+        values = np.array(samples[stage]) * 1000
+        if not len(values):
+            continue
+        summary[stage] = {
+            "count": int(len(values)),
+            "p50_ms": float(np.percentile(values, 50)),
+            "p95_ms": float(np.percentile(values, 95)),
+            "p99_ms": float(np.percentile(values, 99)),
+            "max_ms": float(values.max()),
+            "peak_kb": peaks.get(stage, 0) / 1024,
+        }
+    return summary
+
+
+def compare(summary, baseline, tolerance):
+    """기준값 대비 나빠진 항목 목록"""
+    regressions = []
+    for stage, base in baseline["stages"].items():
+        current = summary.get(stage)
+        if current is None:
+            continue
+        for key in ("p50_ms", "p95_ms", "peak_kb"):
+            floor = MIN_COMPARE_MS if key.endswith("_ms") else MIN_COMPARE_KB
+            if current[key] > max(base[key], floor) * (1 + tolerance):
+                regressions.append(f"{stage} {key}: {base[key]:.3f} -> {current[key]:.3f}")
+    return regressions
+
+
+def environment(nlp_info):
+    import spacy
+    return {
+        "model": nlp_info["name"],
+        "model_version": nlp_info["version"],
+        "engine": nlp_info.get("engine"),
+        "spacy": spacy.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--repeat", type=int, default=5, help="페이지 묶음 반복 횟수")
+    arg_parser.add_argument("--stub-latency", type=float, default=0.0, help="stub 번역 서버 지연 (초)")
+    arg_parser.add_argument("--baseline", help="비교할 기준값 JSON")
+    arg_parser.add_argument("--save-baseline", help="이번 결과를 기준값으로 저장할 경로")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25)
+    args = arg_parser.parse_args()
+
+    recorder = Recorder()
+
+    # 모델 로드 (이후 단계는 이 레지스트리의 모델/분석기 사용)
+    local = ModelRegistry(registry.lang, registry.disable, registry.engine)
+    recorder.run("model_load", local.load)
+    nlp, parser = local.nlp, local.parser
+
+    server, url, _ = start_stub(latency=args.stub_latency)
+    client = TranslationClient(url=url, retries=0)
+    pages = load_pages()
+
+    try:
+        # 첫 실행은 워밍업 (측정하지 않음)
+        run_pipeline(parser, nlp, pages, client, lambda stage, func, *a: func(*a))
+        for _ in range(args.repeat):
+            run_pipeline(parser, nlp, pages, client, recorder.run)
+        peaks = measure_memory(parser, nlp, pages, client)
+    finally:
+        client.close()
+        server.shutdown()
+
+    summary = summarize(recorder.samples, peaks)
+    print(f"{'stage':<34} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'peak KB':>9}")
+    for stage, row in summary.items():
+        print(f"{stage:<34} {row['count']:>5} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} "
+              f"{row['p99_ms']:>9.3f} {row['max_ms']:>9.3f} {row['peak_kb']:>9.1f}")
+
+    env = environment(local.info())
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": env, "stages": summary}, f, ensure_ascii=False, indent=2)
+        print(f"✅ 기준값 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != env:
+            print(f"⚠️ 기준값과 실행 환경이 다릅니다: {baseline.get('environment')} / {env}")
+        regressions = compare(summary, baseline, args.tolerance)
+        for line in regressions:
+            print(f"❌ 성능 저하: {line}")
+        if regressions:
+            return 1
+        print("✅ 기준값 대비 성능 저하 없음")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
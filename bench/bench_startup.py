@@ -0,0 +1,116 @@
+"""서버 시작 시간 벤치마크
+
+새 프로세스에서 매번 측정한다 (import 캐시 영향 없음).
+
+  import_ms        import app (spaCy 등 무거운 모듈은 import 하지 않아야 함)
+  create_app_ms    create_app() 호출
+  ready_ms         create_app() 부터 /readyz 가 200 을 돌려줄 때까지 (모델 로드 완료)
+  first_request_ms 첫 분석 요청(/api/analyze_stream) 응답 시간
+
+두 가지 방식을 비교한다.
+  warmup     : 기본 - 앱 생성 시 백그라운드에서 모델 로드, 준비된 뒤 첫 요청
+  no-warmup  : MODEL_WARMUP=0 - 첫 분석 요청이 모델 로드까지 부담
+
+번역은 로컬 stub 번역 서버를 사용하고 캐시는 끈다.
+
+사용법: python bench/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from translate_stub import start_stub
+
+MODES = ["warmup", "no-warmup"]
+FIELDS = ["import_ms", "create_app_ms", "ready_ms", "first_request_ms"]
+
+# import app 이후 불러와져 있으면 안 되는 모듈
+HEAVY_MODULES = ["spacy", "analy", "trans_json", "networkx", "libretranslatepy"]
+
+SAMPLE_TEXT = ("The teacher who came yesterday said that we should read the book. "
+               "She left early, and he stayed until the end.")
+
+
+def child(mode):
+    """측정용 자식 프로세스 - 결과를 JSON 한 줄로 출력"""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    result = {}
+
+    start = time.perf_counter()
+    import app as app_module
+    result["import_ms"] = (time.perf_counter() - start) * 1000
+    result["heavy_modules"] = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    start = time.perf_counter()
+    app = app_module.create_app({"MODEL_WARMUP": mode == "warmup"})
+    result["create_app_ms"] = (time.perf_counter() - start) * 1000
+    client = app.test_client()
+
+    if mode == "warmup":
+        while client.get("/readyz").status_code != 200:
+            time.sleep(0.005)
+        result["ready_ms"] = (time.perf_counter() - start) * 1000
+
+    request_start = time.perf_counter()
+    response = client.post("/api/analyze_stream", json={"text": SAMPLE_TEXT})
+    lines = response.get_data().splitlines()
+    result["first_request_ms"] = (time.perf_counter() - request_start) * 1000
+    result["sentences"] = len(lines)
+
+    if mode == "no-warmup":
+        result["ready_ms"] = (time.perf_counter() - start) * 1000
+    print(json.dumps(result))
+
+
+def run_child(mode, env):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode],
+                            env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--runs", type=int, default=5)
+    arg_parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return 0
+
+    server, url, _ = start_stub()
+    env = dict(os.environ, LIBRETRANSLATE_URL=url, TRANSLATION_CACHE_DB="", ANALYSIS_CACHE_DB="",
+               DOC_STORE_DB="", METRICS="0", SECRET_KEY=os.getenv("SECRET_KEY", "bench"))
+
+    failures = 0
+    try:
+        print(f"{'mode':<10} " + " ".join(f"{field:>17}" for field in FIELDS))
+        for mode in MODES:
+            runs = [run_child(mode, env) for _ in range(args.runs)]
+            medians = {field: statistics.median(run[field] for run in runs) for field in FIELDS}
+            print(f"{mode:<10} " + " ".join(f"{medians[field]:>17.1f}" for field in FIELDS))
+
+            heavy = sorted({name for run in runs for name in run["heavy_modules"]})
+            if heavy:
+                failures += 1
+                print(f"❌ {mode}: import app 시 불러온 무거운 모듈 {heavy}")
+            if any(run["sentences"] == 0 for run in runs):
+                failures += 1
+                print(f"❌ {mode}: 첫 요청 분석 결과 없음")
+    finally:
+        server.shutdown()
+
+    print("(중앙값, ms) ready_ms: warmup 은 /readyz 200 까지, no-warmup 은 첫 요청 완료까지")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""어휘 색인(vocab_index) 벤치마크
+
+1. 색인 만들기 / memory-map 으로 열기 시간 (data/vocab.tsv 와, --entries 개의 생성 항목)
+2. 문장 하나 태깅 시간 (analyze_vocabulary: Matcher 1회 + to_array + searchsorted)
+   - 비교: 토큰마다 Python dict 를 찾는 단순 구현 (구동사 제외)
+3. 색인 크기가 커져도 태깅 시간이 거의 같은지 (생성 항목 색인)
+4. 프로세스 힙 사용량: dict 구현은 워커마다 표 전체를 힙에 올리고,
+   memory-map 색인은 페이지 캐시를 워커끼리 공유한다
+
+사용법: python bench/bench_vocab.py [--sentences 200] [--entries 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import vocab_index
+from model_registry import get_nlp, get_parser
+from bench_clause_tree import make_sentence
+
+POS_TAGS = ["NOUN", "VERB", "ADJ", "ADV"]
+
+
+def make_source(path, count, rng):
+    """count 개의 가짜 단어 항목 TSV (data/vocab.tsv 항목을 앞에 포함)"""
+    with open(vocab_index.VOCAB_SOURCE, encoding="utf-8") as f:
+        base = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(base)
+        for i in range(count):
+            word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8)) + str(i)
+            f.write(f"{word}\t{rng.choice(POS_TAGS + ['*'])}\t{rng.choice(vocab_index.LEVELS)}\t{i}\t뜻{i}\n")
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def dict_tagger(source):
+    """비교용: (lemma, 품사) -> 항목 dict 를 토큰마다 찾는 구현"""
+    table = {}
+    for lemma, pos, level, rank, gloss in vocab_index.read_source(source):
+        table.setdefault((lemma, pos), (level, rank, gloss))
+
+    def tag(span):
+        words = []
+        for token in span:
+            lemma = token.lemma_ or token.lower_
+            info = table.get((lemma, token.pos_)) or table.get((lemma, None))
+            if info:
+                words.append((token.i, info))
+        return words
+    return tag
+
+
+def heap_kb(func):
+    """func 결과가 힙에 남기는 메모리 (KB)"""
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size / 1024
+
+
+def tag_time(parser, sents, repeat):
+    """문장당 analyze_vocabulary 시간 (ms)"""
+    seconds, _ = timed(lambda: [parser.analyze_vocabulary(sent) for sent in sents], repeat)
+    return seconds / len(sents) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--sentences", type=int, default=200)
+    arg_parser.add_argument("--entries", type=int, default=100000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(0)
+    nlp = get_nlp()
+    parser = get_parser()
+    text = " ".join(make_sentence(rng.choice([1, 2, 4]), rng) for _ in range(args.sentences))
+    sents = list(nlp(text).sents)
+    tokens = sum(len(sent) for sent in sents)
+    print(f"문장 {len(sents)}개, 토큰 {tokens}개")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        sources = [("data/vocab.tsv", vocab_index.VOCAB_SOURCE)]
+        if args.entries:
+            generated = os.path.join(work_dir, "vocab.tsv")
+            make_source(generated, args.entries, rng)
+            sources.append((f"생성 {args.entries:,}개", generated))
+
+        print(f"{'source':<16} {'항목':>8} {'build ms':>9} {'load ms':>8} {'tag ms/문장':>12} "
+              f"{'dict ms/문장':>13} {'색인 힙 KB':>11} {'dict 힙 KB':>11}")
+        for name, source in sources:
+            output = os.path.join(work_dir, f"index_{len(name)}")
+            build_time, count = timed(lambda: vocab_index.build_index(source, output), 1)
+            load_time, index = timed(lambda: vocab_index.VocabIndex(output), args.repeat)
+
+            # 측정 중에는 이 색인을 사용
+            vocab_index._index = index
+            per_sentence = tag_time(parser, sents, args.repeat)
+
+            tagger = dict_tagger(source)
+            dict_seconds, _ = timed(lambda: [tagger(sent) for sent in sents], args.repeat)
+            print(f"{name:<16} {count:>8,} {build_time * 1000:>9.1f} {load_time * 1000:>8.2f} "
+                  f"{per_sentence:>12.3f} {dict_seconds / len(sents) * 1000:>13.3f} "
+                  f"{heap_kb(lambda: vocab_index.VocabIndex(output)):>11,.0f} {heap_kb(lambda: dict_tagger(source)):>11,.0f}")
+        vocab_index._index = None
+
+        levels = [parser.analyze_vocabulary(sent) for sent in sents]
+        found = sum(len(v["words"]) for v in levels if v)
+        print(f"표시된 단어 {found}개 (토큰당 {found / max(tokens, 1):.2f}), "
+              f"문장 난이도 분포: {dict(sorted(Counter(v['level'] or '-' for v in levels if v).items()))}")
+    finally:
+        vocab_index._index = None
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""gunicorn 워커 수별 메모리 / 처리량 측정 (Linux)
+
+워커 수마다 gunicorn(gunicorn.conf.py, preload)을 새로 띄우고
+  1. /readyz 가 200 이 될 때까지 기다린 뒤 워커당 메모리 (/proc/<pid>/smaps_rollup)
+     - RSS: 공유 페이지 포함, PSS: 공유 페이지를 나눠 계산, private: 워커 전용
+  2. --duration 초 동안 --concurrency 개 연결로 /api/analyze_batch 요청 (번역 없음,
+     분석 캐시를 거치지 않는 경로) - 초당 요청 수, 지연 p50/p95
+  3. 부하 후 워커당 메모리 다시 측정
+을 출력한다. 측정은 실제 모델(en_core_web_lg)이 설치된 배포 환경에서 한다.
+
+사용법: python bench/bench_workers.py [--workers 1 2 4 8] [--duration 20] [--concurrency 16]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_stages import load_pages
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def memory_kb(pid):
+    """{"rss": , "pss": , "private": } (KB)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def workers_memory(master_pid):
+    """워커 평균 메모리 (MB)"""
+    rows = [memory_kb(pid) for pid in worker_pids(master_pid)]
+    return {key: sum(row[key] for row in rows) / len(rows) / 1024 for key in rows[0]}
+
+
+def wait_ready(url, process, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn 이 종료되었습니다")
+        try:
+            if requests.get(url + "/readyz", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("준비 시간 초과")
+
+
+def load_test(url, payloads, duration, concurrency):
+    """duration 초 동안 요청을 반복, (초당 요청 수, 지연 목록(초), 오류 수)"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def run(index):
+        session = requests.Session()
+        i = index
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                response = session.post(url + "/api/analyze_batch", json=payloads[i % len(payloads)],
+                                        timeout=60)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+            i += concurrency
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies) / (time.perf_counter() - start), latencies, errors[0]
+
+
+def run_workers(count, args, payloads):
+    port = args.port
+    url = f"http://127.0.0.1:{port}"
+    store = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False).name
+    env = dict(os.environ, WEB_WORKERS=str(count), WEB_BIND=f"127.0.0.1:{port}",
+               ANALYSIS_STORE_DB=store, ANALYSIS_CACHE_DB="", TRANSLATION_CACHE_DB="",
+               DOC_STORE_DB="", METRICS="0", SECRET_KEY=os.getenv("SECRET_KEY", "bench"))
+
+    process = subprocess.Popen([sys.executable, "-m", "gunicorn"], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(url, process, args.ready_timeout)
+        idle = workers_memory(process.pid)
+        # 워밍업 (측정하지 않음)
+        load_test(url, payloads, min(2.0, args.duration), args.concurrency)
+        throughput, latencies, errors = load_test(url, payloads, args.duration, args.concurrency)
+        loaded = workers_memory(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(store + suffix):
+                os.remove(store + suffix)
+
+    latencies = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "workers": count,
+        "idle_mb": idle,
+        "loaded_mb": loaded,
+        "requests_per_sec": throughput,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "errors": errors,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    arg_parser.add_argument("--duration", type=float, default=20.0, help="워커 수별 부하 시간 (초)")
+    arg_parser.add_argument("--concurrency", type=int, default=16, help="동시 연결 수")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--ready-timeout", type=float, default=300.0)
+    arg_parser.add_argument("--output", help="결과를 저장할 JSON 경로")
+    args = arg_parser.parse_args()
+
+    # 요청 하나 = 샘플 페이지 하나
+    payloads = [{"texts": [page]} for page in load_pages()]
+
+    print(f"CPU {os.cpu_count()}개, 동시 연결 {args.concurrency}, 워커당 {args.duration:.0f}초")
+    print(f"{'workers':>7} {'RSS MB':>8} {'PSS MB':>8} {'priv MB':>8} {'RSS(부하후)':>11} "
+          f"{'PSS(부하후)':>11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    results = []
+    for count in args.workers:
+        row = run_workers(count, args, payloads)
+        results.append(row)
+        idle, loaded = row["idle_mb"], row["loaded_mb"]
+        print(f"{count:>7} {idle['rss']:>8.1f} {idle['pss']:>8.1f} {idle['private']:>8.1f} "
+              f"{loaded['rss']:>11.1f} {loaded['pss']:>11.1f} {row['requests_per_sec']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['errors']:>6}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"cpu_count": os.cpu_count(), "concurrency": args.concurrency,
+                       "duration": args.duration, "results": results}, f, ensure_ascii=False, indent=2)
+    return 1 if any(row["errors"] for row in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""배열 엔진(ArrayClauseParser) 동등성 검사 및 속도 비교
+
+output.json / templates/all_sentences.json 의 문장과 bench_clause_tree 의 긴 문장을
+기본 엔진(EnhancedClauseParser)과 배열 엔진으로 각각 분석해 결과 JSON 이 완전히
+같은지 확인하고, 두 엔진의 analyze_span 실행 시간을 비교한다.
+
+사용법: python bench/check_array_engine.py [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model_registry import get_nlp
+from analy import EnhancedClauseParser
+from array_parser import ArrayClauseParser
+from trans_json import convert_to_json_format
+from bench_clause_tree import make_sentence
+
+SOURCES = [
+    os.path.join(ROOT, "output.json"),
+    os.path.join(ROOT, "templates", "all_sentences.json"),
+]
+
+
+def sample_texts():
+    """샘플 페이지 텍스트 + 긴 내포문"""
+    texts = []
+    for path in SOURCES:
+        with open(path, encoding="utf-8") as f:
+            texts.append(" ".join(item["sentence"] for item in json.load(f)["results"]))
+    rng = random.Random(0)
+    texts.append(" ".join(make_sentence(depth, rng) for depth in (2, 4, 8, 16)))
+    return texts
+
+
+def timed(parser, spans, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for span in spans:
+            parser.analyze_span(span)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    nlp = get_nlp()
+    token_engine = EnhancedClauseParser(nlp)
+    array_engine = ArrayClauseParser(nlp)
+
+    docs = [nlp(text) for text in sample_texts()]
+    spans = [sent for doc in docs for sent in doc.sents]
+
+    failures = 0
+    for span in spans:
+        expected = json.dumps(convert_to_json_format(token_engine.analyze_span(span)), sort_keys=True)
+        actual = json.dumps(convert_to_json_format(array_engine.analyze_span(span)), sort_keys=True)
+        if expected != actual:
+            failures += 1
+            print(f"❌ 결과 불일치: {span.text!r}")
+    print(f"{len(spans)}개 문장 검사, 실패 {failures}개")
+
+    token_time = timed(token_engine, spans, args.repeat)
+    array_time = timed(array_engine, spans, args.repeat)
+    print(f"{'engine':>8} {'ms/page set':>12}")
+    print(f"{'token':>8} {token_time * 1000:12.2f}")
+    print(f"{'array':>8} {array_time * 1000:12.2f}  (x{token_time / array_time:.2f})")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
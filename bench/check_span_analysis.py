@@ -0,0 +1,68 @@
+"""analyze_span 회귀 검사
+
+output.json / templates/all_sentences.json 의 문장으로 다음을 확인한다.
+  1. 페이지 전체를 한 번 파싱한 뒤 문장 Span 을 분석한 결과가
+     같은 문장을 독립 Doc 으로 분석한 결과와 완전히 같은지
+  2. 결과 JSON 의 키 구성이 기존 output.json 형식과 같은지
+
+사용법: python bench/check_span_analysis.py
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from model_registry import get_nlp, get_parser
+from trans_json import convert_to_json_format
+
+SOURCES = [
+    os.path.join(ROOT, "output.json"),
+    os.path.join(ROOT, "templates", "all_sentences.json"),
+]
+
+
+def _keys(obj):
+    """중첩 dict/list 의 키 구조만 추출 (기존 output.json 에 없는 어휘 정보는 제외)"""
+    if isinstance(obj, dict):
+        return {k: _keys(v) for k, v in obj.items() if k not in {"sentence_number", "translated", "vocabulary"}}
+    if isinstance(obj, list):
+        return [_keys(obj[0])] if obj else []
+    return None
+
+
+def main():
+    nlp = get_nlp()
+    parser = get_parser()
+    failures = 0
+    checked = 0
+
+    for path in SOURCES:
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)["results"]
+        reference = _keys(stored[0])
+        text = " ".join(item["sentence"] for item in stored)
+
+        for sent in nlp(text).sents:
+            from_span = convert_to_json_format(parser.analyze_span(sent))
+            from_doc = convert_to_json_format(parser.analyze_span(sent.as_doc()))
+            from_doc["sentence"] = sent.text
+            checked += 1
+
+            if json.dumps(from_span, sort_keys=True) != json.dumps(from_doc, sort_keys=True):
+                failures += 1
+                print(f"❌ 결과 불일치: {sent.text!r}")
+            if _keys(from_span)["clause_tree"] and _keys(from_span)["clause_tree"] != reference["clause_tree"]:
+                failures += 1
+                print(f"❌ clause_tree 형식 불일치: {sent.text!r}")
+            if set(_keys(from_span)) != set(reference):
+                failures += 1
+                print(f"❌ 결과 키 불일치: {sorted(from_span)}")
+
+    print(f"{checked}개 문장 검사, 실패 {failures}개")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""전체 흐름 부하 테스트 (soak)
+
+번역 서버 대신 stub(translate_stub, 지연/오류 비율 조절)을 띄우고, gunicorn 으로 앱을 실행한 뒤
+가상 사용자 --concurrency 명이 브라우저와 같은 순서로 요청을 반복한다.
+
+  POST /upload_image      sample*.png 중 하나
+  POST /send_ocr_result   그 이미지의 OCR 결과 (bench/ocr_samples, --fresh-ratio 만큼은 새 문장 추가)
+  GET  /sentence          비동기 분석 작업 시작 (--sync 면 /sentence?sync=1 로 끝까지 기다림)
+  GET  /jobs/<id>/events  작업이 끝날 때까지 SSE 수신 (= 분석 완료까지 걸린 시간)
+  GET  /sentence/<idx>    문장 상세 화면 (--details 개, 0 이면 전부)
+
+--duration 초 동안 실행하며 (--warmup 초는 집계하지 않음)
+  - 처리량: 초당 흐름(사용자 한 명의 한 바퀴) 수 / 요청 수
+  - 경로별 요청 수, 오류 비율, 지연 p50/p95/p99
+  - 서버 메모리: --sample-interval 초마다 마스터+워커 PSS 합계와 워커 private 합계,
+    warmup 이후 증가량과 분당 증가 기울기 (메모리 누수 확인)
+  - stub 번역 서버가 받은 요청 / 오류 수
+를 출력한다. --url 로 이미 떠 있는 서버를 대상으로 하면 --server-pid (gunicorn 마스터 또는
+python app.py 프로세스) 를 줄 때만 메모리를 잰다 (Linux /proc).
+
+사용법: python bench/load_test.py [--workers 2] [--concurrency 8] [--duration 300] [--warmup 30]
+                                  [--latency 0.05] [--jitter 0.05] [--error-rate 0.01] [--output load.json]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_clause_tree import make_sentence
+from bench_workers import memory_kb, wait_ready, worker_pids
+from translate_stub import start_stub
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_samples")
+ROUTES = ["/upload_image", "/send_ocr_result", "/sentence", "/jobs/<id>/events", "/sentence/<idx>"]
+JOB_ID = re.compile(r'const jobId = "([0-9a-f]*)"')
+
+
+def load_samples():
+    """[(이미지 경로, OCR 텍스트)] - bench/ocr_samples 에 OCR 결과가 있는 sample*.png"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "sample*.png"))):
+        text_path = os.path.join(SAMPLES_DIR, os.path.basename(path).rsplit(".", 1)[0] + ".txt")
+        if os.path.exists(text_path):
+            with open(text_path, encoding="utf-8") as f:
+                samples.append((path, f.read()))
+    return samples
+
+
+class Recorder:
+    """경로별 지연 / 오류 집계 (스레드 안전), warmup 중에는 기록하지 않음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.recording = False
+        self.latencies = {route: [] for route in ROUTES}
+        self.errors = {route: 0 for route in ROUTES}
+        self.error_samples = []
+        self.flows = 0
+
+    def add(self, route, seconds, error=None):
+        with self._lock:
+            if not self.recording:
+                return
+            if error is None:
+                self.latencies[route].append(seconds)
+            else:
+                self.errors[route] += 1
+                if len(self.error_samples) < 10:
+                    self.error_samples.append(f"{route}: {error}")
+
+    def flow_done(self):
+        with self._lock:
+            if self.recording:
+                self.flows += 1
+
+
+class VirtualUser:
+    """쿠키 세션 하나로 흐름을 반복하는 사용자"""
+
+    def __init__(self, index, args, samples, recorder):
+        self.args = args
+        self.samples = samples
+        self.recorder = recorder
+        self.rng = random.Random(index)
+        self.session = requests.Session()
+
+    def request(self, route, method, path, check=None, **kwargs):
+        """요청 하나 보내고 기록, 실패하면 None"""
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.args.url + path, timeout=self.args.timeout, **kwargs)
+            error = None if response.status_code < 400 else f"HTTP {response.status_code}"
+            if error is None and check is not None:
+                error = check(response)
+        except requests.RequestException as e:
+            response, error = None, type(e).__name__
+        self.recorder.add(route, time.perf_counter() - start, error)
+        return response if error is None else None
+
+    def wait_job(self, job_id):
+        """SSE 를 끝까지 읽어 작업 결과 (done 이벤트의 progress), 실패하면 None"""
+        progress = {}
+
+        def read_events(response):
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: ") and event in ("done", "failed"):
+                    progress.update(json.loads(line[len("data: "):]))
+                    return None if event == "done" else f"job failed: {progress.get('error')}"
+            return "stream closed"
+
+        response = self.request("/jobs/<id>/events", "GET", f"/jobs/{job_id}/events",
+                                check=read_events, stream=True)
+        return progress if response is not None else None
+
+    def run_flow(self):
+        image_path, text = self.samples[self.rng.randrange(len(self.samples))]
+        if self.rng.random() < self.args.fresh_ratio:
+            # 캐시에 없는 새 문장 (분석 / 번역 캐시 실패 경로)
+            text += "\n\n" + make_sentence(self.rng.choice([1, 2, 4]), self.rng)
+
+        with open(image_path, "rb") as f:
+            files = {"image": (os.path.basename(image_path), f, "image/png")}
+            if self.request("/upload_image", "POST", "/upload_image", files=files) is None:
+                return
+        if self.request("/send_ocr_result", "POST", "/send_ocr_result", json={"text": text}) is None:
+            return
+
+        if self.args.sync:
+            page = self.request("/sentence", "GET", "/sentence?sync=1")
+            if page is None:
+                return
+            total = page.text.count('class="sentence-button"')
+        else:
+            page = self.request("/sentence", "GET", "/sentence")
+            match = JOB_ID.search(page.text) if page is not None else None
+            if not match:
+                return
+            progress = self.wait_job(match.group(1))
+            if progress is None:
+                return
+            total = progress.get("done", 0)
+
+        count = total if not self.args.details else min(total, self.args.details)
+        for idx in range(1, count + 1):
+            self.request("/sentence/<idx>", "GET", f"/sentence/{idx}")
+        self.recorder.flow_done()
+
+    def run(self, stop):
+        while time.time() < stop:
+            self.run_flow()
+
+
+def server_memory(pid):
+    """(마스터+워커 PSS 합계 MB, 워커 private 합계 MB), 워커가 없으면 프로세스 하나만"""
+    try:
+        children = worker_pids(pid)
+    except OSError:
+        children = []
+    rows = [memory_kb(pid)]
+    for p in children:
+        try:
+            rows.append(memory_kb(p))
+        except OSError:
+            # 측정 사이에 끝난 자식 프로세스 (재시작된 워커 등)
+            continue
+    worker_rows = rows[1:] or rows
+    return sum(row["pss"] for row in rows) / 1024, sum(row["private"] for row in worker_rows) / 1024
+
+
+def start_server(args, translate_url):
+    """gunicorn 실행, (프로세스, 정리할 임시 파일 목록)"""
+    store = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False).name
+    env = dict(os.environ, WEB_WORKERS=str(args.workers), WEB_BIND=f"127.0.0.1:{args.port}",
+               ANALYSIS_STORE_DB=store, LIBRETRANSLATE_URL=translate_url,
+               ANALYSIS_CACHE_DB="", TRANSLATION_CACHE_DB="", DOC_STORE_DB="",
+               METRICS="0", SECRET_KEY=os.getenv("SECRET_KEY", "load-test"))
+    process = subprocess.Popen([sys.executable, "-m", "gunicorn"], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return process, [store + suffix for suffix in ("", "-wal", "-shm")]
+
+
+def percentiles(values):
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ms = np.array(values) * 1000
+    return {f"p{q}_ms": float(np.percentile(ms, q)) for q in (50, 95, 99)}
+
+
+def report(recorder, elapsed, memory, stub_stats):
+    routes = {}
+    for route in ROUTES:
+        ok, errors = len(recorder.latencies[route]), recorder.errors[route]
+        routes[route] = dict(requests=ok + errors, errors=errors,
+                             error_rate=errors / (ok + errors) if ok + errors else 0.0,
+                             **percentiles(recorder.latencies[route]))
+    total = sum(row["requests"] for row in routes.values())
+    result = {
+        "seconds": elapsed,
+        "flows": recorder.flows,
+        "flows_per_sec": recorder.flows / elapsed,
+        "requests_per_sec": total / elapsed,
+        "error_rate": sum(row["errors"] for row in routes.values()) / total if total else 0.0,
+        "routes": routes,
+        "error_samples": recorder.error_samples,
+        "translation_stub": stub_stats,
+    }
+    if memory:
+        minutes = np.array([t for t, _, _ in memory]) / 60
+        pss = np.array([value for _, value, _ in memory])
+        private = np.array([value for _, _, value in memory])
+        slope = float(np.polyfit(minutes, private, 1)[0]) if len(memory) > 1 else 0.0
+        result["memory"] = {
+            "pss_start_mb": float(pss[0]), "pss_end_mb": float(pss[-1]),
+            "private_start_mb": float(private[0]), "private_end_mb": float(private[-1]),
+            "private_growth_mb": float(private[-1] - private[0]),
+            "private_mb_per_min": slope,
+            "samples": [[round(t, 1), round(a, 1), round(b, 1)] for t, a, b in memory],
+        }
+    return result
+
+
+def print_report(result):
+    print(f"\n{result['seconds']:.0f}초: 흐름 {result['flows']}회 ({result['flows_per_sec']:.2f}/s), "
+          f"요청 {result['requests_per_sec']:.1f}/s, 오류 {result['error_rate'] * 100:.2f}%")
+    print(f"{'경로':<20} {'요청':>7} {'오류 %':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, row in result["routes"].items():
+        values = [f"{row[key]:>9.1f}" if row[key] is not None else f"{'-':>9}"
+                  for key in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"{route:<20} {row['requests']:>7} {row['error_rate'] * 100:>7.2f} {' '.join(values)}")
+    memory = result.get("memory")
+    if memory:
+        print(f"서버 메모리 (warmup 이후): PSS 합계 {memory['pss_start_mb']:.1f} → {memory['pss_end_mb']:.1f} MB, "
+              f"워커 private {memory['private_start_mb']:.1f} → {memory['private_end_mb']:.1f} MB "
+              f"({memory['private_growth_mb']:+.1f} MB, {memory['private_mb_per_min']:+.2f} MB/분)")
+    if result["translation_stub"]:
+        stub = result["translation_stub"]
+        print(f"stub 번역 서버: 요청 {stub['requests']}, 문장 {stub['sentences']}, 오류 {stub['errors']}")
+    for sample in result["error_samples"]:
+        print(f"  ⚠️ {sample}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--url", help="이미 실행 중인 서버 (없으면 gunicorn 을 띄움)")
+    arg_parser.add_argument("--server-pid", type=int, help="--url 서버의 프로세스 ID (메모리 측정용)")
+    arg_parser.add_argument("--workers", type=int, default=2, help="띄울 gunicorn 워커 수")
+    arg_parser.add_argument("--port", type=int, default=8766)
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="동시 사용자 수")
+    arg_parser.add_argument("--duration", type=float, default=300.0, help="집계 시간 (초, warmup 제외)")
+    arg_parser.add_argument("--warmup", type=float, default=30.0, help="집계하지 않는 시작 시간 (초)")
+    arg_parser.add_argument("--details", type=int, default=3, help="흐름마다 여는 문장 상세 화면 수 (0: 전부)")
+    arg_parser.add_argument("--fresh-ratio", type=float, default=0.2, help="새 문장을 덧붙이는 흐름 비율")
+    arg_parser.add_argument("--sync", action="store_true", help="/sentence?sync=1 사용 (작업 없이 바로 분석)")
+    arg_parser.add_argument("--timeout", type=float, default=120.0, help="요청 제한 시간 (초)")
+    arg_parser.add_argument("--sample-interval", type=float, default=5.0, help="메모리 측정 간격 (초)")
+    arg_parser.add_argument("--translate-url", help="stub 대신 사용할 번역 서버")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="stub 요청당 지연 (초)")
+    arg_parser.add_argument("--jitter", type=float, default=0.05, help="stub 추가 무작위 지연 최대값 (초)")
+    arg_parser.add_argument("--error-rate", type=float, default=0.01, help="stub 503 응답 비율")
+    arg_parser.add_argument("--ready-timeout", type=float, default=300.0)
+    arg_parser.add_argument("--output", help="결과를 저장할 JSON 경로")
+    args = arg_parser.parse_args()
+
+    samples = load_samples()
+    if not samples:
+        print("⚠️ bench/ocr_samples 에 OCR 결과가 있는 sample*.png 가 없습니다.")
+        return 1
+
+    stub = None
+    translate_url = args.translate_url
+    if not translate_url:
+        stub = start_stub(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=0)
+        translate_url = stub[1]
+
+    process, temp_files = None, []
+    server_pid = args.server_pid
+    try:
+        if not args.url:
+            process, temp_files = start_server(args, translate_url)
+            args.url = f"http://127.0.0.1:{args.port}"
+            server_pid = process.pid
+            wait_ready(args.url, process, args.ready_timeout)
+
+        print(f"{args.url}: 사용자 {args.concurrency}명, warmup {args.warmup:.0f}초 + {args.duration:.0f}초, "
+              f"번역 {translate_url}")
+        recorder = Recorder()
+        start = time.time()
+        stop = start + args.warmup + args.duration
+        users = [threading.Thread(target=VirtualUser(i, args, samples, recorder).run, args=(stop,), daemon=True)
+                 for i in range(args.concurrency)]
+        for user in users:
+            user.start()
+
+        time.sleep(args.warmup)
+        if stub:
+            stub[2].requests = stub[2].sentences = stub[2].errors = 0
+        recorder.recording = True
+        measured = time.time()
+        memory = []
+        while time.time() < stop:
+            if server_pid:
+                memory.append((time.time() - measured, *server_memory(server_pid)))
+            time.sleep(min(args.sample_interval, max(stop - time.time(), 0)))
+        # 진행 중인 흐름은 끝까지 기다리되 (제한 시간 안에서) 그 뒤 요청은 집계하지 않음
+        for user in users:
+            user.join(args.timeout)
+        recorder.recording = False
+        elapsed = time.time() - measured
+        if server_pid:
+            memory.append((elapsed, *server_memory(server_pid)))
+
+        result = report(recorder, elapsed, memory, stub[2].as_dict() if stub else None)
+        print_report(result)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(dict(result, concurrency=args.concurrency, workers=args.workers if process else None),
+                          f, ensure_ascii=False, indent=2)
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+        for path in temp_files:
+            if os.path.exists(path):
+                os.remove(path)
+        if stub:
+            stub[0].shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
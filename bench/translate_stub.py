@@ -0,0 +1,122 @@
+"""LibreTranslate 대역(stub) 서버
+
+벤치마크/부하 테스트용으로 번역 서버를 흉내 낸다. 번역문은 "[ko] " + 원문이다.
+응답 지연, 오류 비율, q 배열(여러 문장) 지원 여부를 조절할 수 있다.
+
+    python bench/translate_stub.py --port 5055 --latency 0.05 --error-rate 0.01
+    LIBRETRANSLATE_URL=http://127.0.0.1:5055/translate python app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def translate_text(text):
+    return "[ko] " + text
+
+
+class StubStats:
+    """요청 수 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.sentences = 0
+        self.errors = 0
+
+    def add(self, sentences=0, error=False):
+        with self._lock:
+            self.requests += 1
+            self.sentences += sentences
+            self.errors += int(error)
+
+    def as_dict(self):
+        with self._lock:
+            return {"requests": self.requests, "sentences": self.sentences, "errors": self.errors}
+
+
+def make_handler(latency=0.0, jitter=0.0, error_rate=0.0, batch=True, stats=None, seed=None):
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 헤더/본문을 따로 쓰므로 Nagle 알고리즘을 끄지 않으면 응답마다 ~40ms 지연됨
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            q = body.get("q", "")
+
+            with rng_lock:
+                delay = latency + rng.uniform(0, jitter)
+                failed = rng.random() < error_rate
+            time.sleep(delay)
+
+            if failed:
+                if stats:
+                    stats.add(error=True)
+                return self._send(503, {"error": "stub error"})
+
+            if isinstance(q, list):
+                if not batch:
+                    if stats:
+                        stats.add(error=True)
+                    return self._send(400, {"error": "Invalid request: q must be a string"})
+                if stats:
+                    stats.add(len(q))
+                return self._send(200, {"translatedText": [translate_text(t) for t in q]})
+
+            if stats:
+                stats.add(1)
+            return self._send(200, {"translatedText": translate_text(q)})
+
+    return StubHandler
+
+
+def start_stub(host="127.0.0.1", port=0, **options):
+    """백그라운드 스레드에서 stub 서버 시작, (server, url, stats) 반환 (port=0: 빈 포트)"""
+    stats = StubStats()
+    server = ThreadingHTTPServer((host, port), make_handler(stats=stats, **options))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://{host}:{server.server_address[1]}/translate"
+    return server, url, stats
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=5055)
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="요청당 지연 (초)")
+    arg_parser.add_argument("--jitter", type=float, default=0.0, help="추가 무작위 지연 최대값 (초)")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    arg_parser.add_argument("--no-batch", action="store_true", help="q 배열 요청을 400 으로 거절")
+    args = arg_parser.parse_args()
+
+    handler = make_handler(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           batch=not args.no_batch)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"stub 번역 서버: http://{args.host}:{args.port}/translate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
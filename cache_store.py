@@ -0,0 +1,237 @@
+"""2단 캐시 (메모리 LRU + SQLite 디스크)
+
+번역 캐시와 분석 결과 캐시가 함께 사용한다.
+값은 JSON 으로 직렬화 가능한 객체여야 한다.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import fast_json
+
+
+class LRUCache:
+    """메모리 LRU 캐시 (항목 수, 보존 기간 제한)"""
+
+    def __init__(self, max_entries=10000, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, created = item
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """SQLite 디스크 캐시 (항목 수, 보존 기간 제한)
+
+    항목 수 제한은 매 저장마다가 아니라 prune_every 번 저장할 때마다 검사한다.
+    조회 시각(accessed)은 정리 순서에만 쓰이므로, 조회할 때마다 쓰지 않고 마지막 기록 후
+    touch_interval 초가 지난 항목만 모아 두었다가 touch_batch 개가 되거나 저장/정리할 때
+    한 번에 기록한다 (여러 워커가 읽기마다 쓰기 잠금을 잡지 않도록).
+    """
+
+    def __init__(self, path, max_entries=200000, ttl=None, prune_every=500,
+                 touch_interval=3600, touch_batch=200):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self.touch_interval = touch_interval
+        self.touch_batch = touch_batch
+        self._writes = 0
+        self._touched = {}   # key -> 아직 기록하지 않은 조회 시각
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self._conn.commit()
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys, chunk_size=500):
+        """있는 항목만 {key: value} 로 반환 (SELECT ... IN 한 번에 chunk_size 개씩)"""
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        found, expired = {}, []
+        with self._lock:
+            for i in range(0, len(keys), chunk_size):
+                chunk = keys[i:i + chunk_size]
+                rows = self._conn.execute(
+                    f"SELECT key, value, created, accessed FROM cache"
+                    f" WHERE key IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, value, created, accessed in rows:
+                    if self.ttl is not None and now - created > self.ttl:
+                        expired.append((key,))
+                        continue
+                    found[key] = value
+                    if now - accessed >= self.touch_interval:
+                        self._touched[key] = now
+
+            flush = len(self._touched) >= self.touch_batch
+            if expired:
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", expired)
+            if flush:
+                self._flush_touched()
+            if expired or flush:
+                self._conn.commit()
+        return {key: fast_json.loads(value) for key, value in found.items()}
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany("UPDATE cache SET accessed = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched.clear()
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        now = time.time()
+        rows = [(key, fast_json.dumps(value), now, now) for key, value in items]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", rows)
+            self._flush_touched()
+            self._writes += len(rows)
+            if self._writes >= self.prune_every:
+                self._writes = 0
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self):
+        """오래된 항목과 한도를 넘는 항목(최근 사용 순) 삭제"""
+        self._flush_touched()
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM cache WHERE created < ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            " SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def prune(self):
+        with self._lock:
+            self._prune()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    """메모리 → 디스크 순으로 조회하는 2단 캐시 (적중/실패 횟수 집계)"""
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def get_many(self, keys):
+        """있는 항목만 {key: value} 로 반환 - 메모리에 없는 키는 디스크에 한 번에 조회"""
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            value = self.memory.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        self.memory_hits += len(found)
+
+        disk_found = {}
+        if self.disk is not None and missing:
+            disk_found = self.disk.get_many(missing)
+            for key, value in disk_found.items():
+                self.memory.set(key, value)
+            self.disk_hits += len(disk_found)
+        self.misses += len(missing) - len(disk_found)
+        found.update(disk_found)
+        return found
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def set_many(self, items):
+        items = list(items)
+        for key, value in items:
+            self.memory.set(key, value)
+        if self.disk is not None and items:
+            self.disk.set_many(items)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
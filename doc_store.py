@@ -0,0 +1,190 @@
+"""파싱된 Doc 저장소 (선택)
+
+분석한 텍스트의 Doc 을 spaCy DocBin 으로 직렬화해 (텍스트 sha256, 모델 이름, 모델 버전)
+키로 SQLite 에 저장한다. 절 분석 로직이나 결과 형식이 바뀌어도 저장된 Doc 으로
+분석만 다시 하면 되므로 모델 파이프라인(en_core_web_lg)을 다시 돌릴 필요가 없다.
+
+DOC_STORE_DB 가 설정되어 있을 때만 사용한다.
+
+    python doc_store.py stats                       # 저장된 Doc 수 (모델별)
+    python doc_store.py rederive [--output a.ndjson]  # 저장된 모든 Doc 을 다시 분석
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+DOC_STORE_DB = os.getenv("DOC_STORE_DB", "")
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DocStore:
+    """DocBin 저장소 (SQLite)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " key TEXT NOT NULL, model TEXT NOT NULL, version TEXT NOT NULL,"
+            " data BLOB NOT NULL, created REAL NOT NULL, PRIMARY KEY (key, model, version))"
+        )
+        self._conn.commit()
+
+    def put(self, text, doc, model, version, sentence=False):
+        """Doc 저장 (tensor 는 저장하지 않음)
+
+        sentence: 문장 하나만 파싱한 Doc (ocr_text 로 나눈 문장) - user_data 에 표시해 두고
+        다시 분석할 때 doc.sents 로 나누지 않고 Doc 전체를 한 문장으로 쓴다 (user_data 는 이때만 저장)
+        """
+        from spacy.tokens import DocBin
+        if sentence:
+            doc.user_data["sentence"] = True
+        data = DocBin(docs=[doc], store_user_data=sentence).to_bytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?)",
+                (text_key(text), model, version, data, time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, text, model, version):
+        """저장된 DocBin bytes, 없으면 None (EnhancedClauseParser.load_docs 로 복원)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM docs WHERE key = ? AND model = ? AND version = ?",
+                (text_key(text), model, version),
+            ).fetchone()
+        return row[0] if row else None
+
+    def iter_all(self, batch_size=100):
+        """저장된 모든 (모델, 버전, DocBin bytes)"""
+        last = ("", "", "")
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT key, model, version, data FROM docs"
+                    " WHERE (key, model, version) > (?, ?, ?)"
+                    " ORDER BY key, model, version LIMIT ?",
+                    (*last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for key, model, version, data in rows:
+                yield model, version, data
+            last = rows[-1][:3]
+
+    def stats(self):
+        """{(모델, 버전): 저장된 Doc 수}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, version, COUNT(*) FROM docs GROUP BY model, version"
+            ).fetchall()
+        return {(model, version): count for model, version, count in rows}
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_doc_store():
+    """프로세스 공용 저장소, DOC_STORE_DB 가 비어 있으면 None"""
+    global _store
+    if not DOC_STORE_DB:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DocStore(DOC_STORE_DB)
+    return _store
+
+
+def rederive_all(store, output_path=None, lang="en"):
+    """저장된 모든 Doc 을 현재 절 분석기로 다시 분석
+
+    모델은 로드하지 않고 빈 파이프라인의 vocab 으로 Doc 을 복원한다.
+    결과는 Doc 을 만든 모델 이름/버전의 분석 캐시에 저장하고,
+    output_path 가 있으면 문장별 결과를 NDJSON 으로도 기록한다. 분석한 문장 수 반환
+    """
+    import spacy
+    import fast_json
+    import ocr_text
+    from analysis_cache import create_analysis_cache
+    from model_registry import registry
+    from trans_json import convert_to_json_format
+
+    parser = registry.parser_class(spacy.blank(lang))
+    caches = {}
+    count = 0
+    output = open(output_path, "w", encoding="utf-8") if output_path else None
+    try:
+        for model, version, data in store.iter_all():
+            if (model, version) not in caches:
+                caches[(model, version)] = create_analysis_cache(model, version)
+            cache = caches[(model, version)]
+
+            for doc in parser.load_docs(data):
+                if doc.user_data.get("sentence"):
+                    sents = [doc[:]]
+                else:
+                    sents = list(doc.sents)
+                    # 문서 전체로 저장된 Doc 은 예전 방식(parser)으로 나눈 결과
+                    cache.set_split(doc.text, ocr_text.split_variant("parser"),
+                                    [sent.text for sent in sents])
+                for sent in sents:
+                    json_data = convert_to_json_format(parser.analyze_span(sent))
+                    cache.set(sent.text, json_data)
+                    if output:
+                        output.write(fast_json.dumps(json_data) + "\n")
+                    count += 1
+    finally:
+        if output:
+            output.close()
+    return count
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="파싱된 Doc 저장소 관리")
+    arg_parser.add_argument("command", choices=["stats", "rederive"])
+    arg_parser.add_argument("--db", default=DOC_STORE_DB, help="저장소 경로 (기본: DOC_STORE_DB)")
+    arg_parser.add_argument("--output", help="rederive 결과를 기록할 NDJSON 파일")
+    arg_parser.add_argument("--lang", default=os.getenv("NLP_LANG", "en"))
+    args = arg_parser.parse_args(argv)
+
+    if not args.db:
+        print("⚠️ DOC_STORE_DB 또는 --db 로 저장소 경로를 지정하세요.")
+        return 1
+    store = DocStore(args.db)
+
+    if args.command == "stats":
+        for (model, version), count in sorted(store.stats().items()):
+            print(f"{model} {version}: {count}개")
+        return 0
+
+    from analysis_cache import CACHE_DB
+    if not CACHE_DB and not args.output:
+        print("⚠️ ANALYSIS_CACHE_DB 가 설정되어 있지 않아 결과가 저장되지 않습니다. --output 을 지정하세요.")
+        return 1
+    count = rederive_all(store, args.output, args.lang)
+    print(f"✅ {len(store)}개 Doc, {count}개 문장을 다시 분석했습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
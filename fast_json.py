@@ -0,0 +1,27 @@
+"""JSON 직렬화 도우미
+
+orjson 이 설치되어 있으면 사용하고, 없으면 표준 json 모듈을 쓴다.
+분석 결과의 verb_np_roles 는 절 ID(int)를 키로 쓰므로 orjson 은 OPT_NON_STR_KEYS 로 호출한다.
+(두 경우 모두 int 키는 문자열로 바뀌고, 한글은 그대로 출력된다)
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(obj):
+    """obj 를 JSON 문자열로"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def loads(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
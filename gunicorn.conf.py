@@ -0,0 +1,46 @@
+"""gunicorn 설정 (멀티 워커 실행)
+
+    gunicorn                                   # 이 파일을 자동으로 읽음
+    WEB_WORKERS=4 gunicorn
+
+preload 모드(기본)에서는 마스터 프로세스가 앱을 만들고 spaCy 모델을 로드한 뒤
+워커를 fork 한다. 모델(단어 벡터 테이블 등)은 워커들이 copy-on-write 로 공유하므로
+워커를 늘려도 워커당 메모리는 모델 크기만큼 늘지 않는다. 로드 직후 gc.freeze() 로
+모델 객체를 GC 추적 대상에서 빼서, GC 가 참조 정보를 쓰면서 공유 페이지가
+복사되는 것을 줄인다.
+
+요청 상태(OCR 텍스트, 분석 결과, 작업 진행 상황)는 워커 간에 공유되어야 하므로
+워커가 2개 이상이면 ANALYSIS_STORE_DB(SQLite)를 사용한다 (지정하지 않으면 아래 기본 경로).
+/metrics 는 요청을 처리한 워커 하나의 값만 보여 준다.
+"""
+import gc
+import os
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_WORKERS", "2"))
+threads = int(os.getenv("WEB_THREADS", "4"))
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+preload_app = os.getenv("WEB_PRELOAD", "1") == "1"
+wsgi_app = "app:create_app()"
+
+if workers > 1:
+    os.environ.setdefault("ANALYSIS_STORE_DB", os.path.join("cache", "analysis_store.sqlite3"))
+
+if preload_app:
+    # 마스터에서 워밍업 스레드를 띄우지 않음 (스레드는 fork 후 워커에 남지 않음)
+    # 모델은 when_ready 에서 워커를 만들기 전에 로드
+    os.environ["MODEL_WARMUP"] = "0"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from app import warm_up
+    from model_registry import registry
+
+    warm_up()
+    if not registry.loaded:
+        raise RuntimeError(f"모델 로드 실패: {registry.error}")
+    gc.collect()
+    gc.freeze()
+    server.log.info("모델 로드 완료 (%.1f초), 워커 %d개 시작", registry.load_seconds, workers)
@@ -0,0 +1,212 @@
+"""업로드 이미지 OCR 전처리
+
+휴대폰으로 찍은 큰 사진을 그대로 OCR 하면 느리고 메모리를 많이 쓰므로, 업로드 시
+OCR 용 파생 이미지를 따로 만든다.
+
+  1. 축소: 페이지 폭(A4) 기준 TARGET_DPI 가 되도록 줄임. JPEG 은 draft() 로 디코딩
+     단계에서 1/2~1/8 크기 흑백으로 읽고, 나머지는 reduce()/reducing_gap 으로 줄여
+     원본 크기의 중간 이미지를 최소화한다.
+  2. 흑백 변환 (투명 배경은 흰색으로)
+  3. 기울기 보정: 작은 사본에서 각도별 행 투영 분산이 가장 큰 각도를 찾아 회전
+  4. 이진화: Otsu 임계값, 1비트 PNG 로 저장
+
+저장 파일은 내용 sha256 으로 이름을 정하므로 같은 이미지를 다시 올리면 이미 만든
+파생 이미지를 그대로 쓴다. Pillow 가 없으면 원본만 저장하고 원본으로 OCR 한다.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+# 사진에는 실제 DPI 정보가 없으므로 페이지 폭(A4, 인치)으로 목표 크기를 정함
+PAGE_WIDTH_INCH = 8.27
+# 기울기 탐색 범위 (도), 1도 간격으로 찾은 뒤 주변을 DESKEW_STEP 간격으로 다시 탐색
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.25
+# 기울기 탐색용 사본 폭 (픽셀)
+DESKEW_WIDTH = 600
+
+CHUNK_SIZE = 1 << 16
+
+HASH_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+AVAILABLE = Image is not None
+
+
+def target_width(dpi=TARGET_DPI):
+    return int(dpi * PAGE_WIDTH_INCH)
+
+
+# EXIF Orientation 값 -> 보정 변환 (ImageOps.exif_transpose 와 같은 대응)
+_ORIENTATION = {
+    2: "FLIP_LEFT_RIGHT", 3: "ROTATE_180", 4: "FLIP_TOP_BOTTOM",
+    5: "TRANSPOSE", 6: "ROTATE_270", 7: "TRANSVERSE", 8: "ROTATE_90",
+}
+
+
+def _orientation(image):
+    try:
+        return image.getexif().get(0x0112, 1)
+    except Exception:
+        return 1
+
+
+def open_reduced(path, max_width):
+    """가로가 max_width 이하가 되도록 줄인 흑백 이미지 (원본 해상도 중간 이미지를 만들지 않음)
+
+    축소를 먼저 하고 흑백 변환/EXIF 회전은 줄인 이미지에 적용한다.
+    """
+    image = Image.open(path)
+    orientation = _orientation(image)
+    width, height = image.size
+    shown_width = height if orientation in (5, 6, 7, 8) else width
+    scale = min(1.0, max_width / shown_width)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    if image.format == "JPEG":
+        # 디코더가 직접 1/2~1/8 크기 흑백으로 읽음
+        image.draft("L", size)
+    if image.mode not in ("L", "LA", "RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    if image.size != size:
+        image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    image = _flatten(image)
+    if orientation in _ORIENTATION:
+        image = image.transpose(getattr(Image.Transpose, _ORIENTATION[orientation]))
+    return image
+
+
+def _flatten(image):
+    """흑백 (L) 으로 변환, 투명한 부분은 흰색"""
+    if image.mode in ("RGBA", "LA"):
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    return image.convert("L")
+
+
+def otsu_threshold(image):
+    """흑백 이미지의 Otsu 임계값 (0~255)"""
+    hist = np.array(image.histogram()[:256], dtype=np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+
+def estimate_skew(image, max_angle=DESKEW_MAX_ANGLE, step=DESKEW_STEP):
+    """기울어진 각도 (도, image.rotate 에 그대로 넘기면 보정됨)
+
+    글자 줄이 수평일 때 행별 검은 화소 수의 분산이 가장 크다는 점을 이용한다.
+    """
+    small = image
+    if image.width > DESKEW_WIDTH:
+        small = image.resize((DESKEW_WIDTH, max(1, round(image.height * DESKEW_WIDTH / image.width))),
+                             Image.Resampling.BILINEAR, reducing_gap=2.0)
+    threshold = otsu_threshold(small)
+    ink = small.point(lambda v: 255 if v <= threshold else 0)
+
+    def score(angle):
+        rotated = np.asarray(ink.rotate(angle, Image.Resampling.NEAREST, fillcolor=0))
+        return rotated.sum(axis=1, dtype=np.float64).var()
+
+    coarse = max(np.arange(-max_angle, max_angle + 0.5, 1.0), key=lambda a: score(float(a)))
+    fine = np.arange(coarse - 1 + step, coarse + 1, step)
+    return float(max(fine[np.abs(fine) <= max_angle], key=lambda a: score(float(a))))
+
+
+def preprocess(path, output_path, dpi=TARGET_DPI, deskew=True):
+    """OCR 용 파생 이미지 저장, 처리 정보 반환"""
+    image = open_reduced(path, target_width(dpi))
+
+    angle = estimate_skew(image) if deskew else 0.0
+    if angle:
+        image = image.rotate(angle, Image.Resampling.BILINEAR, expand=True, fillcolor=255)
+
+    threshold = otsu_threshold(image)
+    binary = image.point(lambda v: 255 if v > threshold else 0).convert("1", dither=Image.Dither.NONE)
+    binary.save(output_path, "PNG", dpi=(dpi, dpi))
+    return {"size": binary.size, "angle": angle, "threshold": threshold}
+
+
+def save_upload(stream, folder, ext):
+    """업로드 스트림을 조각 단위로 해시하며 저장, (sha256, 저장 경로, 이미 있었는지) 반환"""
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+
+        content_hash = digest.hexdigest()
+        path = os.path.join(folder, f"{content_hash}.{ext}")
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return content_hash, path, True
+        os.replace(tmp_path, path)
+        return content_hash, path, False
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def find_upload(folder, content_hash, extensions):
+    """내용 해시로 저장된 원본 경로, 없으면 None"""
+    if not isinstance(content_hash, str) or not HASH_PATTERN.fullmatch(content_hash):
+        return None
+    for ext in extensions:
+        path = os.path.join(folder, f"{content_hash}.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def ocr_image_path(folder, content_hash):
+    return os.path.join(folder, f"{content_hash}.ocr.png")
+
+
+def prepare_upload(stream, folder, ext):
+    """업로드 저장 + OCR 용 파생 이미지 생성 (같은 내용이면 기존 파일 재사용)
+
+    {"hash", "path", "ocr_path", "reused"} 반환. Pillow 가 없거나 전처리에 실패하면
+    ocr_path 는 원본 경로다.
+    """
+    content_hash, path, existed = save_upload(stream, folder, ext)
+    ocr_path = ocr_image_path(folder, content_hash)
+    reused = existed and os.path.exists(ocr_path)
+
+    if not reused and AVAILABLE:
+        tmp_path = ocr_path + ".part"
+        try:
+            preprocess(path, tmp_path)
+            os.replace(tmp_path, ocr_path)
+        except Exception as e:
+            print(f"⚠️ OCR 전처리 실패, 원본 사용: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    if not os.path.exists(ocr_path):
+        ocr_path = path
+    return {"hash": content_hash, "path": path, "ocr_path": ocr_path, "reused": reused}
@@ -0,0 +1,210 @@
+"""처리 단계별 시간 측정 / 카운터 (Prometheus 텍스트 형식으로 출력)
+
+METRICS=1 일 때만 기록한다. 꺼져 있으면 stage() 는 아무것도 하지 않는 공용
+컨텍스트 매니저를 돌려주고 inc()/observe() 는 바로 반환하므로 부담이 거의 없다.
+
+    with metrics.stage("parse"):
+        doc = nlp(text)
+    metrics.inc("sentences_total", len(sents))
+
+느린 요청 기록: trace() 안에서 실행된 stage() 구간을 모아 두었다가 전체 시간이
+METRICS_SLOW_MS 이상이면 METRICS_SLOW_LOG 파일(없으면 로그)에 JSON 한 줄로 남긴다.
+값은 프로세스별로 집계된다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("METRICS", "0") == "1"
+SLOW_MS = float(os.getenv("METRICS_SLOW_MS", "1000"))
+SLOW_LOG = os.getenv("METRICS_SLOW_LOG", "")
+
+PREFIX = "ela_"
+
+# 히스토그램 구간 (초)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "stage_seconds": "처리 단계별 소요 시간",
+    "request_seconds": "HTTP 요청 처리 시간 (스트리밍 응답은 응답 시작까지)",
+    "sentences_total": "분석한 문장 수",
+    "tokens_total": "파싱한 토큰 수",
+    "segments_dropped_total": "문장 분리 후 걸러낸 조각 수 (제목, 잡음 줄 등)",
+    "analysis_cache_hits_total": "분석 캐시 적중",
+    "analysis_cache_misses_total": "분석 캐시 실패",
+    "translation_cache_hits_total": "번역 캐시 적중 (문장)",
+    "translation_cache_misses_total": "번역 캐시 실패 (문장)",
+    "translation_errors_total": "번역 요청 실패",
+}
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> 값
+_histograms = {}  # (name, labels) -> [구간별 개수..., 합계, 개수]
+_local = threading.local()
+
+
+def enable(value=True):
+    global ENABLED
+    ENABLED = value
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += seconds
+        hist[-1] += 1
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopStage()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        observe("stage_seconds", elapsed, stage=self.name)
+        spans = getattr(_local, "spans", None)
+        if spans is not None:
+            spans.append((self.name, self.start, elapsed))
+        return False
+
+
+def stage(name):
+    """처리 단계 시간 측정 컨텍스트 매니저"""
+    if not ENABLED:
+        return _NOOP
+    return _Stage(name)
+
+
+def start_trace():
+    """현재 스레드에서 느린 요청 기록 시작"""
+    if ENABLED:
+        _local.spans = []
+        _local.trace_start = time.perf_counter()
+
+
+def finish_trace(name, **info):
+    """기록 종료 - 전체 시간(초) 반환, 기준보다 느리면 구간별 시간을 남김"""
+    spans = getattr(_local, "spans", None)
+    if spans is None:
+        return None
+    start = _local.trace_start
+    _local.spans = None
+    total = time.perf_counter() - start
+
+    if total * 1000 >= SLOW_MS:
+        record = dict(info, name=name, time=time.time(), total_ms=round(total * 1000, 3),
+                      spans=[[stage_name, round((s - start) * 1000, 3), round(d * 1000, 3)]
+                             for stage_name, s, d in spans])
+        _write_slow(record)
+    return total
+
+
+@contextmanager
+def trace(name, **info):
+    start_trace()
+    try:
+        yield
+    finally:
+        finish_trace(name, **info)
+
+
+_slow_lock = threading.Lock()
+
+
+def _write_slow(record):
+    line = json.dumps(record, ensure_ascii=False)
+    if not SLOW_LOG:
+        logger.warning("느린 요청: %s", line)
+        return
+    with _slow_lock:
+        with open(SLOW_LOG, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def render():
+    """Prometheus 텍스트 형식 (version 0.0.4)"""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(value)) for key, value in _histograms.items())
+
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {PREFIX}{name} {HELP[name]}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), hist in histograms:
+        header(name, "histogram")
+        for bound, count in zip(BUCKETS, hist):
+            lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+        lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist[-1]}")
+        lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {hist[-2]}")
+        lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {hist[-1]}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,141 @@
+"""spaCy 모델 레지스트리
+
+모델과 EnhancedClauseParser(및 Matcher)를 프로세스 당 한 번만 만들고
+모든 요청이 공유하도록 한다. 첫 사용 시 지연 로드되며 스레드 안전하다.
+
+절 분석 엔진은 NLP_ENGINE 으로 고른다.
+  token: Token 객체를 순회하는 기본 엔진 (EnhancedClauseParser)
+  array: Doc.to_array 배열 연산 엔진 (ArrayClauseParser, 결과 동일)
+
+spaCy(analy) 는 모델을 처음 로드할 때 import 하므로 이 모듈 import 는 가볍다.
+start_warmup() 으로 서버 시작 시 백그라운드에서 미리 로드할 수 있다.
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 분석기가 읽지 않는 파이프 (tagger/parser/attribute_ruler 결과만 사용)
+DEFAULT_DISABLE = ("ner",)
+
+DEFAULT_ENGINE = "token"
+ENGINES = ("token", "array")
+
+
+def _parser_class(engine):
+    if engine == "token":
+        from analy import EnhancedClauseParser
+        return EnhancedClauseParser
+    if engine == "array":
+        from array_parser import ArrayClauseParser
+        return ArrayClauseParser
+    raise ValueError(f"알 수 없는 분석 엔진: {engine}")
+
+
+def _env_disable():
+    value = os.getenv("NLP_DISABLE")
+    if value is None:
+        return DEFAULT_DISABLE
+    return tuple(name.strip() for name in value.split(",") if name.strip())
+
+
+class ModelRegistry:
+    """언어 모델과 파서를 한 번만 로드해 공유하는 저장소"""
+
+    def __init__(self, lang="en", disable=DEFAULT_DISABLE, engine=DEFAULT_ENGINE):
+        self.lang = lang
+        self.disable = tuple(disable)
+        if engine not in ENGINES:
+            raise ValueError(f"알 수 없는 분석 엔진: {engine}")
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._nlp = None
+        self._parser = None
+        self._warmup = None
+        self.error = None        # 백그라운드 로드 실패 시 예외 메시지
+        self.load_seconds = None
+
+    @property
+    def parser_class(self):
+        return _parser_class(self.engine)
+
+    def load(self):
+        """모델 로드 (이미 로드되어 있으면 그대로 반환)"""
+        if self._nlp is None:
+            with self._lock:
+                if self._nlp is None:
+                    from analy import load_nlp_model
+                    start = time.perf_counter()
+                    nlp = load_nlp_model(self.lang, disable=self.disable)
+                    self._parser = self.parser_class(nlp)
+                    self._nlp = nlp
+                    self.load_seconds = time.perf_counter() - start
+        return self._nlp
+
+    def warm_up(self):
+        """모델 로드 후 짧은 문장을 한 번 분석 (첫 요청에서 생기는 지연을 미리 처리)"""
+        try:
+            self.load()
+            self._parser.analyze_sentence("The model is ready.")
+        except Exception as e:
+            logger.exception("모델 워밍업 실패")
+            self.error = str(e)
+
+    def start_warmup(self, target=None):
+        """백그라운드 스레드에서 target (기본 warm_up()) 실행, 이미 시작했으면 그 스레드 반환"""
+        with self._lock:
+            if self._warmup is None:
+                self._warmup = threading.Thread(target=target or self.warm_up, name="model-warmup",
+                                                daemon=True)
+                self._warmup.start()
+        return self._warmup
+
+    @property
+    def loaded(self):
+        return self._nlp is not None
+
+    @property
+    def ready(self):
+        """모델이 로드되어 요청을 받을 수 있는지 (워밍업 중이면 끝날 때까지 False)"""
+        if self._nlp is None:
+            return False
+        return self._warmup is None or not self._warmup.is_alive()
+
+    @property
+    def nlp(self):
+        return self.load()
+
+    @property
+    def parser(self):
+        self.load()
+        return self._parser
+
+    def info(self):
+        """모델 이름, 버전, 사용 중인 파이프 정보"""
+        nlp = self.load()
+        meta = nlp.meta
+        return {
+            "name": f"{meta.get('lang', self.lang)}_{meta.get('name', 'unknown')}",
+            "version": meta.get("version", "0.0.0"),
+            "pipes": list(nlp.pipe_names),
+            "disabled": list(nlp.disabled),
+            "engine": self.engine,
+        }
+
+
+registry = ModelRegistry(os.getenv("NLP_LANG", "en"), disable=_env_disable(),
+                         engine=os.getenv("NLP_ENGINE", DEFAULT_ENGINE))
+
+
+def get_nlp():
+    return registry.nlp
+
+
+def get_parser():
+    return registry.parser
+
+
+def model_info():
+    return registry.info()
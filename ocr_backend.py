@@ -0,0 +1,148 @@
+"""서버 OCR (선택)
+
+기본은 브라우저의 Tesseract.js 로 OCR 한다 (OCR_BACKEND=client). OCR_BACKEND=tesseract 이고
+서버에 tesseract 실행 파일이 있으면 /api/ocr 로 여러 이미지를 한 번에 받아 프로세스 풀에서
+동시에 OCR 한다. 사용할 수 없으면 get_ocr_backend() 가 None 을 돌려주고 클라이언트는
+Tesseract.js 를 그대로 쓴다.
+
+페이지마다 image_prep 의 전처리 이미지로 OCR 하고, 결과 텍스트는 이미지 내용 해시로
+저장해 두므로 같은 이미지는 다시 OCR 하지 않는다.
+"""
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import image_prep
+
+OCR_BACKEND = os.getenv("OCR_BACKEND", "client")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "60"))
+MAX_IMAGES = int(os.getenv("OCR_MAX_IMAGES", "20"))
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", "tesseract")
+
+
+class OCRError(Exception):
+    """OCR 실행 실패"""
+
+
+def run_tesseract(path, lang=OCR_LANG, timeout=OCR_TIMEOUT, cmd=TESSERACT_CMD):
+    """tesseract 실행 파일로 이미지 하나를 OCR"""
+    # 프로세스 여러 개가 동시에 돌므로 tesseract 내부 OpenMP 스레드는 1개로 제한
+    env = dict(os.environ, OMP_THREAD_LIMIT="1")
+    try:
+        result = subprocess.run([cmd, path, "stdout", "-l", lang], capture_output=True,
+                                timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        raise OCRError(f"OCR 시간 초과 ({timeout:.0f}초): {os.path.basename(path)}")
+    except OSError as e:
+        raise OCRError(f"tesseract 실행 실패: {e}")
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise OCRError(f"tesseract 오류: {message[-1] if message else result.returncode}")
+    return result.stdout.decode("utf-8", "replace")
+
+
+def text_cache_path(ocr_path, lang):
+    return f"{os.path.splitext(ocr_path)[0]}.{lang}.txt"
+
+
+def ocr_page(path, ocr_path, lang=OCR_LANG, timeout=OCR_TIMEOUT, cmd=TESSERACT_CMD):
+    """페이지 하나 OCR (워커 프로세스에서 실행) - 전처리 이미지가 없으면 만들어서 사용"""
+    start = time.perf_counter()
+    cache_path = text_cache_path(ocr_path, lang)
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            return {"text": f.read(), "seconds": time.perf_counter() - start, "cached": True}
+
+    if not os.path.exists(ocr_path) and image_prep.AVAILABLE:
+        tmp_path = ocr_path + f".{os.getpid()}.part"
+        try:
+            image_prep.preprocess(path, tmp_path)
+            os.replace(tmp_path, ocr_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    source = ocr_path if os.path.exists(ocr_path) else path
+
+    text = run_tesseract(source, lang, timeout, cmd)
+    tmp_path = cache_path + f".{os.getpid()}.part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, cache_path)
+    return {"text": text, "seconds": time.perf_counter() - start, "cached": False}
+
+
+class TesseractOCR:
+    """tesseract 실행 파일 + 프로세스 풀"""
+
+    name = "tesseract"
+
+    def __init__(self, workers=OCR_WORKERS, lang=OCR_LANG, timeout=OCR_TIMEOUT, cmd=TESSERACT_CMD):
+        self.workers = max(1, workers)
+        self.lang = lang
+        self.timeout = timeout
+        self.cmd = cmd
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    @staticmethod
+    def available(cmd=TESSERACT_CMD):
+        return shutil.which(cmd) is not None
+
+    def _pool(self):
+        # 첫 사용 시 생성, fork 된 프로세스(gunicorn 워커)에서는 새로 만듦
+        # 스레드가 있는 웹 서버 프로세스를 fork 하지 않도록 spawn 사용
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+                self._pid = os.getpid()
+            return self._executor
+
+    def ocr_pages(self, pages):
+        """[(원본 경로, 전처리 이미지 경로), ...] 를 동시에 OCR, 입력 순서대로 결과 반환"""
+        pool = self._pool()
+        try:
+            futures = [pool.submit(ocr_page, path, ocr_path, self.lang, self.timeout, self.cmd)
+                       for path, ocr_path in pages]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            # 워커 프로세스가 죽으면 풀을 버리고 다음 요청에서 새로 만듦
+            with self._lock:
+                if self._executor is pool:
+                    self._executor = None
+            raise OCRError("OCR 워커 프로세스가 비정상 종료되었습니다.")
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+BACKENDS = {
+    "tesseract": TesseractOCR,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_ocr_backend():
+    """설정된 서버 OCR 백엔드, 사용할 수 없으면 None (클라이언트 OCR 사용)"""
+    global _backend
+    backend_class = BACKENDS.get(OCR_BACKEND)
+    if backend_class is None or not backend_class.available():
+        return None
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_class()
+    return _backend
@@ -0,0 +1,213 @@
+"""OCR 텍스트 정리 / 가벼운 문장 분리
+
+OCR 결과는 줄 끝 하이픈으로 끊긴 단어, 중간에 끊긴 줄, 쪽 번호나 머리말, 시험지의 한국어
+문항/주석 줄이 섞여 있다. 이런 줄이 그대로 문장이 되면 문장마다 전체 파이프라인 파싱과
+번역 요청이 하나씩 낭비되므로, 분석 전에
+  1. 정리: 합자/soft hyphen 치환, 잡음 줄 제거, 하이픈 이어 붙이기, 문단 안의 줄 합치기
+  2. 분리: 파서 대신 모델의 senter (없으면 규칙 기반 Sentencizer)
+  3. 거르기: 글자가 거의 없거나 문장 부호 없이 짧은 조각(제목 등) 제외
+를 거친 문장만 넘긴다.
+
+SEGMENTER 로 분리 방식을 고른다.
+  auto       : senter 가 있으면 senter, 없으면 sentencizer (기본)
+  senter     : 모델의 senter (파이프라인에서 꺼져 있어도 사용)
+  sentencizer: 문장 부호 규칙
+  parser     : 예전 방식 - 정리 없이 전체 텍스트를 파싱해 doc.sents 사용
+"""
+import os
+import re
+from collections import Counter
+
+SEGMENTER = os.getenv("SEGMENTER", "auto")
+SEGMENTERS = ("auto", "senter", "sentencizer", "parser")
+
+# 정리/거르기 규칙을 바꾸면 올림 - 문장 분리 캐시 키에 들어가 예전 분리 결과를 쓰지 않게 함
+NORMALIZE_VERSION = 2
+
+# 문장 부호가 없는 조각도 이 단어 수 이상이면 문장으로 봄
+MIN_WORDS = 6
+# 여러 번 나오면 머리말/꼬리말로 보는 줄 길이 상한
+HEADER_MAX_CHARS = 60
+
+_CHAR_FIXES = str.maketrans({
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl",
+    "\u00ad": None,                        # soft hyphen
+    "\u00a0": " ", "\u2009": " ", "\u200b": None,
+    "\u2010": "-", "\u2011": "-",
+    "\f": "\n\n",                         # 쪽 구분
+    "\r": None,
+})
+_PAGE_NUMBER = re.compile(r"^(?:page|p\.)?\s*[-–—]?\s*\d{1,4}(?:\s*/\s*\d{1,4})?\s*[-–—]?$", re.I)
+# 시험지 배점 / 주석 표시 - [3점] (영어 OCR 로는 [3A] 등), [1]
+_MARKERS = re.compile(r"\s*\[(?:\d[^\]]{0,3}|[^\]A-Za-z]{1,8})\]")
+_LATIN = re.compile(r"[A-Za-z]")
+_HANGUL = re.compile(r"[가-힣ㄱ-ㆎ]")
+_TERMINAL = re.compile(r"[.!?][\"'’”)\]]*$")
+# 한국어를 영어 모델로 OCR 하면 나오는 숫자 섞인 조각 (예: "7S", "A3b")
+_NOISE_WORD = re.compile(r"^(?:\w*\d[A-Za-z]\w*|[A-Za-z]*\d+[A-Za-z]+)$")
+# 대문자만 있는 짧은 조각 (예: "CHS") - 문장 모양이 없는 줄에서만 잡음으로 봄
+_CAPS_WORD = re.compile(r"^[A-Z]{2,4}$")
+# 이 길이 이상의 알파벳 단어가 있으면 사전 단어가 있는 줄로 봄
+WORD_MIN_CHARS = 5
+_HYPHEN_WORD = re.compile(r"([A-Za-z]+)-$")
+_FIRST_WORD = re.compile(r"^([a-z]+)")
+
+
+def _latin_ratio(line):
+    chars = len(line) - line.count(" ")
+    return len(_LATIN.findall(line)) / chars if chars else 0.0
+
+
+def _has_sentence_shape(line, words):
+    """거의 알파벳 단어로만 되어 있고, 문장 부호로 끝나거나 사전 길이의 단어가 있는 줄
+
+    "READ THE TEXT BELOW.", "I AM HERE." 는 문장, "23. CHS Sol FAS 7/8 AAS AS?" 는 아님
+    """
+    alpha = [word for word in words if word.isalpha()]
+    if len(alpha) < 0.8 * len(words):
+        return False
+    return bool(_TERMINAL.search(line)) or any(len(word) >= WORD_MIN_CHARS for word in alpha)
+
+
+def _noise_ratio(line):
+    words = [word.strip(".,;:!?()[]\"'*") for word in line.split()]
+    # 대문자로만 쓴 문장은 잡음이 아님 - 문장 모양이 없을 때만 대문자 조각을 잡음으로 셈
+    caps_noise = not _has_sentence_shape(line, words)
+    return sum(not word or bool(_NOISE_WORD.match(word)) or (caps_noise and bool(_CAPS_WORD.match(word)))
+               for word in words) / len(words)
+
+
+def _is_marker_line(line):
+    # 쪽 번호, 주석 표시로 시작하는 줄, 알파벳이 거의 없는 줄 - 앞뒤 줄과 관계없이 제외
+    return bool(_PAGE_NUMBER.match(line)) or line.startswith(("*", "※")) or len(_LATIN.findall(line)) < 2
+
+
+def is_junk_line(line):
+    """쪽 번호, 기호만 있는 줄, 한국어 문항/주석 줄 등 영어 문장이 아닌 줄"""
+    if _is_marker_line(line):
+        return True
+    if _noise_ratio(line) >= 0.5:
+        return True
+    # 한국어가 섞인 줄은 더 엄격하게 (예: "mandate: 명령, adverse: 거스르는")
+    return _latin_ratio(line) < (0.8 if _HANGUL.search(line) else 0.5)
+
+
+def _join_hyphenated(left, right, text, is_word=None):
+    """줄 끝 하이픈 처리 - 'devel-' + 'opment' 는 붙이고, 하이픈이 있는 복합어('high-' + 'density')는 유지
+
+    본문의 다른 곳에 나온 형태를 먼저 보고, 없으면 is_word(단어 벡터 유무 등)로 판단한다.
+    """
+    head = _HYPHEN_WORD.search(left).group(1)
+    tail = _FIRST_WORD.match(right).group(1)
+    hyphenated, closed = f"{head}-{tail}".lower(), f"{head}{tail}".lower()
+    if closed in text:
+        keep = False
+    elif hyphenated in text:
+        keep = True
+    else:
+        keep = is_word is not None and not is_word(closed) and is_word(head.lower()) and is_word(tail)
+    return left + right if keep else left[:-1] + right
+
+
+def _paragraphs(text):
+    """정리한 줄을 빈 줄 기준 문단으로 묶음 (잡음 줄, 반복되는 머리말 제외)"""
+    lines = [_MARKERS.sub("", " ".join(line.split())) for line in text.split("\n")]
+    counts = Counter(line for line in lines if line)
+    repeated = {
+        line for line, count in counts.items()
+        if count > 1 and len(line) <= HEADER_MAX_CHARS and not _TERMINAL.search(line)
+    }
+
+    # None: 문단 경계, True: 잡음 줄
+    junk = [None if not line or line in repeated else is_junk_line(line) for line in lines]
+    # 앞뒤 줄이 모두 본문인 줄은 본문 중간이므로 (쪽 번호 등 표시 줄이 아니면) 남김
+    for i in range(1, len(lines) - 1):
+        if junk[i] and junk[i - 1] is False and junk[i + 1] is False and not _is_marker_line(lines[i]):
+            junk[i] = False
+
+    paragraphs, current = [], []
+    for line, is_junk in zip(lines, junk):
+        if is_junk is None:
+            if current:
+                paragraphs.append(current)
+                current = []
+            continue
+        if not is_junk:
+            current.append(line)
+    if current:
+        paragraphs.append(current)
+    return paragraphs
+
+
+def normalize_ocr_text(text, is_word=None):
+    """OCR 텍스트 정리 - 문단 리스트 (문단 안의 줄은 합쳐짐)
+
+    is_word: 줄 끝 하이픈을 지울지 정할 때 쓰는 단어 판별 함수 (없으면 본문만 보고 판단)
+    """
+    text = text.translate(_CHAR_FIXES)
+    lowered = " ".join(text.split()).lower()
+
+    paragraphs = []
+    for lines in _paragraphs(text):
+        joined = lines[0]
+        for line in lines[1:]:
+            if _HYPHEN_WORD.search(joined) and _FIRST_WORD.match(line):
+                joined = _join_hyphenated(joined, line, lowered, is_word)
+            else:
+                joined = f"{joined} {line}"
+        # 빈 줄로 끊겼지만 문장이 이어지는 경우 (앞 문단이 문장 부호 없이 끝나고 소문자로 시작)
+        if paragraphs and not _TERMINAL.search(paragraphs[-1]) and joined[0].islower():
+            paragraphs[-1] = f"{paragraphs[-1]} {joined}"
+        else:
+            paragraphs.append(joined)
+    return paragraphs
+
+
+def is_real_sentence(span):
+    """분석/번역할 문장인지 - 단어 2개 이상, 단어 비율 절반 이상, 문장 부호로 끝나거나 충분히 긺"""
+    words = [token for token in span if not (token.is_punct or token.is_space)]
+    alpha = sum(token.is_alpha for token in words)
+    if alpha < 2 or alpha < len(words) / 2:
+        return False
+    return bool(_TERMINAL.search(span.text.rstrip())) or alpha >= MIN_WORDS
+
+
+def split_variant(segmenter=None):
+    """문장 분리 캐시 키에 넣을 분리 방식/정리 규칙 버전 (예: auto.v1)"""
+    return f"{segmenter or SEGMENTER}.v{NORMALIZE_VERSION}"
+
+
+_sentencizer = None
+
+
+def _segmenter(nlp, name=None):
+    global _sentencizer
+    name = name or SEGMENTER
+    if name not in SEGMENTERS:
+        raise ValueError(f"알 수 없는 문장 분리 방식: {name}")
+    if name in ("auto", "senter") and "senter" in nlp.component_names:
+        return nlp.get_pipe("senter")
+    if name == "senter":
+        raise ValueError("모델에 senter 가 없습니다.")
+    if _sentencizer is None:
+        from spacy.pipeline import Sentencizer
+        _sentencizer = Sentencizer()
+    return _sentencizer
+
+
+def segment_sentences(text, nlp, segmenter=None):
+    """OCR 텍스트 -> (분석할 문장 리스트, 걸러낸 조각 수), 파싱하지 않음"""
+    pipe = _segmenter(nlp, segmenter)
+    is_word = nlp.vocab.has_vector if nlp.vocab.vectors.n_keys else None
+    paragraphs = normalize_ocr_text(text, is_word)
+    sentences, candidates = [], []
+    for doc in pipe.pipe(nlp.make_doc(paragraph) for paragraph in paragraphs):
+        for sent in doc.sents:
+            if sent.text.strip():
+                candidates.append(sent.text.strip())
+                if is_real_sentence(sent):
+                    sentences.append(candidates[-1])
+    # 문장 부호 없이 짧게 입력한 텍스트는 걸러내지 않음
+    if not sentences:
+        sentences = [sentence for sentence in candidates if _LATIN.search(sentence)]
+    return sentences, len(candidates) - len(sentences)
@@ -0,0 +1,416 @@
+"""비슷한 예문 검색 색인
+
+분석한 문장마다 단어 벡터 평균(en_core_web_lg 의 vectors)을 정규화해
+cache/sentence_index/<모델>/vectors.f32 에 한 행씩 이어 쓰고, 검색할 때는 파일 전체를
+memory-map 한 (문장 수, dim) 행렬과 질의 벡터의 곱 한 번으로 코사인 유사도를 구한다.
+문장 텍스트는 같은 디렉터리의 SQLite 에 (행 번호, 텍스트 해시, 텍스트)로 저장한다.
+
+문장 수가 CLUSTER_THRESHOLD 이상이면 백그라운드에서 k-means 로 묶은 거친 색인을 만들고,
+질의와 가까운 군집 NPROBE 개의 문장만 비교한다. 색인을 만든 뒤 추가된 문장은 전부 비교하며,
+추가된 문장이 REBUILD_RATIO 를 넘으면 다시 만든다.
+
+모델에 단어 벡터가 없거나(en_core_web_sm 등) SENTENCE_INDEX 가 비어 있으면 사용하지 않는다.
+
+    python sentence_index.py stats
+    python sentence_index.py build-clusters
+"""
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+SENTENCE_INDEX = os.getenv("SENTENCE_INDEX", os.path.join(CACHE_DIR, "sentence_index"))
+SIMILAR_K = int(os.getenv("SIMILAR_K", "5"))
+# 이 문장 수부터 군집 색인 사용
+CLUSTER_THRESHOLD = int(os.getenv("SENTENCE_INDEX_CLUSTER_THRESHOLD", "50000"))
+# 질의마다 비교할 군집 수
+NPROBE = int(os.getenv("SENTENCE_INDEX_NPROBE", "16"))
+# 군집 색인 이후 추가된 문장이 이 비율을 넘으면 다시 만듦
+REBUILD_RATIO = 0.2
+# 전체 문장을 군집에 배정할 때 한 번에 곱하는 행 수
+BLOCK_ROWS = 1 << 16
+# 이보다 유사도가 낮으면 비슷한 문장으로 보지 않음
+MIN_SCORE = 0.5
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sentence_vectors(spans, vectors):
+    """문장 Span 들의 단어 벡터 합을 정규화한 행렬, 벡터가 있는 문장의 위치 목록
+
+    문장마다 token.vector 를 더하지 않고, 전체 토큰의 ORTH 를 한 번에 벡터 행 번호로 바꿔
+    np.add.reduceat 으로 문장별로 더한다 (평균과 방향이 같으므로 나누지 않음).
+    """
+    from spacy.attrs import ORTH
+
+    spans = [span for span in spans if len(span)]
+    if not spans or not vectors.shape[0]:
+        return np.zeros((0, vectors.shape[1]), dtype=np.float32), []
+
+    if vectors.mode == "default":
+        keys = np.concatenate([span.to_array([ORTH])[:, 0] for span in spans]).astype(np.uint64)
+        rows = vectors.find(keys=keys)
+        gathered = np.asarray(vectors.data)[rows].astype(np.float32)
+        gathered[rows < 0] = 0
+        starts = np.cumsum([0] + [len(span) for span in spans[:-1]])
+        sums = np.add.reduceat(gathered, starts, axis=0)
+    else:
+        # floret 벡터는 서브워드로 계산하므로 spaCy 에 맡김
+        sums = np.array([span.vector for span in spans], dtype=np.float32)
+
+    norms = np.linalg.norm(sums, axis=1)
+    keep = np.flatnonzero(norms > 0)
+    matrix = sums[keep] / norms[keep, None]
+    return matrix.astype(np.float32), [spans[i] for i in keep]
+
+
+class Clusters:
+    """군집 색인: 중심 벡터, 군집 순서로 정렬한 행 번호, 군집별 시작 위치"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.rows = json.load(f)["rows"]
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.order = np.asarray(np.load(os.path.join(path, "order.npy"), mmap_mode="r"))
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+
+    def candidates(self, query, nprobe=NPROBE):
+        """질의와 가까운 nprobe 개 군집에 속한 행 번호"""
+        nprobe = min(nprobe, len(self.centroids))
+        nearest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in nearest])
+
+
+def kmeans(matrix, nlist, iterations=10, sample_size=None, seed=0):
+    """정규화된 행렬의 spherical k-means (표본으로 중심 계산 후 전체 행 배정)
+
+    반환: (중심 벡터 (nlist, dim), 행별 군집 번호)
+    """
+    rng = np.random.default_rng(seed)
+    n = len(matrix)
+    sample_size = min(n, sample_size or nlist * 40)
+    sample = np.asarray(matrix[np.sort(rng.choice(n, sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        nonempty = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[nonempty]
+        sums = np.add.reduceat(sample[order], starts, axis=0)
+        # 빈 군집은 이전 중심 유지
+        centroids[nonempty] = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+    assign = np.empty(n, dtype=np.int32)
+    for start in range(0, n, BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + BLOCK_ROWS])
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return centroids, assign
+
+
+class SentenceIndex:
+    """문장 벡터 행렬 (memory-map) + 문장 텍스트 (SQLite)
+
+    여러 프로세스(gunicorn 워커)가 같은 디렉터리에 추가할 수 있다. 추가는 vectors.f32 의
+    파일 잠금 안에서 하므로 행 번호와 SQLite 의 row 가 항상 일치한다.
+    """
+
+    def __init__(self, path, dim):
+        self.path = path
+        self.dim = dim
+        self.row_bytes = dim * 4
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.clusters_path = os.path.join(path, "clusters")
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._clusters = None
+        self._clusters_mtime = None
+        self._building = False
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                stored_dim = json.load(f)["dim"]
+            if stored_dim != dim:
+                raise ValueError(f"{path}: 벡터 차원이 다릅니다 ({stored_dim} != {dim})")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": dim}, f)
+
+        self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentences ("
+            " row INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, text TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.commit()
+        os.register_at_fork(after_in_child=self._reconnect)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(os.path.join(self.path, "sentences.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def _reconnect(self):
+        # 부모에게서 물려받은 연결은 그대로 두고 새 연결 사용 (SQLiteAnalysisStore 와 같음)
+        self._inherited_conn = self._conn
+        self._lock = threading.Lock()
+        self._building = False
+        self._connect()
+
+    def __len__(self):
+        return len(self.matrix())
+
+    def add(self, texts, matrix):
+        """정규화된 벡터 행렬과 문장 텍스트 추가 (이미 있는 문장은 건너뜀), 추가한 수 반환"""
+        items = {}
+        for text, vector in zip(texts, matrix):
+            items.setdefault(text_key(text), (text, vector))
+        if not items:
+            return 0
+
+        with self._lock, open(self.vectors_path, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                keys = list(items)
+                existing = set()
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    existing.update(key for (key,) in self._conn.execute(
+                        f"SELECT key FROM sentences WHERE key IN ({','.join('?' * len(chunk))})", chunk))
+                new_keys = [key for key in keys if key not in existing]
+                if not new_keys:
+                    return 0
+
+                # 중간에 끊긴 쓰기가 있으면 마지막 완전한 행까지 자름
+                size = os.fstat(f.fileno()).st_size
+                first_row = size // self.row_bytes
+                if size % self.row_bytes:
+                    f.truncate(first_row * self.row_bytes)
+                f.write(np.array([items[key][1] for key in new_keys], dtype=np.float32).tobytes())
+                f.flush()
+
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT INTO sentences (row, key, text, created) VALUES (?, ?, ?, ?)",
+                    [(first_row + i, key, items[key][0], now) for i, key in enumerate(new_keys)],
+                )
+                self._conn.commit()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        self.maybe_build_clusters()
+        return len(new_keys)
+
+    def matrix(self):
+        """저장된 전체 벡터 (memory-map), 파일이 커졌으면 다시 매핑"""
+        try:
+            rows = os.path.getsize(self.vectors_path) // self.row_bytes
+        except OSError:
+            rows = 0
+        if rows != len(self._matrix):
+            with self._lock:
+                if rows != len(self._matrix):
+                    self._matrix = (np.asarray(np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                                         shape=(rows, self.dim)))
+                                    if rows else np.zeros((0, self.dim), dtype=np.float32))
+        return self._matrix
+
+    def clusters(self):
+        """군집 색인 (없으면 None), 다른 프로세스가 다시 만들었으면 새로 읽음"""
+        try:
+            mtime = os.path.getmtime(os.path.join(self.clusters_path, "meta.json"))
+        except OSError:
+            return None
+        if mtime != self._clusters_mtime:
+            try:
+                self._clusters = Clusters(self.clusters_path)
+            except (OSError, ValueError, KeyError):
+                # 다른 프로세스가 교체하는 중이면 다음 검색에서 다시 시도
+                return self._clusters
+            self._clusters_mtime = mtime
+        return self._clusters
+
+    def search(self, query, k=SIMILAR_K, exclude=(), nprobe=NPROBE, min_score=MIN_SCORE):
+        """질의 벡터(정규화)와 가장 비슷한 문장 [{"text", "score"}, ...]
+
+        exclude: 결과에서 뺄 문장 텍스트 (질의 문장 자신 등)
+        """
+        matrix = self.matrix()
+        if not len(matrix) or k <= 0:
+            return []
+
+        clusters = self.clusters() if len(matrix) >= CLUSTER_THRESHOLD else None
+        if clusters is not None and clusters.rows <= len(matrix):
+            # 가까운 군집의 문장 + 군집 색인 이후 추가된 문장만 비교
+            rows = np.concatenate([clusters.candidates(query, nprobe),
+                                   np.arange(clusters.rows, len(matrix))])
+            scores = matrix[rows] @ query
+        else:
+            rows = None
+            scores = matrix @ query
+
+        count = min(k + len(exclude), len(scores))
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top])]
+        top = top[scores[top] >= min_score]
+        row_ids = [int(rows[i]) if rows is not None else int(i) for i in top]
+        texts = self.texts(row_ids)
+
+        excluded = {text_key(text) for text in exclude}
+        results = []
+        for row, i in zip(row_ids, top):
+            text = texts.get(row)
+            if text is None or text_key(text) in excluded:
+                continue
+            results.append({"text": text, "score": round(float(scores[i]), 4)})
+        return results[:k]
+
+    def texts(self, rows):
+        if not rows:
+            return {}
+        with self._lock:
+            return dict(self._conn.execute(
+                f"SELECT row, text FROM sentences WHERE row IN ({','.join('?' * len(rows))})", rows))
+
+    def build_clusters(self, nlist=None):
+        """전체 문장으로 군집 색인 생성 (임시 디렉터리에 쓴 뒤 교체), 군집 수 반환"""
+        matrix = self.matrix()
+        n = len(matrix)
+        if not n:
+            return 0
+        nlist = min(n, nlist or max(1, int(np.sqrt(n))))
+        centroids, assign = kmeans(matrix, nlist)
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assign[order], np.arange(nlist + 1))
+
+        tmp_dir = f"{self.clusters_path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        np.save(os.path.join(tmp_dir, "centroids.npy"), centroids.astype(np.float32))
+        np.save(os.path.join(tmp_dir, "order.npy"), order)
+        np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"rows": n, "nlist": nlist, "created": time.time()}, f)
+        if os.path.exists(self.clusters_path):
+            shutil.rmtree(self.clusters_path)
+        os.replace(tmp_dir, self.clusters_path)
+        return nlist
+
+    def needs_clusters(self):
+        rows = len(self.matrix())
+        if rows < CLUSTER_THRESHOLD:
+            return False
+        clusters = self.clusters()
+        return clusters is None or rows - clusters.rows > clusters.rows * REBUILD_RATIO
+
+    def maybe_build_clusters(self):
+        """군집 색인이 필요하면 백그라운드 스레드에서 생성 (프로세스 간에는 잠금 파일로 하나만)"""
+        if self._building or not self.needs_clusters():
+            return None
+        self._building = True
+
+        def run():
+            try:
+                with open(os.path.join(self.path, "clusters.lock"), "w") as lock_file:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        return  # 다른 프로세스가 만드는 중
+                    if self.needs_clusters():
+                        start = time.perf_counter()
+                        nlist = self.build_clusters()
+                        print(f"✅ 예문 군집 색인 생성: {len(self.matrix())}문장, {nlist}개 군집 "
+                              f"({time.perf_counter() - start:.1f}초)")
+            except Exception as e:
+                print(f"⚠️ 예문 군집 색인 생성 실패: {e}")
+            finally:
+                self._building = False
+
+        thread = threading.Thread(target=run, name="sentence-clusters", daemon=True)
+        thread.start()
+        return thread
+
+
+_index = None
+_index_lock = threading.Lock()
+_disabled = False
+
+
+def get_sentence_index():
+    """현재 모델용 프로세스 공용 색인, 단어 벡터가 없거나 꺼져 있으면 None"""
+    global _index, _disabled
+    if _index is None and not _disabled:
+        with _index_lock:
+            if _index is None and not _disabled:
+                from model_registry import get_nlp, model_info
+
+                vectors = get_nlp().vocab.vectors
+                if not SENTENCE_INDEX or not vectors.shape[0]:
+                    _disabled = True
+                    return None
+                info = model_info()
+                path = os.path.join(SENTENCE_INDEX, f"{info['name']}-{info['version']}")
+                _index = SentenceIndex(path, vectors.shape[1])
+    return _index
+
+
+def index_sentences(spans):
+    """분석한 문장 Span 들을 색인에 추가, 추가한 수 반환"""
+    index = get_sentence_index()
+    if index is None:
+        return 0
+    from model_registry import get_nlp
+
+    matrix, kept = sentence_vectors(spans, get_nlp().vocab.vectors)
+    return index.add([span.text.strip() for span in kept], matrix)
+
+
+def similar_sentences(text, k=SIMILAR_K, exclude=()):
+    """text 와 비슷한 이전 분석 문장 (파이프라인 없이 토큰화만 해서 벡터 계산)
+
+    exclude: 결과에서 뺄 문장 (같은 문서의 문장 등), text 자신은 항상 제외
+    """
+    index = get_sentence_index()
+    if index is None:
+        return []
+    from model_registry import get_nlp
+
+    nlp = get_nlp()
+    doc = nlp.make_doc(text.strip())
+    matrix, _ = sentence_vectors([doc[:]], nlp.vocab.vectors)
+    if not len(matrix):
+        return []
+    return index.search(matrix[0], k, exclude=[text.strip()] + [item.strip() for item in exclude])
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="예문 검색 색인 관리")
+    arg_parser.add_argument("command", choices=["stats", "build-clusters"])
+    args = arg_parser.parse_args(argv)
+
+    index = get_sentence_index()
+    if index is None:
+        print("⚠️ 단어 벡터가 있는 모델이 아니거나 SENTENCE_INDEX 가 비어 있습니다.")
+        return 1
+    if args.command == "stats":
+        clusters = index.clusters()
+        print(f"{index.path}: {len(index)}문장, 차원 {index.dim}, "
+              f"군집 색인 {f'{len(clusters.centroids)}개 ({clusters.rows}문장 기준)' if clusters else '없음'}")
+    else:
+        print(f"✅ {index.build_clusters()}개 군집: {index.clusters_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
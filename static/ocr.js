@@ -1,59 +1,105 @@
-// 이미지 파일 처리하기
+// 이미지 파일 처리하기 (여러 장 선택 가능 - 선택한 순서대로 한 문서로 합침)
+async function uploadImage(file) {
+    const formData = new FormData();
+    formData.append('image', file);
+
+    const response = await fetch('/upload_image', {
+        method: 'POST',
+        body: formData
+    });
+    const data = await response.json();
+    if (!response.ok) {
+        throw new Error(data.error);
+    }
+    return data;
+}
+
 async function loadFile(input) {
 
-    const file = input.files[0];
+    const files = Array.from(input.files);
+    if (files.length === 0) return;
     const fileName = document.getElementById('fileName');
-    fileName.textContent = file.name;
+    fileName.textContent = files.map(file => file.name).join(', ');
 
-    const formData = new FormData();
-    formData.append('image', file);
+    const container = document.getElementById('image-show');
+    container.innerHTML = ""; // 기존 이미지 제거
 
     try {
-        const response = await fetch('/upload_image', {
-            method: 'POST',
-            body: formData
-        });
-
-        const data = await response.json();
-
-        if (response.ok) {
+        for (const file of files) {
+            const data = await uploadImage(file);
             console.log("업로드 성공!")
 
             // 이미지 미리보기
             const previewImage = document.createElement("img");
             previewImage.src = data.image_url;
+            // OCR 은 서버에서 축소/이진화/기울기 보정한 이미지로 실행
+            previewImage.dataset.ocrSrc = data.ocr_url || data.image_url;
+            previewImage.dataset.hash = data.hash;
             previewImage.style.maxWidth = "70%";
-            previewImage.id = "preview-image";
-            const container = document.getElementById('image-show');
-            container.innerHTML = ""; // 기존 이미지 제거
+            previewImage.className = "preview-image";
+            if (!document.getElementById('preview-image')) {
+                previewImage.id = "preview-image";
+            }
             container.appendChild(previewImage);
-
-        } else {
-            alert('업로드 실패: ' + data.error);
         }
      } catch (error) {
         alert('업로드 중 오류 발생: ' + error.message);
      }
+}
 
-    
-
-    // // 이미지 미리보기
-    // const previewImage = document.createElement("img");
-    // previewImage.src = URL.createObjectURL(file);
-    // previewImage.style.maxWidth = "50%";
-    // previewImage.id = "preview-image";
+// 서버 OCR (/api/ocr) - 실패하면 null 을 돌려주고 브라우저 OCR 로 진행
+async function serverOcr(images) {
+    if (typeof SERVER_OCR === 'undefined' || !SERVER_OCR) return null;
+    try {
+        const response = await fetch('/api/ocr', {
+            method: 'POST',
+            headers: {'Content-Type' : 'application/json'},
+            body: JSON.stringify({images: images.map(image => image.dataset.hash)})
+        });
+        if (!response.ok) {
+            console.log('서버 OCR 실패, 브라우저 OCR 사용: ' + response.status);
+            return null;
+        }
+        return (await response.json()).text;
+    } catch (error) {
+        console.log('서버 OCR 실패, 브라우저 OCR 사용: ' + error.message);
+        return null;
+    }
+}
 
-    // const container = document.getElementById('image-show');
-    // container.innerHTML = ""; // 기존 이미지 제거
-    // container.appendChild(previewImage);
+// 브라우저 OCR (Tesseract.js) - 페이지 순서대로 실행 후 합침
+async function clientOcr(images, resultContainer) {
+    const texts = [];
+    for (const [i, image] of images.entries()) {
+        resultContainer.textContent = `변환 중... (${i + 1}/${images.length})`;
+        const result = await Tesseract.recognize(
+            image.dataset.ocrSrc || image.src, // 이미지 소스 (전처리된 이미지 우선)
+            'eng',
+            {
+                logger: m => {
+                    console.log(m);
+                }
+            }
+        );
+        console.log(result.data.text);
+        texts.push(result.data.text.trim());
+    }
+    const text = texts.filter(t => t).join('\n\n');
+
+    // OCR 결과 서버에 보내기
+    await fetch('/send_ocr_result', {
+        method: 'POST',
+        headers: {'Content-Type' : 'application/json'},
+        body: JSON.stringify({text: text})
+    });
 }
 
 // OCR 실행
 document.getElementById('submitButton').addEventListener('click', async () => {
-    const image = document.getElementById('preview-image');
-    if (!image) return alert("이미지를 먼저 업로드해주세요.");
+    const images = Array.from(document.querySelectorAll('.preview-image'));
+    if (images.length === 0) return alert("이미지를 먼저 업로드해주세요.");
 
-    image.style.visibility = 'visible';
+    images.forEach(image => image.style.visibility = 'visible');
 
     const resultContainer = document.createElement("div");
     resultContainer.style.marginTop = "20px";
@@ -63,28 +109,16 @@ document.getElementById('submitButton').addEventListener('click', async () => {
     container.appendChild(resultContainer);
 
     try {
-        const result = await Tesseract.recognize(
-            image.src, // 이미지 소스
-            'eng',     
-            {
-                logger: m => {
-                    console.log(m);
-                }
-            }
-        );
-        console.log(result.data.text);
+        // 서버 OCR 이 성공하면 결과는 서버에 이미 저장되어 있음
+        const text = await serverOcr(images);
+        if (text === null) {
+            await clientOcr(images, resultContainer);
+        }
         resultContainer.textContent = "성공적으로 변환되었습니다."
 
-        // OCR 결과 서버에 보내기 
-        await fetch('/send_ocr_result', {
-            method: 'POST',
-            headers: {'Content-Type' : 'application/json'},
-            body: JSON.stringify({text: result.data.text})
-        });
-
-        // ocr_result.html로 이동 
+        // ocr_result.html로 이동
         window.location.href = '/ocr_result';
-        
+
     } catch (err) {
         resultContainer.textContent = "변환을 실패하였습니다. 오류 메세지: " + err.message;
     }
@@ -0,0 +1,40 @@
+"""ocr_text 정리 규칙 - 대문자로만 쓴 문장은 잡음으로 버리지 않음"""
+import ocr_text
+from ocr_text import is_junk_line, normalize_ocr_text
+
+
+def test_all_caps_sentences_are_not_junk():
+    assert not is_junk_line("READ THE TEXT BELOW.")
+    assert not is_junk_line("I AM HERE.")
+    assert not is_junk_line("CHOOSE THE BEST ANSWER")
+
+
+def test_all_caps_sentence_kept_as_paragraph():
+    assert normalize_ocr_text("READ THE TEXT BELOW.\n\nThe cat sat on the mat.") == [
+        "READ THE TEXT BELOW.", "The cat sat on the mat."]
+
+
+def test_all_caps_sentence_kept_inside_paragraph():
+    text = "The cat sat on the mat and\nI AM HERE.\nthen it left the room."
+    assert normalize_ocr_text(text) == ["The cat sat on the mat and I AM HERE. then it left the room."]
+
+
+def test_line_between_body_lines_is_kept():
+    text = "The first line of the text goes here\nCHS AE OK\nand the last line ends here."
+    assert normalize_ocr_text(text) == ["The first line of the text goes here CHS AE OK and the last line ends here."]
+
+
+def test_ocr_noise_still_dropped():
+    assert is_junk_line("CHS 7S AE")
+    assert is_junk_line("23. CHS Sol FAS 7/8 AAS AS?")
+    assert is_junk_line("- 3 -")
+    assert normalize_ocr_text("CHS 7S AE\n\nThe cat sat on the mat.\n\n- 3 -") == ["The cat sat on the mat."]
+
+
+def test_page_number_between_body_lines_is_dropped():
+    text = "The cat sat on the mat and\n12\nthen it left the room."
+    assert normalize_ocr_text(text) == ["The cat sat on the mat and then it left the room."]
+
+
+def test_split_variant_includes_normalize_version():
+    assert ocr_text.split_variant("auto") == f"auto.v{ocr_text.NORMALIZE_VERSION}"
@@ -1,131 +1,455 @@
-import json
-from translate_ko import ko_trans_many
-from collections import defaultdict
-from analy import load_nlp_model, EnhancedClauseParser
-
-def convert_to_json_format(analysis_results):
-    """분석 결과를 JSON 형식으로 변환"""
-    doc = analysis_results["doc"]
-
-    clause_tree_json = []
-    clause_id_map = {}
-
-    # 절에 ID 할당
-    for i, clause in enumerate(analysis_results["clause_tree"]):
-        clause_id_map[clause] = i
-
-    for clause in analysis_results["clause_tree"]:
-        clause_info = {
-            "id": clause_id_map[clause],
-            "text": clause.text,
-            "start_idx": clause.start_idx,
-            "end_idx": clause.end_idx,
-            "type": clause.type,
-            "role": clause.role or "unknown",
-            "depth": clause.depth,
-            "parent_id": clause_id_map.get(clause.parent) if clause.parent else None,
-            "children_ids": [clause_id_map[child] for child in clause.children],
-            "main_verb": clause.main_verb.text if clause.main_verb else None,
-            "subject": clause.subject.text if clause.subject else None,
-            "connector": clause.connector.text if clause.connector else None
-        }
-        clause_tree_json.append(clause_info)
-
-    verb_np_roles_json = {}
-    for clause, verb_roles in analysis_results["clause_verb_np_roles"].items():
-        clause_id = clause_id_map[clause]
-        verb_np_roles_json[clause_id] = {}
-
-        for verb, roles in verb_roles.items():
-            verb_text = verb.text
-            verb_np_roles_json[clause_id][verb_text] = {
-                "subject": roles["subject"],
-                "direct_object": roles["direct_object"],
-                "indirect_object": roles["indirect_object"],
-                "others": roles["others"]
-            }
-
-    implied_subjects_json = {}
-    for verb, subject in analysis_results["implied_subjects"].items():
-        implied_subjects_json[verb.text] = subject
-
-    coord_structures_json = []
-    for coord in analysis_results["coord_structures"]:
-        coord_info = {
-            "type": coord["type"],
-            "first": coord["first"].text,
-            "conjunction": coord["conjunction"].text if coord["conjunction"] else ",",
-            "second": coord["second"].text
-        }
-        coord_structures_json.append(coord_info)
-
-    result_json = {
-        "sentence": doc.text,
-        "clause_tree": clause_tree_json,
-        "verb_np_roles": verb_np_roles_json,
-        "implied_subjects": implied_subjects_json,
-        "coord_structures": coord_structures_json
-    }
-
-    return result_json
-
-def analyze_multiple_sentences(text, output_path="output.json"):
-    """여러 문장을 분석하고 하나의 JSON 파일로 저장"""
-    nlp = load_nlp_model("en")
-    parser = EnhancedClauseParser(nlp)
-    
-    # 문장 분리
-    doc = nlp(text)
-    sentences = [sent.text for sent in doc.sents]
-    
-    all_results = []
-
-    # 문장별 한글 번역 수행
-    cleaned_senteces = [sentence.replace('\n', ' ').strip() for sentence in sentences]
-
-    print(cleaned_senteces)
-    translated_sentences = ko_trans_many(cleaned_senteces)
-    
-    # 각 문장 분석
-    for i, sentence in enumerate(sentences):
-        try:
-            analysis_results = parser.analyze_sentence(sentence)
-            json_data = convert_to_json_format(analysis_results)
-            
-            # 문장 번호 추가
-            json_data["sentence_number"] = i + 1
-            json_data["translated"] = translated_sentences[i]
-            
-            all_results.append(json_data)
-            print(f"✅ 문장 {i+1} 분석 완료")
-            
-        except Exception as e:
-            print(f"⚠️ 문장 {i+1} 분석 중 오류 발생: {e}")
-    
-    # 최종 결과 저장
-    final_result = {
-        "total_sentences": len(sentences),
-        "results": all_results
-    }
-    
-    # with open(output_path, "w", encoding="utf-8") as f:
-    #     json.dump(final_result, f, ensure_ascii=False, indent=2)
-    
-    # print(f"✅ 전체 분석 결과가 '{output_path}'에 저장되었습니다.")
-
-    # 전체 변연 결과를 하나로 묶어서 반환 
-    return final_result
-    # return final_result 
-    # /ko_trans_page 라우터로 이동
-    # json파일(분석결과)를 DB 저장 후 바로 최종 UI 구현(spacy_result.html)과 이어지게 개발 예정
-
-def spacy_trans(ocr_text, output_path="output.json"):
-    return analyze_multiple_sentences(ocr_text, output_path)
-
-# if __name__ == "__main__":
-
-#     # def spacy_trans(ocr_text):
-#     #     input_text = ocr_text
-    
-#     # 분석 및 저장
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from translate_ko import ko_trans_many
+from collections import defaultdict
+import fast_json
+import metrics
+import ocr_text
+from model_registry import get_nlp, get_parser, model_info
+from analysis_cache import get_analysis_cache
+from doc_store import get_doc_store
+from sentence_index import index_sentences
+
+logger = logging.getLogger(__name__)
+
+# nlp.pipe 기본 배치 크기
+DEFAULT_BATCH_SIZE = 64
+# 배치 분석에 쓸 수 있는 최대 프로세스 수 (1 이면 요청을 처리하는 프로세스에서만 분석)
+BATCH_MAX_PROCESSES = max(1, int(os.getenv("BATCH_MAX_PROCESSES", "1")))
+
+# 스트리밍 분석: 번역 요청 하나에 묶을 문장 수, 미리 보내 둘 번역 요청 수
+STREAM_CHUNK_SIZE = 4
+STREAM_MAX_IN_FLIGHT = 4
+
+_translate_pool = ThreadPoolExecutor(max_workers=STREAM_MAX_IN_FLIGHT)
+
+def convert_to_json_format(analysis_results):
+    """분석 결과를 JSON 형식으로 변환 (절 트리를 한 번만 순회)"""
+    doc = analysis_results["doc"]
+    tokens = doc.doc
+    clause_tree = analysis_results["clause_tree"]
+
+    # 절 ID = 절 트리 내 위치
+    clause_ids = {id(clause): i for i, clause in enumerate(clause_tree)}
+
+    def text_of(i):
+        return tokens[i].text if i is not None else None
+
+    clause_tree_json = [
+        {
+            "id": i,
+            "text": clause.text,
+            "start_idx": clause.start_idx,
+            "end_idx": clause.end_idx,
+            "type": clause.type,
+            "role": clause.role or "unknown",
+            "depth": clause.depth,
+            "parent_id": clause_ids[id(clause.parent)] if clause.parent else None,
+            "children_ids": [clause_ids[id(child)] for child in clause.children],
+            "main_verb": text_of(clause.main_verb_i),
+            "subject": text_of(clause.subject_i),
+            "connector": text_of(clause.connector_i)
+        }
+        for i, clause in enumerate(clause_tree)
+    ]
+
+    # 역할 dict 는 subject/direct_object/indirect_object/others 키를 그대로 가짐
+    verb_np_roles_json = {
+        clause_ids[id(clause)]: {verb.text: roles for verb, roles in verb_roles.items()}
+        for clause, verb_roles in analysis_results["clause_verb_np_roles"].items()
+    }
+
+    implied_subjects_json = {
+        verb.text: subject for verb, subject in analysis_results["implied_subjects"].items()
+    }
+
+    coord_structures_json = [
+        {
+            "type": coord["type"],
+            "first": coord["first"].text,
+            "conjunction": coord["conjunction"].text if coord["conjunction"] else ",",
+            "second": coord["second"].text
+        }
+        for coord in analysis_results["coord_structures"]
+    ]
+
+    json_data = {
+        "sentence": doc.text,
+        "clause_tree": clause_tree_json,
+        "verb_np_roles": verb_np_roles_json,
+        "implied_subjects": implied_subjects_json,
+        "coord_structures": coord_structures_json
+    }
+    # 어휘 색인이 있을 때만 (이미 JSON 으로 바꿀 수 있는 형태)
+    if analysis_results.get("vocabulary") is not None:
+        json_data["vocabulary"] = analysis_results["vocabulary"]
+    return json_data
+
+def parse_text(text):
+    """텍스트 파싱 - Doc 저장소를 쓰면 저장된 Doc 을 복원하고, 새로 파싱한 Doc 은 저장"""
+    return parse_texts([text])[0]
+
+def parse_texts(texts, sentences=False):
+    """여러 텍스트를 파싱 (저장소에 없는 텍스트만 nlp.pipe 로 한 번에), 텍스트 순서대로 Doc 반환
+
+    sentences: 텍스트가 각각 문장 하나 (Doc 저장소에 문장 단위로 표시)
+    """
+    doc_store = get_doc_store()
+    docs = [None] * len(texts)
+    if doc_store is not None:
+        info = model_info()
+        for i, text in enumerate(texts):
+            data = doc_store.get(text, info["name"], info["version"])
+            if data is not None:
+                with metrics.stage("load_stored_doc"):
+                    docs[i] = get_parser().load_docs(data)[0]
+    
+    missing = [i for i, doc in enumerate(docs) if doc is None]
+    if missing:
+        with metrics.stage("parse"):
+            parsed = list(get_nlp().pipe([texts[i] for i in missing], batch_size=DEFAULT_BATCH_SIZE))
+        metrics.inc("tokens_total", sum(len(doc) for doc in parsed))
+        for i, doc in zip(missing, parsed):
+            docs[i] = doc
+            if doc_store is not None:
+                doc_store.put(texts[i], doc, info["name"], info["version"], sentence=sentences)
+    return docs
+
+def split_sentences(text, parse=True):
+    """문장 분리 - (문장 리스트, 문장별 캐시된 분석 결과(dict) 또는 파싱된 Span 리스트)
+
+    기본은 OCR 텍스트를 정리한 뒤 senter/규칙으로 가볍게 나누고, 걸러진 문장 중
+    분석 캐시에 없는 문장만 파싱한다 (ocr_text). SEGMENTER=parser 면 전체 텍스트를 파싱해 나눈다.
+    parse=False 면 캐시에 없는 문장은 None 으로 두고 파싱하지 않는다 (스트리밍에서 묶음마다 파싱,
+    parser 방식은 나누는 데 파싱이 필요하므로 그대로 파싱됨).
+    """
+    cache = get_analysis_cache()
+    # 분리 방식이나 OCR 정리 규칙이 바뀌면 다른 키를 쓰도록 함
+    variant = ocr_text.split_variant()
+    
+    # 이전에 본 텍스트면 문장 분리/분석 결과를 캐시에서 가져옴
+    sentences = cache.get_split(text, variant)
+    analyses = cache.get_many(sentences) if sentences is not None else None
+    
+    if ocr_text.SEGMENTER == "parser":
+        if analyses is None or None in analyses:
+            # 문장 분리 (파이프라인은 텍스트 전체에 한 번만 실행)
+            doc = parse_text(text)
+            sents = list(doc.sents)
+            sentences = [sent.text for sent in sents]
+            cache.set_split(text, variant, sentences)
+            _index_sentences(sents)
+            analyses = [cache.get(sentence) or sent for sentence, sent in zip(sentences, sents)]
+    else:
+        if sentences is None:
+            with metrics.stage("segment"):
+                sentences, dropped = ocr_text.segment_sentences(text, get_nlp())
+            metrics.inc("segments_dropped_total", dropped)
+            cache.set_split(text, variant, sentences)
+            analyses = cache.get_many(sentences)
+        
+    
+    hits = sum(isinstance(analysis, dict) for analysis in analyses)
+    metrics.inc("analysis_cache_hits_total", hits)
+    metrics.inc("analysis_cache_misses_total", len(analyses) - hits)
+    if parse:
+        analyses = _parse_missing(sentences, analyses)
+    return sentences, analyses
+
+def _parse_missing(sentences, analyses):
+    """분석 결과가 없는(None) 문장만 문장 단위로 파싱해 Span 으로 채운 리스트"""
+    missing = list(dict.fromkeys(sentence for sentence, analysis in zip(sentences, analyses)
+                                 if analysis is None))
+    if not missing:
+        return analyses
+    spans = dict(zip(missing, (doc[:] for doc in parse_texts(missing, sentences=True))))
+    _index_sentences(list(spans.values()))
+    return [analysis if analysis is not None else spans[sentence]
+            for sentence, analysis in zip(sentences, analyses)]
+
+def _index_sentences(sents):
+    """비슷한 예문 검색용으로 문장 벡터 저장 (실패해도 분석은 계속)"""
+    try:
+        with metrics.stage("index_sentences"):
+            index_sentences(sents)
+    except Exception as e:
+        logger.warning("예문 색인 추가 실패: %s", e)
+
+def _indexed(docs):
+    for doc in docs:
+        _index_sentences(list(doc.sents))
+        yield doc
+
+def analyze_split_sentence(sentence, analysis):
+    """split_sentences 의 항목 하나를 JSON 결과로 변환 (Span 이면 분석 후 캐시에 저장)"""
+    metrics.inc("sentences_total")
+    if isinstance(analysis, dict):
+        return analysis
+    with metrics.stage("analyze_sentence"):
+        analysis_results = get_parser().analyze_span(analysis)
+        with metrics.stage("convert_to_json_format"):
+            json_data = convert_to_json_format(analysis_results)
+    get_analysis_cache().set(sentence, json_data)
+    return json_data
+
+def clean_sentence(sentence):
+    """번역 요청용 문장 정리"""
+    return sentence.replace('\n', ' ').strip()
+
+def clean_clause(text):
+    """번역 요청용 절 텍스트 정리 (끝의 쉼표 등 제거), 글자가 없으면 빈 문자열"""
+    text = " ".join(text.split()).strip(" ,;:")
+    return text if any(ch.isalpha() for ch in text) else ""
+
+def translate_document_clauses(store, doc_id):
+    """문서에서 아직 번역되지 않은 절을 모아 중복 없이 한 번에 번역하고 절 항목에 기록
+
+    문장 번역과 같은 캐시/연결 풀(ko_trans_many)을 쓰므로 이미 번역한 절은 요청하지 않는다.
+    번역한 절 텍스트 수 반환
+    """
+    pending = {
+        idx: result for idx, result in enumerate(store.get_results(doc_id), 1)
+        if any("translated" not in clause for clause in result["clause_tree"])
+    }
+    if not pending:
+        return 0
+
+    texts = []
+    for result in pending.values():
+        texts.extend(clean_clause(clause["text"]) for clause in result["clause_tree"])
+    texts = [text for text in dict.fromkeys(texts) if text]
+    with metrics.stage("translate_clauses"):
+        translated = dict(zip(texts, ko_trans_many(texts))) if texts else {}
+    metrics.inc("clauses_translated_total", len(texts))
+
+    store.set_clause_translations(doc_id, {
+        idx: (result["sentence"], [translated.get(clean_clause(c["text"]), "") for c in result["clause_tree"]])
+        for idx, result in pending.items()
+    })
+    return len(texts)
+
+def analyze_multiple_sentences(text, output_path="output.json"):
+    """여러 문장을 분석하고 하나의 JSON 파일로 저장"""
+    sentences, analyses = split_sentences(text)
+    
+    all_results = []
+
+    # 문장별 한글 번역 수행
+    cleaned_senteces = [clean_sentence(sentence) for sentence in sentences]
+
+    print(cleaned_senteces)
+    translated_sentences = ko_trans_many(cleaned_senteces)
+    
+    # 각 문장 분석 (캐시에 없는 문장만 분석)
+    for i, sentence in enumerate(sentences):
+        try:
+            json_data = analyze_split_sentence(sentence, analyses[i])
+            
+            # 문장 번호 추가
+            json_data["sentence_number"] = i + 1
+            json_data["translated"] = translated_sentences[i]
+            
+            all_results.append(json_data)
+            print(f"✅ 문장 {i+1} 분석 완료")
+            
+        except Exception as e:
+            print(f"⚠️ 문장 {i+1} 분석 중 오류 발생: {e}")
+    
+    # 최종 결과 저장
+    final_result = {
+        "total_sentences": len(sentences),
+        "results": all_results
+    }
+    
+    # with open(output_path, "w", encoding="utf-8") as f:
+    #     json.dump(final_result, f, ensure_ascii=False, indent=2)
+    
+    # print(f"✅ 전체 분석 결과가 '{output_path}'에 저장되었습니다.")
+
+    # 전체 변연 결과를 하나로 묶어서 반환 
+    return final_result
+    # return final_result 
+    # /ko_trans_page 라우터로 이동
+    # json파일(분석결과)를 DB 저장 후 바로 최종 UI 구현(spacy_result.html)과 이어지게 개발 예정
+
+def iter_analyze_split(sentences, analyses, chunk_size=STREAM_CHUNK_SIZE,
+                       max_in_flight=STREAM_MAX_IN_FLIGHT):
+    """split_sentences 결과를 번역 → 분석하며 문장 결과를 하나씩 생성
+
+    번역은 chunk_size 문장씩 묶어 요청하고, 아직 소비되지 않은 번역 요청은
+    최대 max_in_flight 개까지만 미리 보내 둔다. 분석 결과가 없는(None) 문장은
+    그 묶음을 분석할 때 파싱하므로 첫 결과까지의 시간과 메모리가 문서 길이에 비례하지 않는다.
+    """
+    cache = get_analysis_cache()
+    pending = deque()
+    starts = iter(range(0, len(sentences), chunk_size))
+
+    def submit_next():
+        start = next(starts, None)
+        if start is not None:
+            chunk = [clean_sentence(s) for s in sentences[start:start + chunk_size]]
+            pending.append((start, _translate_pool.submit(ko_trans_many, chunk)))
+
+    for _ in range(max_in_flight):
+        submit_next()
+
+    try:
+        while pending:
+            start, future = pending.popleft()
+            translated_chunk = future.result()
+            submit_next()
+
+            # 앞 묶음에서 같은 문장을 이미 분석했으면 캐시 사용, 나머지만 파싱
+            end = start + len(translated_chunk)
+            chunk_sentences = sentences[start:end]
+            chunk_analyses = [analysis if analysis is not None else cache.get(sentence)
+                              for sentence, analysis in zip(chunk_sentences, analyses[start:end])]
+            try:
+                chunk_analyses = _parse_missing(chunk_sentences, chunk_analyses)
+            except Exception as e:
+                logger.warning("문장 %d-%d 파싱 중 오류 발생: %s", start + 1, end, e)
+                continue
+
+            for i, translated in enumerate(translated_chunk, start):
+                try:
+                    json_data = analyze_split_sentence(sentences[i], chunk_analyses[i - start])
+                except Exception as e:
+                    logger.warning("문장 %d 분석 중 오류 발생: %s", i + 1, e)
+                    continue
+
+                json_data["sentence_number"] = i + 1
+                json_data["translated"] = translated
+                yield json_data
+    finally:
+        # 소비가 중단되면 아직 시작하지 않은 번역 요청 취소
+        for _, future in pending:
+            future.cancel()
+
+def iter_analyze_sentences(text, **kwargs):
+    """텍스트를 문장 단위로 분석하는 제너레이터 (analyze_multiple_sentences 의 스트리밍 버전)"""
+    sentences, analyses = split_sentences(text, parse=False)
+    yield from iter_analyze_split(sentences, analyses, **kwargs)
+
+def iter_ndjson(text, **kwargs):
+    """문장 결과를 한 줄에 하나씩 JSON 으로 (NDJSON)"""
+    for json_data in iter_analyze_sentences(text, **kwargs):
+        yield fast_json.dumps(json_data) + "\n"
+
+def write_ndjson(text, output_path="output.ndjson", **kwargs):
+    """분석 결과를 문장이 끝날 때마다 파일에 기록, 기록한 문장 수 반환"""
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for line in iter_ndjson(text, **kwargs):
+            f.write(line)
+            count += 1
+    return count
+
+def _analyze_doc(parser, doc):
+    """파싱된 Doc 의 문장들을 분석해 analyze_multiple_sentences 와 같은 형식으로 반환"""
+    sents = list(doc.sents)
+    all_results = []
+
+    for i, sent in enumerate(sents):
+        try:
+            json_data = convert_to_json_format(parser.analyze_span(sent))
+            json_data["sentence_number"] = i + 1
+            all_results.append(json_data)
+        except Exception as e:
+            print(f"⚠️ 문장 {i+1} 분석 중 오류 발생: {e}")
+
+    return {
+        "total_sentences": len(sents),
+        "results": all_results
+    }
+
+# 배치 분석용 프로세스 풀 (프로세스마다 하나, 처음 쓸 때 생성해 계속 사용)
+# 스레드(작업/번역 풀)와 모듈 잠금이 있는 웹 서버 프로세스를 fork 하면 다른 스레드가 잡고 있던
+# 잠금 때문에 자식이 멈출 수 있으므로 spawn 으로 띄우고 워커가 모델을 직접 로드한다 (ocr_backend 와 같음)
+_batch_pool = None
+_batch_pool_pid = None
+_batch_pool_lock = threading.Lock()
+
+def _init_batch_worker():
+    """워커 프로세스 초기화 - 모델 로드 (설정은 부모 프로세스의 환경 변수를 그대로 사용)"""
+    get_nlp()
+    get_parser()
+
+def _analyze_texts(texts, batch_size):
+    """텍스트 묶음을 파싱/분석 (워커 프로세스에서 실행)"""
+    parser = get_parser()
+    return [_analyze_doc(parser, doc) for doc in get_nlp().pipe(texts, batch_size=batch_size)]
+
+def _get_batch_pool():
+    global _batch_pool, _batch_pool_pid
+    with _batch_pool_lock:
+        # fork 된 프로세스(gunicorn 워커 등)는 부모의 풀을 쓸 수 없으므로 새로 만듦
+        if _batch_pool is None or _batch_pool_pid != os.getpid():
+            _batch_pool = ProcessPoolExecutor(max_workers=BATCH_MAX_PROCESSES,
+                                              mp_context=multiprocessing.get_context("spawn"),
+                                              initializer=_init_batch_worker)
+            _batch_pool_pid = os.getpid()
+        return _batch_pool
+
+def _reset_batch_pool(pool):
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is pool:
+            _batch_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def analyze_batch(texts, batch_size=DEFAULT_BATCH_SIZE, n_process=1, translate=False):
+    """여러 텍스트를 nlp.pipe 로 한 번에 분석
+
+    n_process 가 2 이상이면 텍스트를 나눠 프로세스 풀에서 파싱/분석한다.
+    n_process 는 BATCH_MAX_PROCESSES 를 넘을 수 없고, 풀은 요청마다 만들지 않고 계속 쓴다.
+    결과는 입력 순서대로 반환된다.
+    """
+    texts = list(texts)
+    nlp = get_nlp()
+    n_process = min(max(1, n_process), BATCH_MAX_PROCESSES)
+
+    if n_process > 1 and len(texts) > 1:
+        chunksize = max(1, min(batch_size, -(-len(texts) // (n_process * 4))))
+        chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+        pool = _get_batch_pool()
+        try:
+            final_results = [result for results in pool.map(_analyze_texts, chunks,
+                                                             [batch_size] * len(chunks))
+                             for result in results]
+        except BrokenProcessPool:
+            # 워커가 죽은 풀은 버리고 다음 요청에서 새로 만듦
+            _reset_batch_pool(pool)
+            raise
+        # 예문 색인에는 토큰 벡터만 필요하므로 문장을 토큰화만 해서 추가
+        _index_sentences([nlp.make_doc(item["sentence"])[:]
+                          for final_result in final_results for item in final_result["results"]])
+    else:
+        parser = get_parser()
+        final_results = [_analyze_doc(parser, doc)
+                         for doc in _indexed(nlp.pipe(texts, batch_size=batch_size))]
+
+    if translate:
+        for final_result in final_results:
+            items = final_result["results"]
+            cleaned = [clean_sentence(item["sentence"]) for item in items]
+            for item, translated in zip(items, ko_trans_many(cleaned)):
+                item["translated"] = translated
+
+    return final_results
+
+def spacy_trans(ocr_text, output_path="output.json"):
+    return analyze_multiple_sentences(ocr_text, output_path)
+
+# if __name__ == "__main__":
+
+#     # def spacy_trans(ocr_text):
+#     #     input_text = ocr_text
+    
+#     # 분석 및 저장
 #     analyze_multiple_sentences(input_text, "all_sentences.json")
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""LibreTranslate 번역 클라이언트
+
+- requests.Session 기반 keep-alive 커넥션 풀
+- 스레드 풀로 동시 요청 수 제한
+- 서버가 지원하면 q 배열로 여러 문장을 한 번에 번역
+- 요청별 타임아웃, 재시도(지수 백오프)
+- 한 요청 안의 중복 문장 제거 (결과는 입력 순서 유지)
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_URL = os.getenv("LIBRETRANSLATE_URL", "http://localhost:5000/translate")
+
+# 재시도할 HTTP 상태 코드
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# q 배열 요청에 이 상태 코드가 오면 서버가 배열을 지원하지 않는 것으로 봄
+UNSUPPORTED_STATUS = {400, 422}
+
+
+class TranslationError(Exception):
+    """재시도 후에도 번역에 실패한 경우"""
+
+
+class TranslationClient:
+    """커넥션 풀과 배치 요청을 사용하는 번역 클라이언트"""
+
+    def __init__(self, url=DEFAULT_URL, source="en", target="ko", api_key=None,
+                 timeout=10.0, retries=2, backoff=0.5, max_workers=4, batch_size=32,
+                 use_batch=True):
+        self.url = url
+        self.source = source
+        self.target = target
+        self.api_key = api_key or os.getenv("LIBRETRANSLATE_API_KEY")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        # None: 아직 모름, True/False: 서버의 q 배열 지원 여부
+        self._batch_supported = None if use_batch else False
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _post(self, q):
+        """번역 요청 1회 (타임아웃/재시도 포함), translatedText 반환"""
+        payload = {"q": q, "source": self.source, "target": self.target, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.json()["translatedText"]
+                error = TranslationError(f"HTTP {response.status_code}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt < self.retries:
+                time.sleep(self.backoff * (2 ** attempt))
+
+        raise TranslationError(f"번역 요청 실패 ({self.retries + 1}회 시도): {error}")
+
+    def translate(self, text):
+        """한 문장 번역"""
+        if not text.strip():
+            return ""
+        return self._post(text)
+
+    def _translate_chunk(self, chunk):
+        """문장 묶음을 q 배열 한 번으로 번역, 서버가 배열을 지원하지 않으면 None
+
+        400/422 응답이나 배열이 아닌 결과만 미지원으로 보고, 다른 오류(인증 실패 등)는 그대로 올린다.
+        """
+        try:
+            translated = self._post(chunk)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in UNSUPPORTED_STATUS:
+                return None
+            raise
+        if not isinstance(translated, list) or len(translated) != len(chunk):
+            return None
+        return translated
+
+    def translate_many(self, sentences):
+        """여러 문장 번역 - 결과는 입력 순서와 같음"""
+        unique = [s for s in dict.fromkeys(sentences) if s.strip()]
+        translations = {}
+
+        if unique and self._batch_supported is not False:
+            chunks = [unique[i:i + self.batch_size] for i in range(0, len(unique), self.batch_size)]
+            results = list(self._executor.map(self._translate_chunk, chunks))
+            for chunk, translated in zip(chunks, results):
+                if translated is not None:
+                    translations.update(zip(chunk, translated))
+            # 한 묶음이라도 성공하면 지원, 처음 시도에서 모든 묶음이 거부되면 미지원으로 기록
+            # (일부 묶음만 거부되면 그 묶음만 이번에 문장별로 다시 요청)
+            if any(r is not None for r in results):
+                self._batch_supported = True
+            elif self._batch_supported is None:
+                self._batch_supported = False
+
+        remaining = [s for s in unique if s not in translations]
+        translations.update(zip(remaining, self._executor.map(self._post, remaining)))
+
+        return [translations.get(s, "") for s in sentences]
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """프로세스 공용 클라이언트 (첫 사용 시 생성)"""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = TranslationClient()
+    return _default_client
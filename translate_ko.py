@@ -1,17 +1,53 @@
-from libretranslatepy import LibreTranslateAPI
-import requests
-
-def ko_trans(text):
-    # from app import get_ko_translated
-    response = requests.post('http://localhost:5000/translate', data={
-        "q": text,
-        "source": "en",
-        "target": "ko",
-        "format": "text"
-    })
-    response.raise_for_status()
-    return response.json()["translatedText"]
-
-def ko_trans_many(sentences):
-    # 여러 문장을 개별 번역해 리스트로 반환
-    return [ko_trans(sentence) for sentence in sentences]
\ No newline at end of file
+import threading
+import metrics
+from translate_client import get_client
+from translation_cache import create_translation_cache, normalize
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_translation_cache():
+    # 프로세스 공용 번역 캐시 (첫 사용 시 생성)
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_translation_cache()
+    return _cache
+
+def ko_trans(text):
+    # from app import get_ko_translated
+    cache = get_translation_cache()
+    translated = cache.get(text)
+    if translated is None:
+        metrics.inc("translation_cache_misses_total")
+        translated = _request(get_client().translate, normalize(text))
+        cache.set(text, translated)
+    else:
+        metrics.inc("translation_cache_hits_total")
+    return translated
+
+def _request(translate, q):
+    # 번역 서버 요청 (시간/실패 횟수 기록)
+    try:
+        with metrics.stage("translate"):
+            return translate(q)
+    except Exception:
+        metrics.inc("translation_errors_total")
+        raise
+
+def ko_trans_many(sentences):
+    # 여러 문장을 한 번에 번역해 입력 순서대로 리스트로 반환
+    # 캐시에 있는 문장은 건너뛰고 나머지만 번역 서버에 요청
+    cache = get_translation_cache()
+    found = cache.get_many(sentences)
+
+    missing = [s for s in dict.fromkeys(normalize(s) for s in sentences) if s and s not in found]
+    metrics.inc("translation_cache_hits_total", len(found))
+    metrics.inc("translation_cache_misses_total", len(missing))
+    if missing:
+        translated = _request(get_client().translate_many, missing)
+        found.update(zip(missing, translated))
+        cache.set_many(zip(missing, translated))
+
+    return [found.get(normalize(s), "") for s in sentences]
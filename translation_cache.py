@@ -0,0 +1,76 @@
+"""번역 결과 캐시
+
+키: 공백을 정규화한 문장 + 원문/번역 언어 + 번역 엔진
+캐시에 있는 문장은 번역 서버에 요청하지 않는다.
+"""
+import json
+import os
+import sys
+
+from cache_store import LRUCache, SQLiteCache, TieredCache
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+CACHE_DB = os.getenv("TRANSLATION_CACHE_DB", os.path.join(CACHE_DIR, "translations.sqlite3"))
+MEMORY_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MEMORY", "10000"))
+DISK_ENTRIES = int(os.getenv("TRANSLATION_CACHE_DISK", "200000"))
+MAX_AGE = float(os.getenv("TRANSLATION_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+
+
+def normalize(sentence):
+    """연속 공백/줄바꿈을 공백 하나로"""
+    return " ".join(sentence.split())
+
+
+class TranslationCache:
+    """문장 단위 번역 캐시"""
+
+    def __init__(self, cache, source="en", target="ko", engine="libretranslate"):
+        self.cache = cache
+        self.source = source
+        self.target = target
+        self.engine = engine
+
+    def key(self, sentence):
+        return f"{self.engine}:{self.source}:{self.target}:{normalize(sentence)}"
+
+    def get(self, sentence):
+        return self.cache.get(self.key(sentence))
+
+    def set(self, sentence, translated):
+        self.cache.set(self.key(sentence), translated)
+
+    def get_many(self, sentences):
+        """캐시에 있는 번역만 {정규화된 문장: 번역} 으로 반환"""
+        keys = {self.key(sentence): sentence
+                for sentence in dict.fromkeys(normalize(s) for s in sentences) if sentence}
+        return {keys[key]: translated for key, translated in self.cache.get_many(keys).items()}
+
+    def set_many(self, pairs):
+        self.cache.set_many((self.key(s), t) for s, t in pairs)
+
+    def warm_from_files(self, paths):
+        """output.json 형식 파일의 sentence/translated 쌍으로 캐시 채우기, 추가된 개수 반환"""
+        pairs = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data.get("results", []):
+                if item.get("sentence") and item.get("translated"):
+                    pairs.append((item["sentence"], item["translated"]))
+        self.set_many(pairs)
+        return len(pairs)
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def create_translation_cache(db_path=CACHE_DB):
+    """설정값으로 캐시 생성 (db_path 가 비어 있으면 메모리만 사용)"""
+    disk = SQLiteCache(db_path, max_entries=DISK_ENTRIES, ttl=MAX_AGE) if db_path else None
+    return TranslationCache(TieredCache(LRUCache(MEMORY_ENTRIES, ttl=MAX_AGE), disk))
+
+
+if __name__ == "__main__":
+    # python translation_cache.py output.json templates/all_sentences.json
+    cache = create_translation_cache()
+    print(f"✅ {cache.warm_from_files(sys.argv[1:])}개 번역을 캐시에 저장했습니다.")
@@ -0,0 +1,268 @@
+"""어휘 난이도 / 뜻 색인
+
+data/vocab.tsv (lemma, 품사, CEFR 레벨, 빈도 순위, 한국어 뜻)를 정렬된 uint64 해시 배열로
+변환해 cache/vocab_index/ 에 .npy 파일로 저장하고, 읽을 때는 memory-map 으로 연다.
+키는 spaCy 의 문자열 해시(StringStore 와 같은 값)라서 Doc.to_array([LEMMA, POS]) 결과를
+그대로 np.searchsorted 로 찾을 수 있다 (문장 단위 Python 반복 없음).
+
+  lemma 표: 품사 무관 항목 (키: lemma 해시), 품사별 항목만 있는 단어는 첫 항목
+  pos 표  : 품사가 정해진 항목 (키: lemma 해시 ^ 품사 ID * POS_SALT), lemma 표보다 우선
+  phrase 표: 구동사 (키: "give up" 해시) - 절 분석기의 PHRASAL_VERB Matcher 결과에 사용
+
+원본 파일이 색인보다 새로우면 첫 사용 시 다시 만든다.
+
+    python vocab_index.py build [--source data/vocab.tsv] [--output cache/vocab_index]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VOCAB_SOURCE = os.getenv("VOCAB_SOURCE", os.path.join(BASE_DIR, "data", "vocab.tsv"))
+VOCAB_INDEX = os.getenv("VOCAB_INDEX", os.path.join(BASE_DIR, "cache", "vocab_index"))
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+POS_SALT = np.uint64(0x9E3779B97F4A7C15)
+TABLES = ("lemma", "pos", "phrase")
+FIELDS = ("keys", "level", "rank", "gloss")
+
+
+def _hash_string(text):
+    from spacy.strings import hash_string
+    return hash_string(text)
+
+
+def _pos_keys(lemma_hashes, pos_ids):
+    # uint64 곱셈/XOR 은 2^64 로 감싸짐 (배열 연산이라 경고 없음)
+    return lemma_hashes ^ (pos_ids * POS_SALT)
+
+
+def read_source(path):
+    """[(lemma, 품사 또는 None, 레벨 1~6, 순위, 뜻), ...]"""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            parts = line.split("\t")
+            if len(parts) != 5 or parts[2] not in LEVELS:
+                raise ValueError(f"{path}:{line_number}: 형식 오류 - {line!r}")
+            lemma, pos, level, rank, gloss = parts
+            entries.append((lemma.strip().lower(), None if pos == "*" else pos,
+                            LEVELS.index(level) + 1, int(rank), gloss.strip()))
+    return entries
+
+
+def build_index(source=VOCAB_SOURCE, output=VOCAB_INDEX):
+    """원본 TSV 로 색인 디렉터리 생성, 항목 수 반환"""
+    from spacy.symbols import IDS
+
+    rows = {table: {} for table in TABLES}
+    glosses = []
+
+    def add(table, key, level, rank, gloss):
+        # 같은 키가 여러 번 나오면 처음 항목 사용
+        if key not in rows[table]:
+            rows[table][key] = (level, rank, len(glosses))
+            glosses.append(gloss)
+
+    entries = read_source(source)
+    for lemma, pos, level, rank, gloss in entries:
+        if " " in lemma:
+            add("phrase", _hash_string(" ".join(lemma.split())), level, rank, gloss)
+        elif pos is None:
+            add("lemma", _hash_string(lemma), level, rank, gloss)
+        else:
+            key = _pos_keys(np.array([_hash_string(lemma)], dtype=np.uint64),
+                            np.array([IDS[pos]], dtype=np.uint64))[0]
+            add("pos", int(key), level, rank, gloss)
+    # 품사가 맞는 항목이 없을 때(태깅 오류 등) 쓰도록 lemma 표에 첫 품사 항목도 넣음
+    for lemma, pos, level, rank, gloss in entries:
+        if pos is not None and " " not in lemma:
+            add("lemma", _hash_string(lemma), level, rank, gloss)
+
+    tmp_dir = f"{output}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for table, items in rows.items():
+        keys = np.array(sorted(items), dtype=np.uint64)
+        values = [items[int(key)] for key in keys]
+        arrays = {
+            "keys": keys,
+            "level": np.array([v[0] for v in values], dtype=np.uint8),
+            "rank": np.array([v[1] for v in values], dtype=np.uint32),
+            "gloss": np.array([v[2] for v in values], dtype=np.uint32),
+        }
+        for field, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{table}_{field}.npy"), array)
+
+    encoded = [gloss.encode("utf-8") for gloss in glosses]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    np.save(os.path.join(tmp_dir, "gloss_offsets.npy"), offsets)
+    np.save(os.path.join(tmp_dir, "gloss_data.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    stat = os.stat(source)
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"source_mtime": stat.st_mtime, "source_size": stat.st_size,
+                   "entries": {table: len(items) for table, items in rows.items()}}, f)
+
+    # 지우고 나서 옮기면 그 사이에 색인이 없으므로, 예전 색인을 옆으로 옮긴 뒤 바로 새 색인으로 교체
+    # (이미 열린 memory-map 은 파일을 지워도 계속 사용 가능)
+    old_dir = f"{output}.{os.getpid()}.old"
+    if os.path.exists(output):
+        os.replace(output, old_dir)
+    os.replace(tmp_dir, output)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return sum(len(items) for items in rows.values())
+
+
+def index_is_current(source=VOCAB_SOURCE, output=VOCAB_INDEX):
+    try:
+        with open(os.path.join(output, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    stat = os.stat(source)
+    return meta["source_mtime"] == stat.st_mtime and meta["source_size"] == stat.st_size
+
+
+class VocabIndex:
+    """memory-map 으로 연 어휘 색인"""
+
+    def __init__(self, path=VOCAB_INDEX):
+        self.path = path
+        self.tables = {
+            table: {field: self._load(f"{table}_{field}.npy") for field in FIELDS}
+            for table in TABLES
+        }
+        self._gloss_offsets = self._load("gloss_offsets.npy")
+        self._gloss_data = self._load("gloss_data.npy")
+        with open(os.path.join(path, "meta.json"), "rb") as f:
+            # 분석 결과 캐시 키에 넣어 원본이 바뀌면 예전 결과를 쓰지 않게 함
+            self.version = hashlib.sha256(f.read()).hexdigest()[:12]
+
+    def _load(self, name):
+        # np.memmap 대신 같은 메모리를 보는 일반 ndarray 로 사용 (연산 오버헤드가 작음)
+        return np.asarray(np.load(os.path.join(self.path, name), mmap_mode="r"))
+
+    def __len__(self):
+        return sum(len(table["keys"]) for table in self.tables.values())
+
+    def lookup(self, table, keys):
+        """키 배열 -> 표 안의 위치 배열 (없으면 -1)"""
+        table_keys = self.tables[table]["keys"]
+        if not len(table_keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        positions = np.searchsorted(table_keys, keys)
+        positions[positions == len(table_keys)] = 0
+        return np.where(table_keys[positions] == keys, positions, -1)
+
+    def gloss(self, index):
+        start, end = self._gloss_offsets[index], self._gloss_offsets[index + 1]
+        return self._gloss_data[start:end].tobytes().decode("utf-8")
+
+    def entry(self, table, position):
+        values = self.tables[table]
+        rank = int(values["rank"][position])
+        return {
+            "level": LEVELS[values["level"][position] - 1],
+            "rank": rank or None,
+            "gloss": self.gloss(int(values["gloss"][position])),
+        }
+
+    def tag(self, span, phrasal_matches=()):
+        """문장(Span/Doc)의 단어 난이도/뜻과 구동사
+
+        phrasal_matches: 구동사 후보 (span 기준 start, end) - 동사 lemma + 다음 단어로 찾음
+        """
+        from spacy.attrs import LEMMA, LOWER, POS
+
+        words = []
+        levels = []
+        if len(span):
+            array = span.to_array([LEMMA, LOWER, POS])
+            # lemmatizer 가 없는 파이프라인에서는 LEMMA 가 0 이므로 소문자 형태 사용
+            lemmas = np.where(array[:, 0] == 0, array[:, 1], array[:, 0])
+            pos_positions = self.lookup("pos", _pos_keys(lemmas, array[:, 2]))
+            lemma_positions = self.lookup("lemma", lemmas)
+
+            seen = set()
+            for i in np.flatnonzero((pos_positions >= 0) | (lemma_positions >= 0)):
+                token = span[int(i)]
+                lemma = token.lemma_ or token.lower_
+                if lemma in seen:
+                    continue
+                seen.add(lemma)
+                if pos_positions[i] >= 0:
+                    info = self.entry("pos", int(pos_positions[i]))
+                else:
+                    info = self.entry("lemma", int(lemma_positions[i]))
+                words.append(dict(info, i=int(i), text=token.text, lemma=lemma))
+                levels.append(info["level"])
+
+        phrasal_verbs = []
+        for start, end in phrasal_matches:
+            if end - start < 2:
+                continue
+            verb, particle = span[start], span[start + 1]
+            phrase = f"{verb.lemma_ or verb.lower_} {particle.lower_}"
+            position = self.lookup("phrase", np.array([_hash_string(phrase)], dtype=np.uint64))[0]
+            if position >= 0 and all(item["phrase"] != phrase for item in phrasal_verbs):
+                info = self.entry("phrase", int(position))
+                phrasal_verbs.append(dict(info, i=start, text=span[start:start + 2].text, phrase=phrase))
+                levels.append(info["level"])
+
+        return {
+            "level": max(levels) if levels else None,
+            "words": words,
+            "phrasal_verbs": phrasal_verbs,
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+_missing = False
+
+
+def get_vocab_index():
+    """프로세스 공용 색인 (원본이 바뀌었으면 다시 만듦), 원본 파일이 없으면 None"""
+    global _index, _missing
+    if _index is None and not _missing:
+        with _index_lock:
+            if _index is None and not _missing:
+                if not os.path.exists(VOCAB_SOURCE):
+                    _missing = True
+                    return None
+                if not index_is_current(VOCAB_SOURCE, VOCAB_INDEX):
+                    build_index(VOCAB_SOURCE, VOCAB_INDEX)
+                _index = VocabIndex(VOCAB_INDEX)
+    return _index
+
+
+def index_version():
+    """분석 결과 캐시 키용 색인 버전 (색인이 없으면 "none")"""
+    index = get_vocab_index()
+    return index.version if index is not None else "none"
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="어휘 색인 관리")
+    arg_parser.add_argument("command", choices=["build"])
+    arg_parser.add_argument("--source", default=VOCAB_SOURCE)
+    arg_parser.add_argument("--output", default=VOCAB_INDEX)
+    args = arg_parser.parse_args(argv)
+
+    count = build_index(args.source, args.output)
+    print(f"✅ {count}개 항목 색인: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())